@@ -0,0 +1,119 @@
+"""
+Benchmark de tiempo de import de los entry points del pipeline.
+
+Corre cada target en un intérprete nuevo con `python -X importtime` y
+resume:
+  - tiempo total (cumulative) del import del target,
+  - los paquetes top-level más pesados que arrastra,
+  - qué librerías pesadas (pandas, duckdb, ...) terminan cargadas.
+
+Uso:
+  python benchmarks/import_time.py                 # DAG + todos los jobs
+  python benchmarks/import_time.py tp2025.jobs.build_chinfo_cur
+  python benchmarks/import_time.py --budget-ms 300 dag
+
+El target "dag" ejecuta dags/wow_pvp_full_pipeline_dag.py como lo haría el
+scheduler de Airflow (se saltea si airflow no está instalado).
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+SRC_DIR = PROJECT_ROOT / "src"
+DAG_FILE = PROJECT_ROOT / "dags" / "wow_pvp_full_pipeline_dag.py"
+
+HEAVY_PACKAGES = ("pandas", "numpy", "pyarrow", "duckdb", "requests", "psycopg2", "dotenv")
+
+DEFAULT_TARGETS = [
+    "dag",
+    "tp2025.jobs.extract_leaderboard_to_landing",
+    "tp2025.jobs.load_leaderboard_raw_to_db",
+    "tp2025.jobs.build_leaderboard_cur",
+    "tp2025.jobs.build_leaderboard_history",
+    "tp2025.jobs.extract_chinfo_to_landing",
+    "tp2025.jobs.load_chinfo_raw_to_db",
+    "tp2025.jobs.build_chinfo_cur",
+    "tp2025.jobs.build_leaderboard_summary",
+    "tp2025.jobs.load_warehouse_redshift",
+]
+
+_LINE_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)$")
+
+
+def _import_statement(target: str) -> str:
+    if target == "dag":
+        return f"import runpy; runpy.run_path({str(DAG_FILE)!r})"
+    return f"import {target}"
+
+
+def measure(target: str) -> Tuple[int, Dict[str, int], str]:
+    """
+    Devuelve (microsegundos totales, cumulative por paquete top-level, stderr).
+    """
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(SRC_DIR), env.get("PYTHONPATH")]))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _import_statement(target)],
+        capture_output=True,
+        text=True,
+        env=env,
+        cwd=PROJECT_ROOT,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr else "falló el import")
+
+    total = 0
+    by_package: Dict[str, int] = {}
+    for line in proc.stderr.splitlines():
+        match = _LINE_RE.match(line)
+        if not match:
+            continue
+        cumulative, indent, name = int(match.group(2)), match.group(3), match.group(4)
+        # Imports de primer nivel: su cumulative ya incluye a los hijos
+        if len(indent) == 1:
+            total += cumulative
+        # Cada paquete top-level aparece una sola vez (la primera vez que se importa)
+        if "." not in name and name not in ("tp2025", "site", "encodings"):
+            by_package[name] = cumulative
+    return total, by_package, proc.stderr
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Tiempo de import de DAG y jobs (python -X importtime).")
+    parser.add_argument("targets", nargs="*", default=DEFAULT_TARGETS)
+    parser.add_argument("--top", type=int, default=5, help="paquetes más pesados a mostrar")
+    parser.add_argument("--budget-ms", type=float, default=None, help="falla si algún target lo supera")
+    args = parser.parse_args(argv)
+
+    over_budget = []
+    for target in args.targets:
+        try:
+            total, by_package, _ = measure(target)
+        except RuntimeError as exc:
+            print(f"{target:<50} SKIP ({exc})")
+            continue
+
+        heavy = sorted(p for p in by_package if p in HEAVY_PACKAGES)
+        top = sorted(by_package.items(), key=lambda kv: kv[1], reverse=True)[: args.top]
+        print(f"{target:<50} {total / 1000:8.1f} ms  pesados={','.join(heavy) or '-'}")
+        for name, us in top:
+            print(f"    {name:<30} {us / 1000:8.1f} ms")
+
+        if args.budget_ms is not None and total / 1000 > args.budget_ms:
+            over_budget.append(target)
+
+    if over_budget:
+        print(f"Sobre el presupuesto de {args.budget_ms} ms: {', '.join(over_budget)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,225 @@
+"""
+Benchmark de decodificación de payloads de la API (capa blizzard_api.decoding).
+
+Para cada backend instalado (json, orjson, msgspec) y cada modo:
+  - resp.json()  : camino anterior (texto -> json de la stdlib, payload completo),
+  - untyped      : bytes -> backend, payload completo,
+  - typed        : bytes -> backend con el esquema (con msgspec sólo los campos usados),
+mide CPU (decode + normalización) y memoria (pico de tracemalloc y bloques
+vivos del resultado decodificado).
+
+Payloads sintéticos con la forma real de la API: un leaderboard de 5000
+entradas (hrefs, keys, realm, faction, season_match_statistics, tier) y
+miles de perfiles completos (hrefs a todos los sub-recursos, guild, realm...).
+
+Con --processes mide además el throughput del pool de decodificación en
+procesos (CHINFO_DECODE_PROCESSES) según la cantidad de procesos.
+
+Uso:
+  python benchmarks/json_decoding.py
+  python benchmarks/json_decoding.py --entries 5000 --profiles 5000 --repeat 7
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+
+from tp2025.blizzard_api.decoding import (  # noqa: E402
+    LeaderboardPayload,
+    ProfilePayload,
+    available_backends,
+    decode,
+)
+from tp2025.jobs.extract_leaderboard_to_landing import normalize_leaderboard_entries  # noqa: E402
+from tp2025.services.ch_profile_client import normalize_profile_row  # noqa: E402
+
+API = "https://us.api.blizzard.com"
+
+
+def _ref(path: str, namespace: str = "profile-us") -> Dict[str, Any]:
+    return {"href": f"{API}{path}?namespace={namespace}"}
+
+
+def synthetic_leaderboard(n_entries: int) -> bytes:
+    entries = []
+    for i in range(n_entries):
+        realm_id = 1000 + i % 250
+        entries.append(
+            {
+                "character": {
+                    "name": f"Char{i}",
+                    "id": 200_000_000 + i,
+                    "realm": {"key": _ref(f"/data/wow/realm/{realm_id}", "dynamic-us"),
+                              "id": realm_id, "slug": f"realm-{i % 250}"},
+                },
+                "faction": {"type": "HORDE" if i % 2 else "ALLIANCE"},
+                "rank": i + 1,
+                "rating": 3200 - i // 3,
+                "season_match_statistics": {"played": 300 + i % 400, "won": 180, "lost": 120 + i % 400},
+                "tier": {"key": _ref(f"/data/wow/pvp-tier/{i % 6}", "static-us"), "id": i % 6},
+            }
+        )
+    payload = {
+        "_links": {"self": _ref("/data/wow/pvp-season/40/pvp-leaderboard/3v3", "dynamic-us")},
+        "season": {"key": _ref("/data/wow/pvp-season/40", "dynamic-us"), "id": 40},
+        "name": "3v3",
+        "bracket": {"id": 1, "type": "ARENA_3v3"},
+        "entries": entries,
+    }
+    return json.dumps(payload).encode()
+
+
+def synthetic_profile(i: int) -> bytes:
+    name = f"char{i}"
+    base = f"/profile/wow/character/realm-{i % 250}/{name}"
+    payload = {
+        "_links": {"self": _ref(base)},
+        "id": 200_000_000 + i,
+        "name": name.capitalize(),
+        "gender": {"type": "MALE", "name": "Male"},
+        "faction": {"type": "HORDE", "name": "Horde"},
+        "race": {"key": _ref("/data/wow/playable-race/10", "static-us"), "name": "Blood Elf", "id": 10},
+        "character_class": {"key": _ref("/data/wow/playable-class/2", "static-us"), "name": "Paladin", "id": 2},
+        "active_spec": {"key": _ref("/data/wow/playable-specialization/70", "static-us"),
+                        "name": "Retribution", "id": 70},
+        "realm": {"key": _ref(f"/data/wow/realm/{1000 + i % 250}", "dynamic-us"),
+                  "name": f"Realm {i % 250}", "id": 1000 + i % 250, "slug": f"realm-{i % 250}"},
+        "guild": {"key": _ref(f"/data/wow/guild/realm-{i % 250}/guild-{i % 90}"),
+                  "name": f"Guild {i % 90}", "id": i % 90,
+                  "realm": {"key": _ref(f"/data/wow/realm/{1000 + i % 250}", "dynamic-us"),
+                            "name": f"Realm {i % 250}", "id": 1000 + i % 250, "slug": f"realm-{i % 250}"},
+                  "faction": {"type": "HORDE", "name": "Horde"}},
+        "level": 80,
+        "experience": 0,
+        "achievement_points": 20000 + i % 5000,
+        "last_login_timestamp": 1763400000000 + i,
+        "average_item_level": 700 + i % 20,
+        "equipped_item_level": 698 + i % 20,
+        "active_title": {"key": _ref("/data/wow/title/400", "static-us"), "name": "Gladiator",
+                         "id": 400, "display_string": "Gladiator {name}"},
+        "covenant_progress": {"chosen_covenant": {"key": _ref("/data/wow/covenant/1", "static-us"),
+                                                  "name": "Kyrian", "id": 1}, "renown_level": 80},
+    }
+    for resource in ("achievements", "titles", "pvp-summary", "encounters", "media", "hunter-pets",
+                     "specializations", "statistics", "mythic-keystone-profile", "equipment",
+                     "appearance", "collections", "reputations", "quests", "professions"):
+        payload[resource.replace("-", "_")] = _ref(f"{base}/{resource}")
+    return json.dumps(payload).encode()
+
+
+def _old_path(content: bytes) -> Any:
+    # Lo que hace requests.Response.json(): bytes -> str -> json.loads
+    return json.loads(content.decode("utf-8"))
+
+
+def _measure(fn: Callable[[], Any], repeat: int) -> Tuple[float, float, float]:
+    """
+    (mediana de segundos, pico de memoria en MB, MB vivos del resultado).
+    """
+    times: List[float] = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.process_time()
+        fn()
+        times.append(time.process_time() - start)
+
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = fn()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return statistics.median(times), (peak - before) / 1e6, (retained - before) / 1e6
+
+
+def _modes(schema: Any) -> Dict[str, Callable[[bytes], Any]]:
+    modes: Dict[str, Callable[[bytes], Any]] = {"resp.json()": _old_path}
+    for backend in available_backends():
+        modes[f"{backend} untyped"] = lambda c, b=backend: decode(c, None, backend=b)
+        if backend == "msgspec":
+            modes[f"{backend} typed"] = lambda c, b=backend: decode(c, schema, backend=b)
+    return modes
+
+
+def bench_leaderboard(n_entries: int, repeat: int) -> None:
+    content = synthetic_leaderboard(n_entries)
+    print(f"\nLeaderboard: {n_entries} entradas, {len(content) / 1e6:.1f} MB")
+    print(f"{'modo':<18}{'decode ms':>11}{'+normalize ms':>15}{'pico MB':>10}{'vivo MB':>10}")
+    for label, fn in _modes(LeaderboardPayload).items():
+        decode_s, peak, live = _measure(lambda: fn(content), repeat)
+        total_s, _, _ = _measure(lambda: normalize_leaderboard_entries(fn(content)), repeat)
+        print(f"{label:<18}{decode_s * 1e3:>11.1f}{total_s * 1e3:>15.1f}{peak:>10.1f}{live:>10.1f}")
+
+
+def bench_profiles(n_profiles: int, repeat: int) -> None:
+    bodies = [synthetic_profile(i) for i in range(n_profiles)]
+    meta = {"slug_name": "realm-0", "fecha_proceso": "20251117"}
+    size = sum(len(b) for b in bodies)
+    print(f"\nPerfiles: {n_profiles} payloads, {size / 1e6:.1f} MB")
+    print(f"{'modo':<18}{'decode ms':>11}{'+normalize ms':>15}{'pico MB':>10}{'vivo MB':>10}")
+    for label, fn in _modes(ProfilePayload).items():
+        decode_s, peak, live = _measure(lambda: [fn(b) for b in bodies], repeat)
+        total_s, _, _ = _measure(lambda: [normalize_profile_row(meta, fn(b)) for b in bodies], repeat)
+        print(f"{label:<18}{decode_s * 1e3:>11.1f}{total_s * 1e3:>15.1f}{peak:>10.1f}{live:>10.1f}")
+
+
+def bench_decode_pool(n_profiles: int, processes: List[int]) -> None:
+    """
+    Throughput (pared) de la etapa de decodificación en procesos
+    (services/profile_decode_pool) contra decodificar en el proceso actual.
+    """
+    from tp2025.services.profile_decode_pool import ProfileDecodePool, decode_profile_batch
+
+    bodies = [synthetic_profile(i) for i in range(n_profiles)]
+    metas = [{"char_id": i, "char_name": f"char{i}", "slug_name": "realm-0", "fecha_proceso": "20251117"}
+             for i in range(n_profiles)]
+    print(f"\nPool de decodificación: {n_profiles} perfiles")
+    print(f"{'procesos':<10}{'pared ms':>10}{'perfiles/s':>12}")
+
+    start = time.perf_counter()
+    decode_profile_batch(metas, bodies)
+    elapsed = time.perf_counter() - start
+    print(f"{'inline':<10}{elapsed * 1e3:>10.0f}{n_profiles / elapsed:>12.0f}")
+
+    for n in processes:
+        with ProfileDecodePool(processes=n, batch_size=50, max_pending=2 * n) as pool:
+            # calentar: arrancar los procesos fuera de la medición
+            pool.submit(metas[0], bodies[0])
+            pool.collect()
+            start = time.perf_counter()
+            for meta, body in zip(metas, bodies):
+                pool.submit(meta, body)
+            pool.collect()
+            elapsed = time.perf_counter() - start
+        print(f"{n:<10}{elapsed * 1e3:>10.0f}{n_profiles / elapsed:>12.0f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entries", type=int, default=5000)
+    parser.add_argument("--profiles", type=int, default=3000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--processes", type=int, nargs="*", default=[1, 2, 4],
+                        help="tamaños del pool de decodificación a medir (vacío = no medir)")
+    args = parser.parse_args()
+
+    print(f"Backends instalados: {', '.join(available_backends())}")
+    bench_leaderboard(args.entries, args.repeat)
+    bench_profiles(args.profiles, args.repeat)
+    if args.processes:
+        bench_decode_pool(args.profiles * 4, args.processes)
+
+
+if __name__ == "__main__":
+    main()
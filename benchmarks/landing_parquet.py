@@ -0,0 +1,150 @@
+"""
+Benchmark de settings de escritura de parquet de landing.
+
+Para cada setting mide:
+  - tamaño del archivo,
+  - tiempo de escritura,
+  - tiempo de lectura completa (pyarrow),
+  - tiempo de una lectura filtrada desde DuckDB (rank <= 100) y cuántos
+    row groups pudo saltear.
+
+Uso:
+  python benchmarks/landing_parquet.py                       # datos sintéticos (multi-región, 30 días)
+  python benchmarks/landing_parquet.py data/landing/pvp_leaderboard_s40_3v3_20251117.parquet
+  python benchmarks/landing_parquet.py --rows 2000000 --repeat 5
+"""
+from __future__ import annotations
+
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+import duckdb
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+
+from tp2025.io.landing_writer import (  # noqa: E402
+    LEADERBOARD_WRITE_OPTIONS,
+    LandingWriteOptions,
+    write_landing_parquet,
+)
+
+
+def synthetic_leaderboard(n_rows: int, seed: int = 7) -> pd.DataFrame:
+    """
+    Leaderboard con la forma del RAW: varias regiones/días apilados,
+    realms y facciones de baja cardinalidad, rank 1..5000 por bloque.
+    """
+    rng = np.random.default_rng(seed)
+    realms = np.array([f"realm-{i}" for i in range(250)])
+    block = 5000
+    rank = (np.arange(n_rows) % block) + 1
+    return pd.DataFrame(
+        {
+            "id": rng.integers(1, 300_000_000, n_rows),
+            "name": [f"char{i}" for i in rng.integers(0, 10_000_000, n_rows)],
+            "slug": realms[rng.integers(0, len(realms), n_rows)],
+            "faction": np.where(rng.random(n_rows) < 0.55, "HORDE", "ALLIANCE"),
+            "bracket": np.where((np.arange(n_rows) // block) % 2 == 0, "3v3", "2v2"),
+            "rank": rank,
+            "rating": 3200 - rank // 3 + rng.integers(-5, 5, n_rows),
+            "played": rng.integers(10, 900, n_rows),
+            "won": rng.integers(5, 500, n_rows),
+            "lost": rng.integers(5, 400, n_rows),
+        }
+    ).sample(frac=1.0, random_state=seed)  # el orden de la API no ayuda al pruning
+
+
+def settings() -> Dict[str, Callable[[pd.DataFrame, Path], None]]:
+    base = LEADERBOARD_WRITE_OPTIONS
+
+    def with_options(options: LandingWriteOptions):
+        return lambda df, path: write_landing_parquet(df, path, options)
+
+    return {
+        "pandas default (snappy)": lambda df, path: df.to_parquet(path, index=False),
+        "zstd-1": with_options(base.with_overrides(compression_level=1)),
+        "zstd-3 (default)": with_options(base),
+        "zstd-9": with_options(base.with_overrides(compression_level=9)),
+        "zstd-3 sin diccionario": with_options(base.with_overrides(dictionary_columns=())),
+        "zstd-3 sin orden": with_options(base.with_overrides(sort_by=())),
+        "zstd-3 rg=10k": with_options(base.with_overrides(row_group_size=10_000)),
+        "zstd-3 rg=250k": with_options(base.with_overrides(row_group_size=250_000)),
+    }
+
+
+def _timed(fn: Callable[[], object], repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return statistics.median(times)
+
+
+def _pruned_row_groups(path: Path) -> Tuple[int, int]:
+    """
+    (row groups totales, row groups cuyo min(rank) > 100 -> salteables).
+    """
+    meta = pq.ParquetFile(path).metadata
+    rank_idx = meta.schema.to_arrow_schema().get_field_index("rank")
+    skippable = 0
+    for i in range(meta.num_row_groups):
+        stats = meta.row_group(i).column(rank_idx).statistics
+        if stats is not None and stats.has_min_max and stats.min > 100:
+            skippable += 1
+    return meta.num_row_groups, skippable
+
+
+def run(df: pd.DataFrame, repeat: int) -> List[Dict[str, object]]:
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = duckdb.connect()
+        for name, write in settings().items():
+            path = Path(tmp) / f"{abs(hash(name))}.parquet"
+            write_s = _timed(lambda: write(df, path), repeat)
+            read_s = _timed(lambda: pq.read_table(path), repeat)
+            filtered_s = _timed(
+                lambda: conn.execute(f"SELECT * FROM read_parquet('{path}') WHERE rank <= 100").fetchall(),
+                repeat,
+            )
+            n_rg, skippable = _pruned_row_groups(path)
+            results.append(
+                {
+                    "setting": name,
+                    "size_mb": path.stat().st_size / (1024 * 1024),
+                    "write_ms": write_s * 1000,
+                    "read_ms": read_s * 1000,
+                    "rank<=100_ms": filtered_s * 1000,
+                    "row_groups": f"{skippable}/{n_rg} salteables",
+                }
+            )
+    return results
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Tamaño y tiempos de parquet de landing por setting.")
+    parser.add_argument("parquet", nargs="?", help="parquet de landing existente (default: sintético)")
+    parser.add_argument("--rows", type=int, default=500_000, help="filas del dataset sintético")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    df = pd.read_parquet(args.parquet) if args.parquet else synthetic_leaderboard(args.rows)
+    print(f"{len(df)} filas, {len(df.columns)} columnas\n")
+
+    report = pd.DataFrame(run(df, args.repeat))
+    with pd.option_context("display.float_format", "{:.1f}".format, "display.width", 200):
+        print(report.to_string(index=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
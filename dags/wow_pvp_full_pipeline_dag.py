@@ -16,27 +16,22 @@ SRC_DIR = PROJECT_ROOT / "src"
 if str(SRC_DIR) not in sys.path:
     sys.path.insert(0, str(SRC_DIR))
 
-from tp2025.jobs.extract_leaderboard_to_landing import (
-    run_extract_leaderboard_to_landing,
-)
-from tp2025.jobs.load_leaderboard_raw_to_db import (
-    run_load_leaderboard_raw_to_db,
-)
-from tp2025.jobs.build_leaderboard_cur import (
-    run_build_leaderboard_cur,
-)
-from tp2025.jobs.extract_chinfo_to_landing import (
-    run_extract_chinfo_to_landing,
-)
-from tp2025.jobs.load_chinfo_raw_to_db import (
-    run_load_chinfo_raw_to_db,
-)
-from tp2025.jobs.build_chinfo_cur import (
-    run_build_chinfo_cur,
-)
-
-# Import de la carga a Redshift
-from tp2025.jobs.load_warehouse_redshift import main as load_warehouse_main
+# Los jobs (pandas, duckdb, requests, psycopg2, ...) NO se importan acá:
+# el scheduler parsea este archivo seguido, así que cada task importa su
+# módulo recién al ejecutarse (ver run_job).
+JOBS_PACKAGE = "tp2025.jobs"
+
+# Extracción repartida con dynamic task mapping:
+# - leaderboard: una task por (región, bracket)
+# - perfiles: una task por shard de char_id + un paso que une los shards
+# Todas las tasks que pegan a la API comparten el pool (slots = cuota de la API).
+BLIZZARD_API_POOL = os.getenv("BLIZZARD_API_POOL", "blizzard_api")
+LEADERBOARD_BRACKETS = ("2v2", "3v3")
+# Sin BLIZZARD_REGIONS, una sola región: la de la Variable BLIZZARD_REGION (se resuelve en la task)
+LEADERBOARD_REGIONS = [r.strip() for r in os.getenv("BLIZZARD_REGIONS", "").split(",") if r.strip()] or [None]
+# Extracciones diferidas: los requests corren en el triggerer (asyncio) y la
+# task vuelve a un worker sólo para escribir. Requiere `airflow triggerer`.
+DEFERRABLE_EXTRACT = os.getenv("BLIZZARD_DEFERRABLE", "0") == "1"
 
 
 # ---------- Helpers ----------
@@ -49,31 +44,59 @@ def set_blizzard_env_vars() -> None:
     Variables esperadas en Airflow:
       - BLIZZARD_CLIENT_ID
       - BLIZZARD_CLIENT_SECRET
+      - BLIZZARD_CLIENTS (opcional: varias apps "id:secret[:peso],...", ver credential_pool.py;
+        si está, reemplaza a las dos anteriores)
       - BLIZZARD_REGION (opcional, por defecto 'us')
     """
     client_id = Variable.get("BLIZZARD_CLIENT_ID", default_var=None)
     client_secret = Variable.get("BLIZZARD_CLIENT_SECRET", default_var=None)
+    clients = Variable.get("BLIZZARD_CLIENTS", default_var=None)
     region = Variable.get("BLIZZARD_REGION", default_var="us")
 
-    if not client_id or not client_secret:
+    if not clients and (not client_id or not client_secret):
         raise ValueError(
             "Faltan Airflow Variables 'BLIZZARD_CLIENT_ID' y/o "
-            "'BLIZZARD_CLIENT_SECRET'. Configurarlas en Admin > Variables."
+            "'BLIZZARD_CLIENT_SECRET' (o 'BLIZZARD_CLIENTS'). Configurarlas en Admin > Variables."
         )
 
-    os.environ["BLIZZARD_CLIENT_ID"] = client_id
-    os.environ["BLIZZARD_CLIENT_SECRET"] = client_secret
+    if clients:
+        os.environ["BLIZZARD_CLIENTS"] = clients
+    if client_id and client_secret:
+        os.environ["BLIZZARD_CLIENT_ID"] = client_id
+        os.environ["BLIZZARD_CLIENT_SECRET"] = client_secret
     os.environ["BLIZZARD_REGION"] = region
 
 
-def run_load_warehouse(processing_date: str | None = None) -> None:
+def run_job(module: str, func: str, processing_date: str | None = None, **kwargs):
     """
-    Wrapper para llamar a load_warehouse.main desde Airflow.
+    Importa tp2025.jobs.<module> y ejecuta <func> dentro del proceso de la task.
 
     processing_date se pasa en formato YYYYMMDD, consistente con fecha_proceso.
-    Si no se pasa, main usa la fecha de hoy.
+    Si no se pasa, el job usa la fecha de hoy. El resto de kwargs (p.ej. el
+    shard de una task mapeada) se pasan tal cual. Lo que devuelve el job queda
+    en XCom.
     """
-    load_warehouse_main(processing_date=processing_date)
+    from importlib import import_module
+
+    job = getattr(import_module(f"{JOBS_PACKAGE}.{module}"), func)
+    if processing_date is not None:
+        kwargs["processing_date"] = processing_date
+    return job(**kwargs)
+
+
+def job_kwargs(module: str, func: str | None = None, **kwargs) -> dict:
+    """
+    op_kwargs para un PythonOperator que corre un job vía run_job.
+    Por convención la función se llama run_<module>.
+    """
+    return {"module": module, "func": func or f"run_{module}", **kwargs}
+
+
+def chinfo_shard_kwargs(shard: dict) -> dict:
+    """
+    op_kwargs de una task mapeada de perfiles a partir de lo que devuelve plan_chinfo_shards.
+    """
+    return job_kwargs("extract_chinfo_to_landing", "extract_chinfo_shard", **shard)
 
 
 # ---------- Definición del DAG ----------
@@ -102,55 +125,139 @@ with DAG(
         python_callable=set_blizzard_env_vars,
     )
 
-    # 1) EXTRAER LEADERBOARD -> LANDING (parquet)
-    t_extract_leaderboard = PythonOperator(
-        task_id="extract_leaderboard_to_landing",
-        python_callable=run_extract_leaderboard_to_landing,
-    )
+    # 1) EXTRAER LEADERBOARD -> LANDING (parquet), una task mapeada por (región, bracket)
+    if DEFERRABLE_EXTRACT:
+        # tp2025.orchestration sólo importa airflow + stdlib (los jobs, al ejecutar)
+        from tp2025.orchestration.operators import (  # noqa: E402
+            DeferrableChinfoShardOperator,
+            DeferrableLeaderboardOperator,
+        )
+
+        t_extract_leaderboard = DeferrableLeaderboardOperator.partial(
+            task_id="extract_leaderboard_to_landing",
+            pool=BLIZZARD_API_POOL,
+        ).expand_kwargs(
+            [
+                {"region": region, "bracket": bracket}
+                for region in LEADERBOARD_REGIONS
+                for bracket in LEADERBOARD_BRACKETS
+            ]
+        )
+    else:
+        t_extract_leaderboard = PythonOperator.partial(
+            task_id="extract_leaderboard_to_landing",
+            python_callable=run_job,
+            pool=BLIZZARD_API_POOL,
+        ).expand(
+            op_kwargs=[
+                job_kwargs(
+                    "extract_leaderboard_to_landing",
+                    "extract_leaderboard_shard",
+                    region=region,
+                    bracket=bracket,
+                )
+                for region in LEADERBOARD_REGIONS
+                for bracket in LEADERBOARD_BRACKETS
+            ]
+        )
 
     # 2) CARGAR LEADERBOARD -> RAW (DuckDB)
     t_load_leaderboard_raw = PythonOperator(
         task_id="load_leaderboard_raw_to_db",
-        python_callable=run_load_leaderboard_raw_to_db,
+        python_callable=run_job,
+        op_kwargs=job_kwargs("load_leaderboard_raw_to_db"),
     )
 
     # 3) CONSTRUIR LEADERBOARD -> CUR (DuckDB)
     t_build_leaderboard_cur = PythonOperator(
         task_id="build_leaderboard_cur",
-        python_callable=run_build_leaderboard_cur,
+        python_callable=run_job,
+        op_kwargs=job_kwargs("build_leaderboard_cur"),
+    )
+
+    # 3b) HISTORIA DEL LEADERBOARD (DuckDB, slice del día + deltas)
+    t_build_leaderboard_history = PythonOperator(
+        task_id="build_leaderboard_history",
+        python_callable=run_job,
+        op_kwargs=job_kwargs("build_leaderboard_history"),
     )
 
     # 4) EXTRAER CHINFO -> LANDING (parquet)
-    t_extract_chinfo = PythonOperator(
-        task_id="extract_chinfo_to_landing",
-        python_callable=run_extract_chinfo_to_landing,
+    # 4a) selección de personajes + un set de kwargs por shard (XCom)
+    t_plan_chinfo = PythonOperator(
+        task_id="plan_chinfo_shards",
+        python_callable=run_job,
+        op_kwargs=job_kwargs("extract_chinfo_to_landing", "plan_chinfo_shards"),
+    )
+
+    # 4b) una task mapeada por shard de char_id
+    if DEFERRABLE_EXTRACT:
+        t_extract_chinfo = DeferrableChinfoShardOperator.partial(
+            task_id="extract_chinfo_to_landing",
+            pool=BLIZZARD_API_POOL,
+        ).expand_kwargs(t_plan_chinfo.output)
+    else:
+        t_extract_chinfo = PythonOperator.partial(
+            task_id="extract_chinfo_to_landing",
+            python_callable=run_job,
+            pool=BLIZZARD_API_POOL,
+        ).expand(op_kwargs=t_plan_chinfo.output.map(chinfo_shard_kwargs))
+
+    # 4c) reduce: une los shards en ch_profile_{fecha}.parquet (+ sub-recursos)
+    t_merge_chinfo = PythonOperator(
+        task_id="merge_chinfo_shards",
+        python_callable=run_job,
+        op_kwargs=job_kwargs("extract_chinfo_to_landing", "merge_chinfo_shards"),
     )
 
     # 5) CARGAR CHINFO -> RAW (DuckDB)
     t_load_chinfo_raw = PythonOperator(
         task_id="load_chinfo_raw_to_db",
-        python_callable=run_load_chinfo_raw_to_db,
+        python_callable=run_job,
+        op_kwargs=job_kwargs("load_chinfo_raw_to_db"),
     )
 
     # 6) CONSTRUIR CHINFO -> CUR (DuckDB)
     t_build_chinfo_cur = PythonOperator(
         task_id="build_chinfo_cur",
-        python_callable=run_build_chinfo_cur,
+        python_callable=run_job,
+        op_kwargs=job_kwargs("build_chinfo_cur"),
+    )
+
+    # 6b) AGREGADOS DIARIOS DEL LEADERBOARD (DuckDB)
+    t_build_leaderboard_summary = PythonOperator(
+        task_id="build_leaderboard_summary",
+        python_callable=run_job,
+        op_kwargs=job_kwargs("build_leaderboard_summary"),
     )
 
     # 7) CARGA / REFRESH DEL MODELO EN REDSHIFT
     t_load_redshift = PythonOperator(
         task_id="load_redshift_model",
-        python_callable=run_load_warehouse,
-        op_kwargs={
-            "processing_date": "{{ ds_nodash }}",
-        },
+        python_callable=run_job,
+        op_kwargs=job_kwargs(
+            "load_warehouse_redshift",
+            "main",
+            processing_date="{{ ds_nodash }}",
+        ),
+    )
+
+    # 8) COMPACTACIÓN + RETENCIÓN DE LANDING (particiones por temporada / mes)
+    t_compact_landing = PythonOperator(
+        task_id="compact_landing",
+        python_callable=run_job,
+        op_kwargs=job_kwargs(
+            "compact_landing",
+            processing_date="{{ ds_nodash }}",
+        ),
     )
 
     # ---------- Dependencias ----------
 
     t_set_blizzard_env >> t_extract_leaderboard >> t_load_leaderboard_raw >> t_build_leaderboard_cur
 
-    t_build_leaderboard_cur >> t_extract_chinfo >> t_load_chinfo_raw >> t_build_chinfo_cur
+    t_build_leaderboard_cur >> t_build_leaderboard_history >> t_plan_chinfo
+
+    t_plan_chinfo >> t_extract_chinfo >> t_merge_chinfo >> t_load_chinfo_raw >> t_build_chinfo_cur
 
-    t_build_chinfo_cur >> t_load_redshift
+    t_build_chinfo_cur >> t_build_leaderboard_summary >> t_load_redshift >> t_compact_landing
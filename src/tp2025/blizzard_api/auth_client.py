@@ -4,9 +4,10 @@ from pathlib import Path
 from typing import Any, Dict, Optional
 
 import requests
-from dotenv import load_dotenv
 
-load_dotenv()
+from tp2025.config import load_env
+
+load_env()
 
 TOKEN_FILE = Path.cwd() / ".blizzard_access_token"
 
@@ -16,6 +17,9 @@ class BlizzardAuthClient:
     client_id: str
     client_secret: str
     region: str = "us"
+    # Archivo donde se persiste el token (None = TOKEN_FILE). El pool de
+    # credenciales usa un archivo por client id.
+    token_file: Optional[Path] = None
 
     def get_token(self) -> str:
         """
@@ -34,7 +38,7 @@ class BlizzardAuthClient:
         token = data["access_token"]
 
         # Persistimos el token en un archivo de texto plano
-        TOKEN_FILE.write_text(token)
+        (self.token_file or TOKEN_FILE).write_text(token)
 
         return token
 
@@ -47,12 +51,13 @@ def get_default_auth_client() -> BlizzardAuthClient:
     )
 
 
-def load_token_from_file() -> Optional[str]:
+def load_token_from_file(path: Optional[Path] = None) -> Optional[str]:
     """
-    Devuelve el token guardado en el archivo local, si existe.
+    Devuelve el token guardado en el archivo local (por defecto TOKEN_FILE), si existe.
     No valida expiración ni nada sofisticado: es literal lo que haya en el archivo.
     """
-    if not TOKEN_FILE.exists():
+    path = path or TOKEN_FILE
+    if not path.exists():
         return None
-    token = TOKEN_FILE.read_text().strip()
+    token = path.read_text().strip()
     return token or None
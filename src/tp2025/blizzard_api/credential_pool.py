@@ -0,0 +1,265 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Deque, Iterator, List, Optional
+
+import requests
+
+from tp2025.blizzard_api import auth_client
+from tp2025.blizzard_api.auth_client import BlizzardAuthClient, load_token_from_file
+from tp2025.blizzard_api.rate_limiter import QUOTA_PER_HOUR, api_get
+from tp2025.config import load_env
+
+load_env()
+
+# Varias apps de Battle.net: "id1:secret1,id2:secret2[:peso]". Sin esta
+# variable el pool tiene un solo cliente (BLIZZARD_CLIENT_ID / SECRET).
+CLIENTS_ENV = "BLIZZARD_CLIENTS"
+
+_HOUR = 3600.0
+
+
+@dataclass(frozen=True)
+class ClientCredentials:
+    client_id: str
+    client_secret: str
+    weight: float = 1.0
+
+
+def parse_clients(value: str) -> List[ClientCredentials]:
+    """
+    "id:secret[:peso],id:secret[:peso]" -> credenciales.
+    """
+    clients: List[ClientCredentials] = []
+    for item in value.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        parts = item.split(":")
+        if len(parts) not in (2, 3) or not all(parts[:2]):
+            raise ValueError(f"{CLIENTS_ENV}: entrada inválida (se espera id:secret[:peso])")
+        weight = float(parts[2]) if len(parts) == 3 else 1.0
+        clients.append(ClientCredentials(parts[0], parts[1], weight))
+    return clients
+
+
+def credentials_from_env() -> List[ClientCredentials]:
+    pooled = os.getenv(CLIENTS_ENV)
+    if pooled:
+        return parse_clients(pooled)
+    client_id = os.getenv("BLIZZARD_CLIENT_ID")
+    client_secret = os.getenv("BLIZZARD_CLIENT_SECRET")
+    if client_id and client_secret:
+        return [ClientCredentials(client_id, client_secret)]
+    return []
+
+
+def credential_pool_enabled() -> bool:
+    """
+    True si hay varios clientes configurados: los requests salen del pool.
+    """
+    return bool(os.getenv(CLIENTS_ENV))
+
+
+@dataclass
+class PooledClient:
+    """
+    Un cliente del pool: token propio (archivo propio), uso de la última hora
+    y salud. Un cliente con el secret revocado queda fuera de rotación.
+    """
+
+    credentials: ClientCredentials
+    region: str = "us"
+    token: Optional[str] = None
+    in_flight: int = 0
+    healthy: bool = True
+    last_error: Optional[str] = None
+    _recent: Deque[float] = field(default_factory=deque, repr=False)
+
+    @property
+    def client_id(self) -> str:
+        return self.credentials.client_id
+
+    @property
+    def bucket(self) -> str:
+        # La cuota es por client id (mismo esquema que rate_limiter.default_bucket_key)
+        return f"blizzard_api:{self.client_id}"
+
+    @property
+    def token_file(self) -> Path:
+        return auth_client.TOKEN_FILE.with_name(f"{auth_client.TOKEN_FILE.name}_{self.client_id}")
+
+    def used_last_hour(self, now: float) -> int:
+        while self._recent and now - self._recent[0] > _HOUR:
+            self._recent.popleft()
+        return len(self._recent)
+
+    def remaining_quota(self, now: float | None = None) -> float:
+        return max(0.0, QUOTA_PER_HOUR - self.used_last_hour(now or time.time()))
+
+    def load(self, now: float) -> float:
+        """
+        Carga relativa al peso: requests de la última hora + en curso.
+        """
+        return (self.used_last_hour(now) + self.in_flight) / self.credentials.weight
+
+    def mint_token(self) -> str:
+        client = BlizzardAuthClient(
+            client_id=self.credentials.client_id,
+            client_secret=self.credentials.client_secret,
+            region=self.region,
+            token_file=self.token_file,
+        )
+        self.token = client.get_token()
+        return self.token
+
+
+class CredentialPool:
+    """
+    Reparte los requests a la API entre varios clientes de Battle.net
+    (least-loaded ponderado por peso). Cada cliente tiene su token y su
+    bucket en el rate limiter, así la cuota total es la suma de las cuotas.
+    """
+
+    def __init__(self, credentials: List[ClientCredentials], region: str | None = None):
+        if not credentials:
+            raise RuntimeError(
+                "No hay credenciales de Blizzard: configurar BLIZZARD_CLIENTS o "
+                "BLIZZARD_CLIENT_ID / BLIZZARD_CLIENT_SECRET."
+            )
+        region = region or os.getenv("BLIZZARD_REGION", "us")
+        self.clients = [PooledClient(c, region) for c in credentials]
+        self._lock = threading.Lock()
+        # serializa la obtención de tokens (evita pedir N tokens del mismo cliente a la vez)
+        self._token_lock = threading.Lock()
+
+    def healthy_clients(self) -> List[PooledClient]:
+        return [c for c in self.clients if c.healthy]
+
+    def _ensure_token(self, client: PooledClient) -> Optional[str]:
+        with self._token_lock:
+            if client.token is None and client.healthy:
+                client.token = load_token_from_file(client.token_file)
+            if client.token is None and client.healthy:
+                self._refresh(client)
+            return client.token
+
+    def _refresh(self, client: PooledClient) -> None:
+        """
+        Pide un token nuevo. Si las credenciales son rechazadas (secret
+        revocado / app borrada) el cliente sale de rotación.
+        """
+        try:
+            client.mint_token()
+        except requests.HTTPError as exc:
+            status = exc.response.status_code if exc.response is not None else None
+            if status in (400, 401, 403):
+                self.mark_unhealthy(client, f"credenciales rechazadas ({status})")
+                return
+            raise
+
+    def mark_unhealthy(self, client: PooledClient, reason: str) -> None:
+        with self._lock:
+            client.healthy = False
+            client.last_error = reason
+            client.token = None
+        print(f"[credential_pool] Cliente {client.client_id[:6]}… fuera de rotación: {reason}")
+
+    @contextmanager
+    def lease(self) -> Iterator[PooledClient]:
+        """
+        El cliente menos cargado (con token válido) para un request.
+        """
+        while True:
+            with self._lock:
+                candidates = self.healthy_clients()
+                if not candidates:
+                    errors = {c.client_id[:6]: c.last_error for c in self.clients}
+                    raise RuntimeError(f"Ningún cliente de Blizzard disponible: {errors}")
+                now = time.time()
+                client = min(candidates, key=lambda c: c.load(now))
+                client.in_flight += 1
+            if self._ensure_token(client) is not None:
+                break
+            with self._lock:
+                client.in_flight -= 1
+
+        try:
+            yield client
+        finally:
+            with self._lock:
+                client.in_flight -= 1
+                client._recent.append(time.time())
+
+    def token(self) -> str:
+        """
+        Un token válido cualquiera (para llamadas sueltas, p.ej. game data).
+        """
+        with self.lease() as client:
+            return client.token  # type: ignore[return-value]
+
+    def get(self, url: str, *, session: Any = None, **kwargs: Any) -> requests.Response:
+        """
+        GET a la API con el cliente menos cargado, pasando por su bucket del
+        rate limiter. Ante un 401 se renueva el token una vez; si el cliente
+        no puede renovar, queda fuera y el request sale por otro.
+        """
+        headers = dict(kwargs.pop("headers", None) or {})
+        while True:
+            with self.lease() as client:
+                for attempt in range(2):
+                    headers["Authorization"] = f"Bearer {client.token}"
+                    resp = api_get(url, session=session, bucket=client.bucket, headers=headers, **kwargs)
+                    if resp.status_code != 401 or attempt == 1:
+                        return resp
+                    self._refresh(client)
+                    if not client.healthy:
+                        break
+
+    def stats(self) -> List[dict]:
+        now = time.time()
+        return [
+            {
+                "client_id": c.client_id,
+                "healthy": c.healthy,
+                "in_flight": c.in_flight,
+                "used_last_hour": c.used_last_hour(now),
+                "remaining_quota": c.remaining_quota(now),
+                "last_error": c.last_error,
+            }
+            for c in self.clients
+        ]
+
+
+_default_pool: Optional[CredentialPool] = None
+_default_lock = threading.Lock()
+
+
+def get_credential_pool() -> CredentialPool:
+    """
+    Pool del proceso, armado desde las variables de entorno.
+    """
+    global _default_pool
+    with _default_lock:
+        if _default_pool is None:
+            _default_pool = CredentialPool(credentials_from_env())
+        return _default_pool
+
+
+def blizzard_get(url: str, token: str | None = None, *, session: Any = None, **kwargs: Any) -> requests.Response:
+    """
+    GET autenticado a la API. Con BLIZZARD_CLIENTS sale por el pool (el token
+    del parámetro no se usa); si no, con el token dado. En ambos casos pasa
+    por el rate limiter.
+    """
+    if credential_pool_enabled():
+        return get_credential_pool().get(url, session=session, **kwargs)
+    headers = dict(kwargs.pop("headers", None) or {})
+    headers["Authorization"] = f"Bearer {token}"
+    return api_get(url, session=session, headers=headers, **kwargs)
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import json
+import os
+from functools import lru_cache
+from typing import Any, Callable, List, Optional, TypedDict
+
+from tp2025.config import load_env
+
+load_env()
+
+# auto: msgspec si está instalado, si no orjson, si no json de la stdlib.
+# Los decoders rápidos son opcionales: pip install ".[fast-json]"
+BACKEND = os.getenv("BLIZZARD_JSON_BACKEND", "auto")
+BACKENDS = ("msgspec", "orjson", "json")
+
+
+# ===== Esquemas =====
+#
+# Sólo los campos que leen normalize_leaderboard_entries / normalize_profile_row
+# (y los hrefs de sub-recursos del perfil).
+# Con msgspec el resto del payload (keys, ids, guild, realm, títulos, ...) se
+# saltea sin construir objetos y los tipos se validan al decodificar; el
+# resultado son dicts comunes, así los normalizadores no cambian.
+# Con orjson / json se decodifica el payload completo, sin validar.
+
+
+class _Named(TypedDict, total=False):
+    name: Optional[str]
+
+
+class _Link(TypedDict, total=False):
+    href: Optional[str]
+
+
+class _Realm(TypedDict, total=False):
+    slug: Optional[str]
+
+
+class _LeaderboardCharacter(TypedDict, total=False):
+    id: Optional[int]
+    name: Optional[str]
+    realm: Optional[_Realm]
+
+
+class _Faction(TypedDict, total=False):
+    type: Optional[str]
+
+
+class _MatchStatistics(TypedDict, total=False):
+    played: Optional[int]
+    won: Optional[int]
+    lost: Optional[int]
+
+
+class LeaderboardEntry(TypedDict, total=False):
+    character: Optional[_LeaderboardCharacter]
+    faction: Optional[_Faction]
+    rank: Optional[int]
+    rating: Optional[int]
+    season_match_statistics: Optional[_MatchStatistics]
+
+
+class LeaderboardPayload(TypedDict, total=False):
+    entries: List[LeaderboardEntry]
+
+
+class ProfilePayload(TypedDict, total=False):
+    id: Optional[int]
+    name: Optional[str]
+    faction: Optional[_Named]
+    character_class: Optional[_Named]
+    active_spec: Optional[_Named]
+    average_item_level: Optional[int]
+    equipped_item_level: Optional[int]
+    # hrefs que sigue profile_resources.plan_profile_resources
+    equipment: Optional[_Link]
+    pvp_summary: Optional[_Link]
+    specializations: Optional[_Link]
+
+
+# ===== Backends =====
+
+def available_backends() -> List[str]:
+    found = []
+    for name in BACKENDS:
+        try:
+            __import__(name)
+        except ImportError:
+            continue
+        found.append(name)
+    return found
+
+
+@lru_cache(maxsize=None)
+def resolve_backend(name: str = BACKEND) -> str:
+    if name == "auto":
+        return available_backends()[0]
+    if name not in BACKENDS:
+        raise ValueError(f"BLIZZARD_JSON_BACKEND desconocido: {name!r}")
+    if name not in available_backends():
+        raise ImportError(
+            f"BLIZZARD_JSON_BACKEND={name} requiere el paquete {name} (pip install '.[fast-json]')"
+        )
+    return name
+
+
+@lru_cache(maxsize=None)
+def _msgspec_decoder(schema: Any) -> Callable[[bytes], Any]:
+    import msgspec  # type: ignore
+
+    # Un Decoder por esquema: el tipo se compila una sola vez
+    return msgspec.json.Decoder(Any if schema is None else schema).decode
+
+
+def _decoder(backend: str, schema: Any) -> Callable[[bytes], Any]:
+    if backend == "msgspec":
+        return _msgspec_decoder(schema)
+    if backend == "orjson":
+        import orjson  # type: ignore
+
+        return orjson.loads
+    return json.loads
+
+
+def decode(content: bytes | str, schema: Any = None, backend: str | None = None) -> Any:
+    """
+    Decodifica un body JSON de la API. Con `schema` (LeaderboardPayload,
+    ProfilePayload) y msgspec, sólo se materializan los campos del esquema.
+
+    Un body inválido (JSON roto o tipo inesperado) sale como ValueError en
+    los tres backends: json.JSONDecodeError, orjson.JSONDecodeError (subclase
+    de la anterior) y msgspec.DecodeError (ValidationError incluida) heredan
+    de ValueError. Otros errores (p.ej. content=None) no se enmascaran.
+    """
+    backend = resolve_backend(backend or BACKEND)
+    return _decoder(backend, schema)(content)
+
+
+def decode_response(resp: Any, schema: Any = None) -> Any:
+    """
+    Como resp.json(), pero por la capa de decodificación (bytes -> objeto sin
+    pasar por el texto decodificado).
+    """
+    return decode(resp.content, schema)
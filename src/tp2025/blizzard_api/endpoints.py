@@ -1,6 +1,11 @@
 from __future__ import annotations
 
 import os
+from urllib.parse import quote
+
+from tp2025.config import load_env
+
+load_env()
 
 DEFAULT_REGION: str = os.getenv("BLIZZARD_REGION", "us")
 DEFAULT_LOCALE: str = os.getenv("BLIZZARD_LOCALE", "en_US")
@@ -9,13 +14,26 @@ DEFAULT_LOCALE: str = os.getenv("BLIZZARD_LOCALE", "en_US")
 DEFAULT_PVP_NAMESPACE: str = os.getenv("BLIZZARD_PVP_NAMESPACE", "dynamic-us")
 # Para character profile:
 DEFAULT_PROFILE_NAMESPACE: str = os.getenv("BLIZZARD_PROFILE_NAMESPACE", "profile-us")
+# Para game data estática (media de items / specs):
+DEFAULT_STATIC_NAMESPACE: str = os.getenv("BLIZZARD_STATIC_NAMESPACE", "static-us")
+
+
+def get_base_url(region: str | None = None) -> str:
+    """
+    Devuelve la base URL de la API de Blizzard para la región dada
+    (por defecto, la configurada).
+    """
+    return f"https://{region or DEFAULT_REGION}.api.blizzard.com"
 
 
-def get_base_url() -> str:
+def get_namespace(kind: str, default: str, region: str | None = None) -> str:
     """
-    Devuelve la base URL de la API de Blizzard para la región configurada.
+    Namespace de la región: el configurado (default) para la región por
+    defecto, {kind}-{region} (ej. dynamic-eu, static-eu) para las demás.
     """
-    return f"https://{DEFAULT_REGION}.api.blizzard.com"
+    if region and region != DEFAULT_REGION:
+        return f"{kind}-{region}"
+    return default
 
 
 # ==========================
@@ -24,6 +42,7 @@ def get_base_url() -> str:
 
 def get_pvp_season_index_url(
     *,
+    region: str | None = None,
     namespace: str | None = None,
     locale: str | None = None,
 ) -> str:
@@ -33,8 +52,8 @@ def get_pvp_season_index_url(
     Ejemplo:
     https://us.api.blizzard.com/data/wow/pvp-season/index?namespace=dynamic-us&locale=en_US
     """
-    base = get_base_url()
-    ns = namespace or DEFAULT_PVP_NAMESPACE
+    base = get_base_url(region)
+    ns = namespace or get_namespace("dynamic", DEFAULT_PVP_NAMESPACE, region)
     loc = locale or DEFAULT_LOCALE
     return f"{base}/data/wow/pvp-season/index?namespace={ns}&locale={loc}"
 
@@ -43,6 +62,7 @@ def get_pvp_leaderboard_url(
     *,
     season_id: int,
     bracket: str,
+    region: str | None = None,
     namespace: str | None = None,
     locale: str | None = None,
 ) -> str:
@@ -51,9 +71,11 @@ def get_pvp_leaderboard_url(
 
     Ejemplo:
     https://us.api.blizzard.com/data/wow/pvp-season/40/pvp-leaderboard/3v3?namespace=dynamic-us&locale=en_US
+
+    Con region (distinta de la configurada) el namespace pasa a dynamic-{region}.
     """
-    base = get_base_url()
-    ns = namespace or DEFAULT_PVP_NAMESPACE
+    base = get_base_url(region)
+    ns = namespace or get_namespace("dynamic", DEFAULT_PVP_NAMESPACE, region)
     loc = locale or DEFAULT_LOCALE
     return (
         f"{base}/data/wow/pvp-season/{season_id}/pvp-leaderboard/{bracket}"
@@ -65,11 +87,19 @@ def get_pvp_leaderboard_url(
 # CHARACTER PROFILE
 # ==========================
 
+def _path_segment(value: str) -> str:
+    """
+    Un segmento de path según RFC 3986: UTF-8 + percent-encoding de todo lo
+    que no sea unreserved (incluida "/"). "lørdnick" -> "l%C3%B8rdnick".
+    """
+    return quote(str(value), safe="")
+
+
 def _normalize_character_name(character_name: str) -> str:
     """
-    La API espera el nombre en minúsculas.
+    La API espera el nombre en minúsculas (y codificado para el path).
     """
-    return character_name.lower()
+    return _path_segment(character_name.lower())
 
 
 def get_character_profile_url(
@@ -91,6 +121,129 @@ def get_character_profile_url(
     char = _normalize_character_name(character_name)
 
     return (
-        f"{base}/profile/wow/character/{realm_slug}/{char}"
+        f"{base}/profile/wow/character/{_path_segment(realm_slug)}/{char}"
+        f"?namespace={ns}&locale={loc}"
+    )
+
+
+
+# ==========================
+# CHARACTER PROFILE: SUB-RECURSOS
+# ==========================
+
+def _get_character_resource_url(
+    *,
+    realm_slug: str,
+    character_name: str,
+    resource: str,
+    namespace: str | None = None,
+    locale: str | None = None,
+) -> str:
+    base = get_base_url()
+    ns = namespace or DEFAULT_PROFILE_NAMESPACE
+    loc = locale or DEFAULT_LOCALE
+    char = _normalize_character_name(character_name)
+
+    return (
+        f"{base}/profile/wow/character/{_path_segment(realm_slug)}/{char}/{resource}"
         f"?namespace={ns}&locale={loc}"
     )
+
+
+def get_character_equipment_url(
+    *,
+    realm_slug: str,
+    character_name: str,
+    namespace: str | None = None,
+    locale: str | None = None,
+) -> str:
+    """
+    /profile/wow/character/{realmSlug}/{characterName}/equipment
+    """
+    return _get_character_resource_url(
+        realm_slug=realm_slug,
+        character_name=character_name,
+        resource="equipment",
+        namespace=namespace,
+        locale=locale,
+    )
+
+
+def get_character_pvp_summary_url(
+    *,
+    realm_slug: str,
+    character_name: str,
+    namespace: str | None = None,
+    locale: str | None = None,
+) -> str:
+    """
+    /profile/wow/character/{realmSlug}/{characterName}/pvp-summary
+    """
+    return _get_character_resource_url(
+        realm_slug=realm_slug,
+        character_name=character_name,
+        resource="pvp-summary",
+        namespace=namespace,
+        locale=locale,
+    )
+
+
+def get_character_specializations_url(
+    *,
+    realm_slug: str,
+    character_name: str,
+    namespace: str | None = None,
+    locale: str | None = None,
+) -> str:
+    """
+    /profile/wow/character/{realmSlug}/{characterName}/specializations
+    """
+    return _get_character_resource_url(
+        realm_slug=realm_slug,
+        character_name=character_name,
+        resource="specializations",
+        namespace=namespace,
+        locale=locale,
+    )
+
+
+def get_item_media_url(
+    *,
+    item_id: int,
+    namespace: str | None = None,
+    locale: str | None = None,
+) -> str:
+    """
+    /data/wow/media/item/{itemId}
+    """
+    base = get_base_url()
+    ns = namespace or DEFAULT_STATIC_NAMESPACE
+    loc = locale or DEFAULT_LOCALE
+    return f"{base}/data/wow/media/item/{item_id}?namespace={ns}&locale={loc}"
+
+
+def get_playable_specialization_media_url(
+    *,
+    spec_id: int,
+    namespace: str | None = None,
+    locale: str | None = None,
+) -> str:
+    """
+    /data/wow/media/playable-specialization/{specId}
+    """
+    base = get_base_url()
+    ns = namespace or DEFAULT_STATIC_NAMESPACE
+    loc = locale or DEFAULT_LOCALE
+    return f"{base}/data/wow/media/playable-specialization/{spec_id}?namespace={ns}&locale={loc}"
+
+
+def with_locale(href: str, locale: str | None = None) -> str:
+    """
+    Los href que devuelve la API traen namespace pero no locale.
+    Agrega el locale si falta, para que las respuestas sean comparables.
+    """
+    if "locale=" in href:
+        return href
+    loc = locale or DEFAULT_LOCALE
+    sep = "&" if "?" in href else "?"
+    return f"{href}{sep}locale={loc}"
@@ -0,0 +1,284 @@
+from __future__ import annotations
+
+import email.utils
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional, Protocol, Tuple
+
+import requests
+
+from tp2025.config import load_env
+
+load_env()
+
+THIS_FILE = Path(__file__).resolve()
+PROJECT_ROOT = THIS_FILE.parents[3]
+DEFAULT_DB_PATH = PROJECT_ROOT / "data" / "ratelimit" / "blizzard_api.sqlite"
+
+# Cuota de la API por client id: 36.000 requests/hora y ráfagas de hasta 100/s.
+# Se apunta a un poco menos (HEADROOM) para no rozar el límite y comer 429.
+QUOTA_PER_HOUR = float(os.getenv("BLIZZARD_QUOTA_PER_HOUR", "36000"))
+HEADROOM = float(os.getenv("BLIZZARD_RATE_HEADROOM", "0.95"))
+# Tamaño del bucket: cuántos requests pueden salir de golpe tras un rato sin uso
+BURST = float(os.getenv("BLIZZARD_RATE_BURST", "20"))
+
+# sqlite (un host, varios procesos) | redis (varios nodos) | memory (un proceso) | off
+BACKEND = os.getenv("BLIZZARD_RATE_LIMIT_BACKEND", "sqlite")
+DB_PATH = Path(os.getenv("BLIZZARD_RATE_LIMIT_DB", str(DEFAULT_DB_PATH)))
+REDIS_URL = os.getenv("BLIZZARD_RATE_LIMIT_REDIS_URL", "redis://localhost:6379/0")
+
+# Reintentos ante 429 (el bucket se vacía por Retry-After antes de reintentar)
+MAX_THROTTLE_RETRIES = int(os.getenv("BLIZZARD_MAX_THROTTLE_RETRIES", "3"))
+DEFAULT_RETRY_AFTER = 1.0
+
+
+def _reserve(
+    state: Optional[Tuple[float, float]],
+    tokens: float,
+    rate: float,
+    capacity: float,
+    now: float,
+) -> Tuple[Tuple[float, float], float]:
+    """
+    Token bucket con reserva: recarga el bucket hasta `now`, descuenta `tokens`
+    (el saldo puede quedar negativo = turnos ya reservados) y devuelve
+    (nuevo estado, segundos a esperar antes de hacer el request).
+
+    Cada proceso espera exactamente su turno en lugar de reintentar en loop,
+    así el caudal total queda fijo en `rate` sin oscilar.
+    """
+    available, updated_at = state if state is not None else (capacity, now)
+    available = min(capacity, available + max(0.0, now - updated_at) * rate)
+    available -= tokens
+    wait = -available / rate if available < 0 else 0.0
+    return (available, now), wait
+
+
+class RateLimitBackend(Protocol):
+    def reserve(self, key: str, tokens: float, rate: float, capacity: float) -> float:
+        """
+        Reserva `tokens` del bucket `key` y devuelve cuántos segundos esperar.
+        """
+        ...
+
+
+class MemoryBackend:
+    """
+    Bucket en memoria: sólo coordina los threads de un proceso.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+
+    def reserve(self, key: str, tokens: float, rate: float, capacity: float) -> float:
+        with self._lock:
+            state, wait = _reserve(self._buckets.get(key), tokens, rate, capacity, time.time())
+            self._buckets[key] = state
+        return wait
+
+
+class SQLiteBackend:
+    """
+    Bucket compartido por todos los procesos de un host (tasks mapeadas,
+    backfills, varias corridas del DAG) en un archivo SQLite.
+
+    BEGIN IMMEDIATE toma el lock de escritura del archivo: leer + actualizar
+    el bucket es atómico entre procesos.
+    """
+
+    def __init__(self, path: Path = DB_PATH) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS buckets "
+                "(key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        # sqlite3 no comparte conexiones entre threads: una por thread
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            self._local.conn = conn
+        return conn
+
+    def reserve(self, key: str, tokens: float, rate: float, capacity: float) -> float:
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT tokens, updated_at FROM buckets WHERE key = ?", (key,)
+            ).fetchone()
+            (available, updated_at), wait = _reserve(row, tokens, rate, capacity, time.time())
+            conn.execute(
+                "INSERT INTO buckets (key, tokens, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET tokens = excluded.tokens, updated_at = excluded.updated_at",
+                (key, available, updated_at),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return wait
+
+
+# Misma lógica que _reserve, atómica del lado del servidor
+_REDIS_RESERVE_SCRIPT = """
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at')
+local tokens = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local capacity = tonumber(ARGV[3])
+local now = tonumber(ARGV[4])
+local available = tonumber(state[1]) or capacity
+local updated_at = tonumber(state[2]) or now
+available = math.min(capacity, available + math.max(0, now - updated_at) * rate)
+available = available - tokens
+redis.call('HSET', KEYS[1], 'tokens', tostring(available), 'updated_at', tostring(now))
+redis.call('EXPIRE', KEYS[1], 3600)
+if available < 0 then
+  return tostring(-available / rate)
+end
+return '0'
+"""
+
+
+class RedisBackend:
+    """
+    Bucket compartido entre nodos en Redis (o cualquier servidor que hable el
+    protocolo y soporte EVAL). El script corre atómico en el servidor.
+
+    `client` permite pasar una conexión ya armada; si no, se crea desde `url`
+    (el paquete redis es opcional: pip install ".[redis]").
+    Los nodos usan su reloj local: tienen que estar sincronizados (NTP).
+    """
+
+    def __init__(self, url: str = REDIS_URL, client: Any = None) -> None:
+        if client is None:
+            try:
+                import redis  # type: ignore
+            except ImportError as exc:
+                raise ImportError(
+                    "BLIZZARD_RATE_LIMIT_BACKEND=redis requiere el paquete redis (pip install '.[redis]')"
+                ) from exc
+            client = redis.Redis.from_url(url)
+        self.client = client
+
+    def reserve(self, key: str, tokens: float, rate: float, capacity: float) -> float:
+        wait = self.client.eval(
+            _REDIS_RESERVE_SCRIPT, 1, f"ratelimit:{key}", tokens, rate, capacity, time.time()
+        )
+        return float(wait.decode() if isinstance(wait, bytes) else wait)
+
+
+@dataclass
+class RateLimiter:
+    """
+    Token bucket compartido: rate requests/segundo sostenidos, ráfagas de capacity.
+    """
+
+    backend: Optional[RateLimitBackend]
+    rate: float
+    capacity: float
+    key: str = "blizzard_api"
+
+    def acquire(self, tokens: float = 1.0, key: str | None = None) -> float:
+        """
+        Bloquea hasta que haya lugar para `tokens` requests. Devuelve lo esperado.
+        """
+        if self.backend is None:
+            return 0.0
+        wait = self.backend.reserve(key or self.key, tokens, self.rate, self.capacity)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def backoff(self, seconds: float, key: str | None = None) -> None:
+        """
+        Ante un 429: vacía el bucket por `seconds` para todos los procesos que lo comparten.
+        """
+        if self.backend is not None and seconds > 0:
+            self.backend.reserve(key or self.key, seconds * self.rate, self.rate, self.capacity)
+
+
+def make_backend(name: str = BACKEND) -> Optional[RateLimitBackend]:
+    if name == "off":
+        return None
+    if name == "memory":
+        return MemoryBackend()
+    if name == "sqlite":
+        return SQLiteBackend(DB_PATH)
+    if name == "redis":
+        return RedisBackend(REDIS_URL)
+    raise ValueError(f"BLIZZARD_RATE_LIMIT_BACKEND desconocido: {name!r}")
+
+
+def default_bucket_key() -> str:
+    # La cuota es por client id
+    return f"blizzard_api:{os.getenv('BLIZZARD_CLIENT_ID') or 'default'}"
+
+
+_default_limiter: Optional[RateLimiter] = None
+_default_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """
+    Limiter del proceso, armado desde las variables de entorno (uno por proceso).
+    """
+    global _default_limiter
+    with _default_lock:
+        if _default_limiter is None:
+            _default_limiter = RateLimiter(
+                backend=make_backend(BACKEND),
+                rate=QUOTA_PER_HOUR * HEADROOM / 3600,
+                capacity=BURST,
+                key=default_bucket_key(),
+            )
+        return _default_limiter
+
+
+def _retry_after_seconds(resp: requests.Response) -> float:
+    value = resp.headers.get("Retry-After")
+    if not value:
+        return DEFAULT_RETRY_AFTER
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        parsed = email.utils.parsedate_to_datetime(value)
+        return max(0.0, parsed.timestamp() - time.time())
+
+
+def api_get(
+    url: str,
+    *,
+    session: Any = None,
+    limiter: RateLimiter | None = None,
+    bucket: str | None = None,
+    **kwargs: Any,
+) -> requests.Response:
+    """
+    GET a la API de Blizzard pasando por el rate limiter compartido.
+
+    Todos los requests a la API (leaderboard, perfiles, sub-recursos, game
+    data estática) entran por acá. Ante un 429 se vacía el bucket según
+    Retry-After (frena también a los demás procesos) y se reintenta.
+    """
+    limiter = limiter or get_rate_limiter()
+    http = session or requests
+    for attempt in range(MAX_THROTTLE_RETRIES + 1):
+        limiter.acquire(key=bucket)
+        resp = http.get(url, **kwargs)
+        if resp.status_code != 429 or attempt == MAX_THROTTLE_RETRIES:
+            return resp
+        retry_after = _retry_after_seconds(resp)
+        print(f"[rate_limiter] 429 de la API, frenando {retry_after:.1f}s (intento {attempt + 1})")
+        limiter.backoff(retry_after, key=bucket)
+    return resp
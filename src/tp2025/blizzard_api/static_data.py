@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import requests
+
+from tp2025.blizzard_api.endpoints import (
+    DEFAULT_REGION,
+    get_pvp_season_index_url,
+)
+from tp2025.blizzard_api.rate_limiter import api_get
+
+THIS_FILE = Path(__file__).resolve()
+PROJECT_ROOT = THIS_FILE.parents[3]
+CACHE_FILE = PROJECT_ROOT / "data" / "localdb" / "static_game_data.json"
+
+HOUR = 3600
+DAY = 24 * HOUR
+
+# recurso -> (builder de URL, TTL en segundos)
+STATIC_RESOURCES: Dict[str, Tuple[Callable[..., str], int]] = {
+    "pvp_season": (get_pvp_season_index_url, 6 * HOUR),
+}
+
+
+def cache_key(resource: str, region: str | None = None) -> str:
+    """
+    Clave de una entrada del cache: cada región tiene sus propios índices
+    (temporada) y namespace, así que nunca se comparten entre regiones.
+    """
+    return f"{region or DEFAULT_REGION}/{resource}"
+
+
+@dataclass
+class StaticDataCache:
+    """
+    Cache local de game data estática/casi estática de Blizzard.
+
+    - Se persiste como sidecar JSON (data/localdb/static_game_data.json),
+      así cada corrida arranca "caliente" sin pedir nada a la API.
+    - Cada recurso tiene TTL. Vencido el TTL se revalida con If-Modified-Since:
+      un 304 sólo renueva el timestamp, sin re-transferir ni re-parsear el índice.
+    - Si la API falla y hay una copia vieja, se usa la copia vieja.
+    - Las entradas van por región (ver cache_key): con varias BLIZZARD_REGIONS
+      la temporada de una región no se sirve para otra.
+    - Hoy cubre el índice de temporadas PvP (STATIC_RESOURCES); los nombres
+      de realm / clase / spec se codifican en los CUR (ver dimension_encoding).
+    """
+
+    path: Path = CACHE_FILE
+    ttl_overrides: Dict[str, int] = field(default_factory=dict)
+    _entries: Optional[Dict[str, Dict[str, Any]]] = field(default=None, init=False, repr=False)
+
+    # ===== Persistencia =====
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        if self._entries is None:
+            try:
+                self._entries = json.loads(self.path.read_text(encoding="utf-8"))
+            except (FileNotFoundError, ValueError):
+                self._entries = {}
+        return self._entries
+
+    def _save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".json.tmp")
+        tmp_path.write_text(json.dumps(self._load()), encoding="utf-8")
+        os.replace(tmp_path, self.path)
+
+    # ===== Fetch con TTL + revalidación =====
+
+    def _is_fresh(self, entry: Dict[str, Any], ttl: int) -> bool:
+        return time.time() - float(entry.get("fetched_at", 0)) < ttl
+
+    def _get(self, key: str, url: str, ttl: int, token: str | None) -> Dict[str, Any]:
+        entries = self._load()
+        entry = entries.get(key)
+
+        if entry and self._is_fresh(entry, ttl):
+            return entry["payload"]
+
+        if token is None:
+            if entry:
+                return entry["payload"]
+            raise RuntimeError(f"No hay datos cacheados para '{key}' y no se pasó token.")
+
+        headers = {"Authorization": f"Bearer {token}"}
+        if entry and entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+        try:
+            resp = api_get(url, headers=headers, timeout=15)
+            if resp.status_code == 304 and entry:
+                entry["fetched_at"] = time.time()
+            else:
+                resp.raise_for_status()
+                entry = {
+                    "fetched_at": time.time(),
+                    "last_modified": resp.headers.get("Last-Modified"),
+                    "payload": resp.json(),
+                }
+                entries[key] = entry
+        except requests.RequestException as exc:
+            if not entry:
+                raise
+            print(f"[static_data] Usando copia vencida de '{key}': {exc}")
+            return entry["payload"]
+
+        self._save()
+        return entry["payload"]
+
+    def get_index(
+        self, resource: str, token: str | None = None, region: str | None = None
+    ) -> Dict[str, Any]:
+        """
+        Devuelve el payload del índice `resource` (ver STATIC_RESOURCES) de la región.
+        """
+        builder, ttl = STATIC_RESOURCES[resource]
+        return self._get(
+            cache_key(resource, region),
+            builder(region=region),
+            self.ttl_overrides.get(resource, ttl),
+            token,
+        )
+
+    # ===== Lookups =====
+
+    def current_season_id(self, token: str | None = None, region: str | None = None) -> int:
+        payload = self.get_index("pvp_season", token, region)
+        try:
+            return int(payload["current_season"]["id"])
+        except (KeyError, TypeError, ValueError) as exc:
+            raise RuntimeError("No se pudo obtener 'current_season.id' del payload") from exc
+
+
+_default_cache: Optional[StaticDataCache] = None
+
+
+def get_static_data_cache() -> StaticDataCache:
+    """
+    Instancia compartida dentro del proceso (el archivo se lee una sola vez).
+    """
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = StaticDataCache()
+    return _default_cache
+
@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+from typing import Optional
+
+_env_lock = threading.Lock()
+_env_loaded = False
+
+
+def load_env(dotenv_path: Optional[str | Path] = None) -> bool:
+    """
+    Carga el .env una sola vez por proceso.
+
+    - Se puede llamar desde cualquier módulo que lea variables de entorno
+      a nivel módulo: sólo la primera llamada hace trabajo.
+    - python-dotenv se importa acá adentro, así no entra en el import de
+      los módulos que nunca necesitan el .env (p.ej. al parsear el DAG).
+    - Las variables ya presentes en el entorno (Airflow Variables, docker)
+      no se pisan.
+
+    Devuelve True si esta llamada cargó el .env.
+    """
+    global _env_loaded
+    if _env_loaded:
+        return False
+
+    with _env_lock:
+        if _env_loaded:
+            return False
+        _env_loaded = True
+
+        from dotenv import load_dotenv
+
+        load_dotenv(dotenv_path)
+        return True
@@ -0,0 +1,231 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field, replace
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+THIS_FILE = Path(__file__).resolve()
+PROJECT_ROOT = THIS_FILE.parents[3]
+DEFAULT_TEMP_DIR = PROJECT_ROOT / "data" / "localdb" / "duckdb_tmp"
+
+CGROUP_ROOT = Path("/sys/fs/cgroup")
+
+# Fracción del límite de memoria del contenedor que se le da a DuckDB
+# (el resto queda para Python / pandas / el propio worker de Airflow)
+MEMORY_FRACTION = float(os.getenv("DUCKDB_MEMORY_FRACTION", "0.6"))
+# Intervalo de muestreo de duckdb_temporary_files() mientras corre una query
+SPILL_POLL_SECONDS = float(os.getenv("DUCKDB_SPILL_POLL_SECONDS", "0.2"))
+
+# cgroup v1 reporta "sin límite" como un número enorme (PAGE_COUNTER_MAX)
+_CGROUP_V1_UNLIMITED = 1 << 60
+
+_MB = 1024 * 1024
+
+
+def _read_text(path: Path) -> Optional[str]:
+    try:
+        return path.read_text().strip()
+    except OSError:
+        return None
+
+
+def read_cgroup_memory_limit(root: Path = CGROUP_ROOT) -> Optional[int]:
+    """
+    Límite de memoria del contenedor en bytes (cgroup v2 o v1), o None si no hay.
+    """
+    v2 = _read_text(root / "memory.max")
+    if v2 is not None:
+        return None if v2 == "max" else int(v2)
+
+    v1 = _read_text(root / "memory" / "memory.limit_in_bytes")
+    if v1 is not None:
+        value = int(v1)
+        return None if value >= _CGROUP_V1_UNLIMITED else value
+
+    return None
+
+
+def read_cgroup_cpu_limit(root: Path = CGROUP_ROOT) -> Optional[float]:
+    """
+    CPUs asignadas al contenedor (quota / period), o None si no hay límite.
+    """
+    v2 = _read_text(root / "cpu.max")
+    if v2 is not None:
+        quota, _, period = v2.partition(" ")
+        if quota == "max":
+            return None
+        return int(quota) / int(period or "100000")
+
+    quota = _read_text(root / "cpu" / "cpu.cfs_quota_us")
+    period = _read_text(root / "cpu" / "cpu.cfs_period_us")
+    if quota is not None and period is not None and int(quota) > 0:
+        return int(quota) / int(period)
+
+    return None
+
+
+@dataclass(frozen=True)
+class DuckDBResourceProfile:
+    """
+    Settings de recursos que se aplican a cada conexión DuckDB.
+
+    - memory_limit_mb / threads en None: se deja el default de DuckDB.
+    - temp_directory: dónde DuckDB hace spill a disco cuando supera memory_limit.
+    - preserve_insertion_order=False: permite a DuckDB no materializar el orden
+      de inserción (menos memoria en CTAS / COPY grandes; nuestras queries
+      ordenan explícitamente cuando importa).
+    """
+
+    memory_limit_mb: Optional[int] = None
+    threads: Optional[int] = None
+    temp_directory: Path = DEFAULT_TEMP_DIR
+    max_temp_directory_size: Optional[str] = None
+    preserve_insertion_order: bool = False
+    source: Dict[str, str] = field(default_factory=dict, compare=False)
+
+    def settings(self) -> Dict[str, str]:
+        out: Dict[str, str] = {
+            "temp_directory": str(self.temp_directory),
+            "preserve_insertion_order": "true" if self.preserve_insertion_order else "false",
+        }
+        if self.memory_limit_mb is not None:
+            out["memory_limit"] = f"{self.memory_limit_mb}MB"
+        if self.threads is not None:
+            out["threads"] = str(self.threads)
+        if self.max_temp_directory_size is not None:
+            out["max_temp_directory_size"] = self.max_temp_directory_size
+        return out
+
+    def apply(self, conn) -> None:
+        self.temp_directory.mkdir(parents=True, exist_ok=True)
+        for name, value in self.settings().items():
+            conn.execute(f"SET {name} = '{value}';")
+
+    def split(self, n_workers: int, worker_id: str) -> "DuckDBResourceProfile":
+        """
+        Perfil para uno de n_workers procesos con su propia DuckDB (p.ej. backfill):
+        reparte memoria y threads y usa un subdirectorio de spill propio.
+        """
+        n_workers = max(1, n_workers)
+        return replace(
+            self,
+            memory_limit_mb=None if self.memory_limit_mb is None else max(64, self.memory_limit_mb // n_workers),
+            threads=None if self.threads is None else max(1, self.threads // n_workers),
+            temp_directory=self.temp_directory / f"worker_{worker_id}",
+        )
+
+
+def detect_profile(cgroup_root: Path = CGROUP_ROOT) -> DuckDBResourceProfile:
+    """
+    Arma el perfil desde config explícita (env) o, si no hay, desde los límites
+    del cgroup del contenedor.
+
+    Variables de entorno:
+      - DUCKDB_MEMORY_LIMIT: en MB (p.ej. "2048").
+      - DUCKDB_THREADS
+      - DUCKDB_TEMP_DIR
+      - DUCKDB_MAX_TEMP_SIZE: tope del spill (p.ej. "20GB").
+      - DUCKDB_MEMORY_FRACTION: fracción del límite del cgroup (default 0.6).
+    """
+    source: Dict[str, str] = {}
+
+    memory_limit_mb: Optional[int] = None
+    if os.getenv("DUCKDB_MEMORY_LIMIT"):
+        memory_limit_mb = int(os.environ["DUCKDB_MEMORY_LIMIT"])
+        source["memory_limit"] = "env"
+    else:
+        cgroup_bytes = read_cgroup_memory_limit(cgroup_root)
+        if cgroup_bytes is not None:
+            memory_limit_mb = max(64, int(cgroup_bytes * MEMORY_FRACTION) // _MB)
+            source["memory_limit"] = "cgroup"
+
+    threads: Optional[int] = None
+    if os.getenv("DUCKDB_THREADS"):
+        threads = int(os.environ["DUCKDB_THREADS"])
+        source["threads"] = "env"
+    else:
+        cpus = read_cgroup_cpu_limit(cgroup_root)
+        if cpus is not None:
+            threads = max(1, int(cpus))
+            source["threads"] = "cgroup"
+
+    temp_dir = Path(os.getenv("DUCKDB_TEMP_DIR") or DEFAULT_TEMP_DIR)
+
+    return DuckDBResourceProfile(
+        memory_limit_mb=memory_limit_mb,
+        threads=threads,
+        temp_directory=temp_dir,
+        max_temp_directory_size=os.getenv("DUCKDB_MAX_TEMP_SIZE") or None,
+        source=source,
+    )
+
+
+@lru_cache(maxsize=1)
+def get_resource_profile() -> DuckDBResourceProfile:
+    """
+    Perfil del proceso (se detecta una vez).
+    """
+    profile = detect_profile()
+    print(f"[duckdb_resources] Perfil: {profile.settings()} (origen: {profile.source or 'defaults'})")
+    return profile
+
+
+# ===== Spill =====
+
+@dataclass
+class SpillStats:
+    label: str
+    peak_bytes: int = 0
+    elapsed_s: float = 0.0
+
+    @property
+    def peak_mb(self) -> float:
+        return self.peak_bytes / _MB
+
+
+def _temp_bytes(cursor) -> int:
+    return int(cursor.execute("SELECT COALESCE(SUM(size), 0) FROM duckdb_temporary_files();").fetchone()[0])
+
+
+@contextmanager
+def track_spill(conn, label: str, poll_seconds: float = SPILL_POLL_SECONDS) -> Iterator[SpillStats]:
+    """
+    Mide cuánto spill a disco hace DuckDB mientras corre el bloque.
+
+    Un thread muestrea duckdb_temporary_files() desde un cursor propio (otra
+    conexión a la misma base, así no espera a la query en curso) y guarda el pico.
+    Al salir imprime el resultado si hubo spill.
+    """
+    stats = SpillStats(label)
+    stop = threading.Event()
+    cursor = conn.cursor()
+
+    def _poll() -> None:
+        while True:
+            try:
+                stats.peak_bytes = max(stats.peak_bytes, _temp_bytes(cursor))
+            except Exception:  # la base puede estar cerrándose; no interrumpe la query
+                pass
+            if stop.wait(poll_seconds):
+                return
+
+    poller = threading.Thread(target=_poll, name=f"spill-{label}", daemon=True)
+    started = time.perf_counter()
+    poller.start()
+    try:
+        yield stats
+    finally:
+        stop.set()
+        poller.join()
+        stats.elapsed_s = time.perf_counter() - started
+        cursor.close()
+        if stats.peak_bytes:
+            print(
+                f"[duckdb_resources] {label}: spill a disco pico {stats.peak_mb:.1f} MB "
+                f"en {stats.elapsed_s:.1f}s"
+            )
@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import os
+import shutil
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import pandas as pd
+
+
+THIS_FILE = Path(__file__).resolve()
+PROJECT_ROOT = THIS_FILE.parents[3]
+LANDING_DIR = PROJECT_ROOT / "data" / "landing"
+CHECKPOINT_DIR = LANDING_DIR / "_checkpoints"
+
+CheckpointKey = Tuple[str, str]
+
+
+def make_checkpoint_key(realm_slug: str, char_name: str) -> CheckpointKey:
+    """
+    Clave de un personaje ya extraído: (realm_slug, char_name en minúsculas).
+    """
+    return str(realm_slug), str(char_name).lower()
+
+
+@dataclass
+class ProfileCheckpoint:
+    """
+    Checkpoint de la extracción de perfiles para una fecha de proceso.
+
+    - Cada chunk de perfiles se escribe como un parquet propio (part_XXXXX.parquet).
+    - Después de escribir el chunk se appendean sus claves a completed.log.
+    - Si el proceso muere, una nueva corrida lee completed.log y sólo
+      pide a la API los personajes que faltan.
+    - shard: extracción repartida en varias tasks; cada shard tiene su propio
+      directorio (no comparten log ni numeración de chunks).
+    """
+
+    processing_date: str
+    root_dir: Path = CHECKPOINT_DIR
+    shard: Optional[str] = None
+
+    @property
+    def chunk_dir(self) -> Path:
+        name = f"ch_profile_{self.processing_date}"
+        if self.shard is not None:
+            name += f"_shard{self.shard}"
+        return self.root_dir / name
+
+    @classmethod
+    def shard_checkpoints(
+        cls, processing_date: str, root_dir: Path = CHECKPOINT_DIR
+    ) -> List["ProfileCheckpoint"]:
+        """
+        Checkpoints de los shards de una fecha que dejaron chunks en disco.
+        """
+        prefix = f"ch_profile_{processing_date}_shard"
+        if not root_dir.exists():
+            return []
+        return [
+            cls(processing_date, root_dir, shard=p.name[len(prefix):])
+            for p in sorted(root_dir.glob(f"{prefix}*"))
+            if p.is_dir()
+        ]
+
+    @property
+    def log_path(self) -> Path:
+        return self.chunk_dir / "completed.log"
+
+    def completed_keys(self) -> Set[CheckpointKey]:
+        """
+        Devuelve las claves (realm_slug, char_name) ya persistidas.
+        Ignora una posible última línea truncada por un corte abrupto.
+        """
+        if not self.log_path.exists():
+            return set()
+
+        keys: Set[CheckpointKey] = set()
+        for line in self.log_path.read_text(encoding="utf-8").splitlines():
+            parts = line.split("\t")
+            if len(parts) != 2 or not all(parts):
+                continue
+            keys.add(make_checkpoint_key(parts[0], parts[1]))
+        return keys
+
+    def chunk_paths(self) -> List[Path]:
+        if not self.chunk_dir.exists():
+            return []
+        return sorted(self.chunk_dir.glob("part_*.parquet"))
+
+    def write_chunk(
+        self,
+        df: pd.DataFrame,
+        keys: Iterable[CheckpointKey],
+        extra: Optional[Dict[str, pd.DataFrame]] = None,
+    ) -> Path:
+        """
+        Persiste un chunk de perfiles y registra sus claves como completadas.
+
+        extra: datasets adicionales del mismo chunk (sub-recursos del perfil),
+        que se guardan como {nombre}-part_XXXXX.parquet.
+
+        Los parquet se escriben primero (vía archivo temporal + rename) y recién
+        después se registran las claves: el log nunca apunta a datos inexistentes.
+        """
+        self.chunk_dir.mkdir(parents=True, exist_ok=True)
+
+        index = len(self.chunk_paths())
+        for name, extra_df in (extra or {}).items():
+            self._write_parquet(extra_df, self.chunk_dir / f"{name}-part_{index:05d}.parquet")
+
+        path = self.chunk_dir / f"part_{index:05d}.parquet"
+        self._write_parquet(df, path)
+
+        lines = "".join(f"{realm}\t{name}\n" for realm, name in keys)
+        with self.log_path.open("a", encoding="utf-8") as fh:
+            fh.write(lines)
+            fh.flush()
+            os.fsync(fh.fileno())
+
+        return path
+
+    @staticmethod
+    def _write_parquet(df: pd.DataFrame, path: Path) -> None:
+        tmp_path = path.with_suffix(".parquet.tmp")
+        df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, path)
+
+    def merge_extra(self, name: str) -> pd.DataFrame:
+        """
+        Une los chunks de un dataset adicional (por ejemplo "equipment").
+        """
+        paths = sorted(self.chunk_dir.glob(f"{name}-part_*.parquet")) if self.chunk_dir.exists() else []
+        if not paths:
+            return pd.DataFrame()
+        df = pd.concat([pd.read_parquet(p) for p in paths], ignore_index=True)
+        return df.drop_duplicates(ignore_index=True)
+
+    def extra_names(self) -> List[str]:
+        if not self.chunk_dir.exists():
+            return []
+        return sorted({p.name.split("-part_")[0] for p in self.chunk_dir.glob("*-part_*.parquet")})
+
+    def merge_chunks(self) -> pd.DataFrame:
+        """
+        Une todos los chunks en un único DataFrame.
+        Si un chunk se reescribió tras un corte entre parquet y log,
+        se queda con la última versión de cada personaje.
+        """
+        paths = self.chunk_paths()
+        if not paths:
+            return pd.DataFrame()
+
+        df = pd.concat([pd.read_parquet(p) for p in paths], ignore_index=True)
+        dedup_key = df["realm_slug"].astype(str) + "\t" + df["name"].astype(str).str.lower()
+        return df.loc[~dedup_key.duplicated(keep="last")].reset_index(drop=True)
+
+    def clear(self) -> None:
+        """
+        Borra chunks y log una vez que el parquet final quedó en landing.
+        """
+        shutil.rmtree(self.chunk_dir, ignore_errors=True)
@@ -0,0 +1,235 @@
+from __future__ import annotations
+
+import fcntl
+import json
+import os
+import re
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+THIS_FILE = Path(__file__).resolve()
+PROJECT_ROOT = THIS_FILE.parents[3]
+LANDING_DIR = PROJECT_ROOT / "data" / "landing"
+
+MANIFEST_NAME = "_manifest.json"
+LOCK_NAME = "_manifest.lock"
+COMPACTED_DIR_NAME = "compacted"
+
+# Archivos diarios de landing: nombre -> (dataset, fecha_proceso)
+DAILY_FILE_PATTERNS = (
+    # pvp_leaderboard (región principal) o pvp_leaderboard_{region} (regiones extra)
+    re.compile(r"^(?P<dataset>pvp_leaderboard(?:_[a-z]{2})?)_s\d+_.+_(?P<date>\d{8})\.parquet$"),
+    # leaderboard en modo CDC (sólo cambios contra el día anterior)
+    re.compile(r"^(?P<dataset>pvp_leaderboard)_cdc_s\d+_.+_(?P<date>\d{8})\.parquet$"),
+    re.compile(r"^(?P<dataset>ch_[a-z_]+)_(?P<date>\d{8})\.parquet$"),
+)
+
+
+@dataclass(frozen=True)
+class LandingFile:
+    """
+    Un archivo de landing con datos de un día.
+
+    compacted=True: el archivo es una partición compactada con varios días
+    (columna fecha_proceso); hay que filtrar por processing_date al leer.
+    """
+
+    path: Path
+    processing_date: str
+    compacted: bool = False
+
+
+def parse_daily_filename(name: str) -> Optional[tuple]:
+    """
+    (dataset, fecha_proceso) de un archivo diario de landing, o None.
+    """
+    for pattern in DAILY_FILE_PATTERNS:
+        match = pattern.match(name)
+        if match:
+            return match.group("dataset"), match.group("date")
+    return None
+
+
+class LandingManifest:
+    """
+    Índice de landing en data/landing/_manifest.json:
+
+        {"datasets": {dataset: {fecha_proceso: [{"path": ..., "compacted": bool}]}}}
+
+    - Las rutas se guardan relativas a landing_dir.
+    - Encontrar los archivos de un día es un lookup en el dict: no hace falta
+      listar el directorio.
+    - Se escribe a un .tmp y se renombra (nunca queda un manifest a medias).
+    """
+
+    def __init__(self, landing_dir: Path = LANDING_DIR, datasets: Optional[Dict] = None):
+        self.landing_dir = Path(landing_dir)
+        self.datasets: Dict[str, Dict[str, List[Dict]]] = datasets or {}
+
+    @property
+    def path(self) -> Path:
+        return self.landing_dir / MANIFEST_NAME
+
+    @classmethod
+    def load(cls, landing_dir: Path = LANDING_DIR) -> "LandingManifest":
+        path = Path(landing_dir) / MANIFEST_NAME
+        if not path.exists():
+            return cls(landing_dir)
+        data = json.loads(path.read_text(encoding="utf-8"))
+        return cls(landing_dir, data.get("datasets", {}))
+
+    def save(self) -> None:
+        self.landing_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".json.tmp")
+        tmp_path.write_text(
+            json.dumps({"datasets": self.datasets}, indent=1, sort_keys=True),
+            encoding="utf-8",
+        )
+        os.replace(tmp_path, self.path)
+
+    # ===== Lectura =====
+
+    def days(self, dataset: str) -> List[str]:
+        return sorted(self.datasets.get(dataset, {}))
+
+    def files(self, dataset: str, processing_date: str) -> Optional[List[LandingFile]]:
+        """
+        Archivos de un día, o None si el día no está en el manifest.
+        """
+        entries = self.datasets.get(dataset, {}).get(processing_date)
+        if entries is None:
+            return None
+        return [
+            LandingFile(self.landing_dir / e["path"], processing_date, e.get("compacted", False))
+            for e in entries
+        ]
+
+    # ===== Escritura =====
+
+    def _relative(self, path: Path) -> str:
+        path = Path(path)
+        try:
+            return path.resolve().relative_to(self.landing_dir.resolve()).as_posix()
+        except ValueError:
+            return str(path)
+
+    def add(self, dataset: str, processing_date: str, path: Path) -> None:
+        """
+        Registra un archivo diario (idempotente).
+        """
+        entries = self.datasets.setdefault(dataset, {}).setdefault(processing_date, [])
+        rel = self._relative(path)
+        # un día que se vuelve a extraer deja de estar compactado
+        entries[:] = [e for e in entries if not e.get("compacted") and e["path"] != rel]
+        entries.append({"path": rel, "compacted": False})
+        entries.sort(key=lambda e: e["path"])
+
+    def remove(self, dataset: str, processing_date: str, path: Path) -> None:
+        """
+        Saca un archivo diario del día (p.ej. la variante reemplazada al re-extraer).
+        """
+        entries = self.datasets.get(dataset, {}).get(processing_date)
+        if entries is not None:
+            rel = self._relative(path)
+            entries[:] = [e for e in entries if e["path"] != rel]
+
+    def set_compacted(self, dataset: str, processing_date: str, path: Path) -> None:
+        self.datasets.setdefault(dataset, {})[processing_date] = [
+            {"path": self._relative(path), "compacted": True}
+        ]
+
+    def drop_day(self, dataset: str, processing_date: str) -> None:
+        self.datasets.get(dataset, {}).pop(processing_date, None)
+
+    def scan_directory(self) -> int:
+        """
+        Registra los archivos diarios que están en landing_dir pero no en el
+        manifest (p.ej. extraídos antes de que existiera). Devuelve cuántos.
+        """
+        if not self.landing_dir.exists():
+            return 0
+        added = 0
+        for path in sorted(self.landing_dir.iterdir()):
+            parsed = parse_daily_filename(path.name)
+            if not parsed or not path.is_file():
+                continue
+            dataset, processing_date = parsed
+            known = self.files(dataset, processing_date) or []
+            if any(f.compacted for f in known) or path in {f.path for f in known}:
+                continue
+            self.add(dataset, processing_date, path)
+            added += 1
+        return added
+
+
+@contextmanager
+def update_manifest(landing_dir: Path = LANDING_DIR) -> Iterator[LandingManifest]:
+    """
+    load -> modificar -> save con un lock de archivo: las tasks de extracción
+    mapeadas (una por región/bracket o shard) registran archivos en paralelo
+    y sin el lock se pisarían los cambios.
+    """
+    landing_dir = Path(landing_dir)
+    landing_dir.mkdir(parents=True, exist_ok=True)
+    with (landing_dir / LOCK_NAME).open("w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            manifest = LandingManifest.load(landing_dir)
+            yield manifest
+            manifest.save()
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def register_landing_file(
+    dataset: str,
+    processing_date: str,
+    path: Path,
+    landing_dir: Path = LANDING_DIR,
+) -> None:
+    """
+    Agrega un archivo recién escrito al manifest de landing.
+    """
+    with update_manifest(landing_dir) as manifest:
+        manifest.add(dataset, processing_date, path)
+
+
+def discover_landing_files(
+    dataset: str,
+    processing_date: str,
+    landing_dir: Path = LANDING_DIR,
+    fallback_glob: Optional[str] = None,
+) -> List[LandingFile]:
+    """
+    Archivos de landing de un dataset para una fecha.
+
+    Primero el manifest (lookup directo). Si el día no está registrado (landing
+    previo al manifest o escrito a mano), cae a un glob del directorio; del glob
+    sólo se toman los archivos de este dataset (p.ej. no los de otra región).
+    """
+    files = LandingManifest.load(landing_dir).files(dataset, processing_date)
+    if files is not None:
+        return files
+
+    if fallback_glob is None or not Path(landing_dir).exists():
+        return []
+    return [
+        LandingFile(p, processing_date)
+        for p in sorted(Path(landing_dir).glob(fallback_glob))
+        if p.is_file() and (parse_daily_filename(p.name) or (None,))[0] == dataset
+    ]
+
+
+def read_compacted_day(file: LandingFile) -> pd.DataFrame:
+    """
+    Lee sólo las filas de processing_date de una partición compactada.
+    Las particiones están ordenadas por fecha_proceso, así que pyarrow
+    saltea los row groups de otros días por estadísticas.
+    """
+    table = pq.read_table(file.path, filters=[("fecha_proceso", "=", file.processing_date)])
+    return table.to_pandas()
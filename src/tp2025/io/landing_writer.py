@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Tuple
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Defaults de escritura de landing (sobrescribibles por env)
+LANDING_COMPRESSION = os.getenv("LANDING_COMPRESSION", "zstd")
+LANDING_COMPRESSION_LEVEL = int(os.getenv("LANDING_COMPRESSION_LEVEL", "3"))
+LANDING_ROW_GROUP_SIZE = int(os.getenv("LANDING_ROW_GROUP_SIZE", "50000"))
+
+
+@dataclass(frozen=True)
+class LandingWriteOptions:
+    """
+    Cómo se escribe un parquet de landing.
+
+    - compression / compression_level: codec de pyarrow (zstd por defecto).
+    - dictionary_columns: columnas de baja cardinalidad con dictionary encoding;
+      el resto se escribe plano (los nombres / ids no ganan nada con diccionario).
+    - row_group_size: filas por row group. Con min/max por row group, DuckDB
+      saltea los que no matchean el filtro.
+    - sort_by: orden de las filas antes de escribir; las columnas que no estén
+      en el DataFrame se ignoran.
+    """
+
+    compression: str = LANDING_COMPRESSION
+    compression_level: int | None = LANDING_COMPRESSION_LEVEL
+    dictionary_columns: Tuple[str, ...] = ()
+    row_group_size: int = LANDING_ROW_GROUP_SIZE
+    sort_by: Tuple[str, ...] = ()
+    write_statistics: bool = True
+
+    def with_overrides(self, **kwargs) -> "LandingWriteOptions":
+        return replace(self, **kwargs)
+
+
+LEADERBOARD_WRITE_OPTIONS = LandingWriteOptions(
+    dictionary_columns=("slug", "faction", "bracket"),
+    sort_by=("bracket", "rank"),
+)
+
+# Archivos CDC del leaderboard: ya vienen en formato RAW (texto) con la columna op
+LEADERBOARD_CDC_WRITE_OPTIONS = LandingWriteOptions(
+    dictionary_columns=("slug", "faction", "bracket", "s_id", "fecha_proceso", "op"),
+    sort_by=("op",),
+)
+
+PROFILE_WRITE_OPTIONS = LandingWriteOptions(
+    dictionary_columns=("realm_slug", "faction", "class", "spec"),
+    sort_by=("realm_slug", "id"),
+)
+
+RESOURCE_WRITE_OPTIONS = LandingWriteOptions(
+    dictionary_columns=("realm_slug", "slot", "quality", "spec_name", "media_type"),
+    sort_by=("char_id", "media_type", "id"),
+)
+
+
+def _compression_level(options: LandingWriteOptions) -> int | None:
+    # snappy / none no aceptan nivel
+    if options.compression in ("zstd", "gzip", "brotli"):
+        return options.compression_level
+    return None
+
+
+def write_landing_parquet(
+    df: pd.DataFrame,
+    path: Path,
+    options: LandingWriteOptions = LandingWriteOptions(),
+) -> Path:
+    """
+    Escribe un DataFrame a parquet de landing con las opciones dadas.
+
+    Se escribe a un .tmp y se renombra, así un lector nunca ve un parquet a medio escribir.
+    """
+    table = pa.Table.from_pandas(df, preserve_index=False)
+
+    sort_keys = [(c, "ascending") for c in options.sort_by if c in table.column_names]
+    if sort_keys and table.num_rows:
+        table = table.sort_by(sort_keys)
+
+    dictionary = [c for c in options.dictionary_columns if c in table.column_names]
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    pq.write_table(
+        table,
+        tmp_path,
+        compression=options.compression,
+        compression_level=_compression_level(options),
+        use_dictionary=dictionary or False,
+        row_group_size=max(1, options.row_group_size),
+        write_statistics=options.write_statistics,
+    )
+    os.replace(tmp_path, path)
+    return path
@@ -3,6 +3,8 @@ from __future__ import annotations
 import duckdb
 from pathlib import Path
 
+from tp2025.io.duckdb_resources import get_resource_profile
+
 
 THIS_FILE = Path(__file__).resolve()
 PROJECT_ROOT = THIS_FILE.parents[3]
@@ -20,13 +22,16 @@ def get_duckdb_path() -> Path:
     return LOCALDB_DIR / DB_NAME
 
 
-def get_connection():
+def get_connection(read_only: bool = False):
     """
     Devuelve una conexión a DuckDB.
     Si el archivo no existe, DuckDB lo crea automáticamente.
+    read_only=True abre en modo lectura (no toma el lock de escritura del archivo).
+    Aplica el perfil de recursos (memory_limit, threads, spill) de duckdb_resources.
     """
     db_path = get_duckdb_path()
-    conn = duckdb.connect(str(db_path))
+    conn = duckdb.connect(str(db_path), read_only=read_only)
+    get_resource_profile().apply(conn)
     return conn
 
 
@@ -0,0 +1,330 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+import time
+import uuid
+import zlib
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+THIS_FILE = Path(__file__).resolve()
+PROJECT_ROOT = THIS_FILE.parents[3]
+ARCHIVE_DIR = Path(os.getenv("PAYLOAD_ARCHIVE_DIR", str(PROJECT_ROOT / "data" / "archive")))
+
+# Guardar los bodies crudos de la API (0 = sólo la proyección normalizada en landing)
+ARCHIVE_ENABLED = os.getenv("PAYLOAD_ARCHIVE", "1") == "1"
+ZSTD_LEVEL = int(os.getenv("PAYLOAD_ARCHIVE_ZSTD_LEVEL", "10"))
+# Diccionario zstd: se entrena con el primer flush de un endpoint que junte
+# al menos DICT_MIN_SAMPLES payloads (perfiles: miles de JSON casi iguales)
+DICT_SIZE = int(os.getenv("PAYLOAD_ARCHIVE_DICT_SIZE", str(64 * 1024)))
+DICT_MIN_SAMPLES = int(os.getenv("PAYLOAD_ARCHIVE_DICT_MIN_SAMPLES", "100"))
+# Payloads en memoria antes de escribir un segmento
+FLUSH_EVERY = int(os.getenv("PAYLOAD_ARCHIVE_FLUSH_EVERY", "500"))
+
+INDEX_NAME = "index.sqlite"
+
+# Endpoints archivados
+LEADERBOARD_ENDPOINT = "pvp_leaderboard"
+PROFILE_ENDPOINT = "character_profile"
+
+CODEC_ZSTD = "zstd"
+CODEC_ZLIB = "zlib"
+
+
+def _zstd():
+    try:
+        import zstandard  # type: ignore
+    except ImportError:
+        return None
+    return zstandard
+
+
+def leaderboard_key(region: str, season_id: int, bracket: str) -> str:
+    return f"{region}/s{season_id}/{bracket}"
+
+
+def parse_leaderboard_key(key: str) -> Tuple[str, int, str]:
+    region, season, bracket = key.split("/")
+    return region, int(season.lstrip("s")), bracket
+
+
+def profile_key(realm_slug: str, character_name: str) -> str:
+    return f"{realm_slug}/{character_name.lower()}"
+
+
+@dataclass(frozen=True)
+class ArchivedPayload:
+    endpoint: str
+    key: str
+    fetched_at: float
+    processing_date: str
+    body: bytes
+
+
+class PayloadArchive:
+    """
+    Archivo append-only de las respuestas crudas de la API, para reprocesar
+    días pasados (campos nuevos, bugs de normalización) sin volver a pedirlos.
+
+    - Los bodies se comprimen con zstd y un diccionario entrenado por endpoint
+      (el JSON de la API es muy repetitivo); sin el paquete zstandard
+      (pip install ".[archive]") se usa zlib. El codec queda por fila.
+    - Cada flush escribe un segmento nuevo (frames concatenados) en
+      <endpoint>/<fecha>/: nunca se reescribe un archivo, así varios procesos
+      (shards) pueden archivar a la vez.
+    - Índice SQLite por (endpoint, key, fetched_at) con el segmento, offset y
+      largo de cada payload.
+
+    Se archivan el leaderboard y el perfil raíz. Los sub-recursos del perfil
+    (equipment, pvp-summary, specializations y media) no: un replay
+    regenera ch_profile pero no los ch_{recurso}.
+    """
+
+    def __init__(self, root: Path = ARCHIVE_DIR, zstd_level: int = ZSTD_LEVEL) -> None:
+        self.root = Path(root)
+        self.zstd_level = zstd_level
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._pending: List[Tuple[str, str, float, str, bytes]] = []
+        self._dicts: Dict[int, bytes] = {}
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS payloads ("
+                " endpoint TEXT NOT NULL, key TEXT NOT NULL, fetched_at REAL NOT NULL,"
+                " processing_date TEXT NOT NULL, segment TEXT NOT NULL,"
+                " offset INTEGER NOT NULL, length INTEGER NOT NULL, raw_length INTEGER NOT NULL,"
+                " codec TEXT NOT NULL, dict_id INTEGER,"
+                " PRIMARY KEY (endpoint, key, fetched_at))"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS payloads_by_day ON payloads (endpoint, processing_date)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS dictionaries ("
+                " dict_id INTEGER PRIMARY KEY AUTOINCREMENT, endpoint TEXT NOT NULL,"
+                " created_at REAL NOT NULL, data BLOB NOT NULL)"
+            )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.root / INDEX_NAME, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    # ===== Diccionarios =====
+
+    def _dictionary(self, dict_id: int) -> bytes:
+        if dict_id not in self._dicts:
+            with self._connect() as conn:
+                (data,) = conn.execute(
+                    "SELECT data FROM dictionaries WHERE dict_id = ?", (dict_id,)
+                ).fetchone()
+            self._dicts[dict_id] = data
+        return self._dicts[dict_id]
+
+    def current_dictionary(self, endpoint: str) -> Optional[int]:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT MAX(dict_id) FROM dictionaries WHERE endpoint = ?", (endpoint,)
+            ).fetchone()
+        return row[0]
+
+    def train_dictionary(self, endpoint: str, samples: List[bytes], size: int = DICT_SIZE) -> Optional[int]:
+        """
+        Entrena y guarda un diccionario zstd para el endpoint. Los payloads
+        nuevos se comprimen con el último; los viejos siguen con el suyo.
+        """
+        zstd = _zstd()
+        if zstd is None or len(samples) < DICT_MIN_SAMPLES:
+            return None
+        data = zstd.train_dictionary(size, samples).as_bytes()
+        with self._connect() as conn:
+            cur = conn.execute(
+                "INSERT INTO dictionaries (endpoint, created_at, data) VALUES (?, ?, ?)",
+                (endpoint, time.time(), data),
+            )
+        print(f"[payload_archive] Diccionario zstd de {len(data)} bytes para {endpoint} ({len(samples)} muestras)")
+        return cur.lastrowid
+
+    # ===== Escritura =====
+
+    def _compressor(self, dict_id: Optional[int]) -> Callable[[bytes], Tuple[bytes, str]]:
+        """
+        body -> (frame, codec). Se arma una vez por segmento: el ZstdCompressor
+        (con el diccionario ya cargado) se reusa para todos sus payloads.
+        """
+        zstd = _zstd()
+        if zstd is None:
+            return lambda body: (zlib.compress(body, 6), CODEC_ZLIB)
+        dict_data = zstd.ZstdCompressionDict(self._dictionary(dict_id)) if dict_id else None
+        compressor = zstd.ZstdCompressor(level=self.zstd_level, dict_data=dict_data)
+        return lambda body: (compressor.compress(body), CODEC_ZSTD)
+
+    def add(
+        self,
+        endpoint: str,
+        key: str,
+        body: bytes,
+        processing_date: str,
+        fetched_at: float | None = None,
+    ) -> None:
+        """
+        Encola un body crudo (thread-safe). Se escribe en el próximo flush.
+        """
+        with self._lock:
+            self._pending.append((endpoint, key, fetched_at or time.time(), processing_date, body))
+            full = len(self._pending) >= FLUSH_EVERY
+        if full:
+            self.flush()
+
+    def flush(self) -> int:
+        """
+        Escribe lo encolado: un segmento por (endpoint, fecha) + filas del índice.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, []
+        groups: Dict[Tuple[str, str], List[Tuple[str, str, float, str, bytes]]] = {}
+        for item in pending:
+            groups.setdefault((item[0], item[3]), []).append(item)
+
+        for (endpoint, processing_date), items in groups.items():
+            dict_id = self.current_dictionary(endpoint)
+            if dict_id is None:
+                dict_id = self.train_dictionary(endpoint, [item[4] for item in items])
+            self._write_segment(endpoint, processing_date, items, dict_id)
+        return len(pending)
+
+    def _write_segment(
+        self,
+        endpoint: str,
+        processing_date: str,
+        items: List[Tuple[str, str, float, str, bytes]],
+        dict_id: Optional[int],
+    ) -> None:
+        segment = Path(endpoint) / processing_date / f"{int(time.time())}_{os.getpid()}_{uuid.uuid4().hex[:8]}.seg"
+        path = self.root / segment
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        compress = self._compressor(dict_id)
+        rows = []
+        offset = 0
+        with open(path, "wb") as f:
+            for _, key, fetched_at, _, body in items:
+                frame, codec = compress(body)
+                f.write(frame)
+                rows.append((
+                    endpoint, key, fetched_at, processing_date, str(segment), offset,
+                    len(frame), len(body), codec, dict_id if codec == CODEC_ZSTD else None,
+                ))
+                offset += len(frame)
+            f.flush()
+            os.fsync(f.fileno())
+
+        # el segmento queda escrito antes de que el índice lo referencie
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO payloads (endpoint, key, fetched_at, processing_date, segment,"
+                " offset, length, raw_length, codec, dict_id) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+        print(
+            f"[payload_archive] {len(rows)} payloads de {endpoint} ({processing_date}): "
+            f"{sum(r[7] for r in rows) / 1e6:.1f} MB -> {offset / 1e6:.2f} MB"
+        )
+
+    # ===== Lectura (replay) =====
+
+    def _decompress(self, frame: bytes, codec: str, dict_id: Optional[int]) -> bytes:
+        if codec == CODEC_ZLIB:
+            return zlib.decompress(frame)
+        zstd = _zstd()
+        if zstd is None:
+            raise ImportError("El archivo tiene payloads zstd: instalar zstandard (pip install '.[archive]')")
+        dict_data = zstd.ZstdCompressionDict(self._dictionary(dict_id)) if dict_id else None
+        return zstd.ZstdDecompressor(dict_data=dict_data).decompress(frame)
+
+    def iter_day(self, endpoint: str, processing_date: str, latest_only: bool = True) -> Iterator[ArchivedPayload]:
+        """
+        Payloads archivados de un endpoint para una fecha de proceso (por
+        defecto, el último por key), leídos en orden de segmento y offset.
+        """
+        query = (
+            "SELECT key, fetched_at, segment, offset, length, codec, dict_id FROM payloads p"
+            " WHERE endpoint = ? AND processing_date = ?"
+        )
+        if latest_only:
+            query += (
+                " AND fetched_at = (SELECT MAX(fetched_at) FROM payloads q"
+                " WHERE q.endpoint = p.endpoint AND q.key = p.key AND q.processing_date = p.processing_date)"
+            )
+        with self._connect() as conn:
+            rows = conn.execute(query + " ORDER BY segment, offset", (endpoint, processing_date)).fetchall()
+
+        handle = None
+        current = None
+        try:
+            for key, fetched_at, segment, offset, length, codec, dict_id in rows:
+                if segment != current:
+                    if handle is not None:
+                        handle.close()
+                    handle = open(self.root / segment, "rb")
+                    current = segment
+                handle.seek(offset)
+                body = self._decompress(handle.read(length), codec, dict_id)
+                yield ArchivedPayload(endpoint, key, fetched_at, processing_date, body)
+        finally:
+            if handle is not None:
+                handle.close()
+
+    def get(self, endpoint: str, key: str, fetched_at: float | None = None) -> Optional[ArchivedPayload]:
+        """
+        Un payload puntual (el último de la key si no se pasa fetched_at).
+        """
+        query = (
+            "SELECT fetched_at, processing_date, segment, offset, length, codec, dict_id"
+            " FROM payloads WHERE endpoint = ? AND key = ?"
+        )
+        params: Tuple = (endpoint, key)
+        if fetched_at is not None:
+            query += " AND fetched_at = ?"
+            params += (fetched_at,)
+        with self._connect() as conn:
+            row = conn.execute(query + " ORDER BY fetched_at DESC LIMIT 1", params).fetchone()
+        if row is None:
+            return None
+        fetched_at, processing_date, segment, offset, length, codec, dict_id = row
+        with open(self.root / segment, "rb") as f:
+            f.seek(offset)
+            body = self._decompress(f.read(length), codec, dict_id)
+        return ArchivedPayload(endpoint, key, fetched_at, processing_date, body)
+
+    def days(self, endpoint: str) -> List[str]:
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT DISTINCT processing_date FROM payloads WHERE endpoint = ? ORDER BY 1", (endpoint,)
+            ).fetchall()
+        return [r[0] for r in rows]
+
+
+_default_archive: Optional[PayloadArchive] = None
+_default_lock = threading.Lock()
+
+
+def get_payload_archive() -> Optional[PayloadArchive]:
+    """
+    Archivo del proceso, o None si PAYLOAD_ARCHIVE=0.
+    """
+    global _default_archive
+    if not ARCHIVE_ENABLED:
+        return None
+    with _default_lock:
+        if _default_archive is None:
+            _default_archive = PayloadArchive(ARCHIVE_DIR)
+        return _default_archive
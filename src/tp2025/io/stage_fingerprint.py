@@ -0,0 +1,287 @@
+from __future__ import annotations
+
+import hashlib
+import inspect
+import json
+import os
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+import duckdb
+
+from tp2025.io.load_localdb import get_connection
+
+THIS_FILE = Path(__file__).resolve()
+PROJECT_ROOT = THIS_FILE.parents[3]
+FINGERPRINT_DIR = PROJECT_ROOT / "data" / "fingerprints"
+
+# STAGE_CACHE=0 fuerza a correr todas las etapas (ignora los fingerprints)
+STAGE_CACHE = os.getenv("STAGE_CACHE", "1") == "1"
+
+_CHUNK = 1 << 20
+_PACKAGE = __name__.split(".")[0]
+
+
+# ===== Componentes del fingerprint =====
+
+def file_digest(path: Path) -> str:
+    """
+    sha256 del contenido del archivo.
+    """
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_CHUNK), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def files_fingerprint(files: Iterable[Any]) -> Dict[str, str]:
+    """
+    nombre de archivo -> hash del contenido (paths o LandingFile). Una partición
+    compactada entra entera (si cambia otro día de la partición, la etapa vuelve a correr).
+    """
+    # sin importar landing_manifest: arrastra pandas a los jobs que sólo usan DuckDB
+    paths = sorted({Path(getattr(f, "path", f)) for f in files})
+    return {f"file:{p.name}": file_digest(p) for p in paths}
+
+
+@dataclass(frozen=True)
+class TableSlice:
+    """
+    Una tabla de DuckDB, o el slice de un día (WHERE fecha_proceso = ?).
+    """
+
+    table: str
+    where: str = ""
+    params: Sequence[Any] = ()
+
+
+def day_slice(table: str, processing_date: str, column: str = "fecha_proceso") -> TableSlice:
+    return TableSlice(table, f"WHERE {column} = ?", (processing_date,))
+
+
+def table_checksum(conn, table_slice: TableSlice) -> str:
+    """
+    "filas:suma de hashes por fila" del slice (independiente del orden de las
+    filas), o "missing" si la tabla no existe.
+    """
+    try:
+        n_rows, total = conn.execute(
+            f"SELECT COUNT(*), COALESCE(SUM(hash(t)::HUGEINT), 0) "
+            f"FROM {table_slice.table} t {table_slice.where};",
+            list(table_slice.params),
+        ).fetchone()
+    except duckdb.CatalogException:
+        return "missing"
+    return f"{n_rows}:{total}"
+
+
+def table_checksums(slices: Dict[str, TableSlice], conn=None) -> Dict[str, str]:
+    """
+    nombre -> checksum de cada slice, con una sola conexión a DuckDB.
+    """
+    own_conn = conn is None
+    conn = conn or get_connection()
+    try:
+        return {f"table:{name}": table_checksum(conn, s) for name, s in slices.items()}
+    finally:
+        if own_conn:
+            conn.close()
+
+
+def _package_dependencies(modules: Iterable[ModuleType]) -> List[ModuleType]:
+    """
+    Los módulos dados más todos los de tp2025 que usan, directa o
+    indirectamente (módulos importados y funciones / clases importadas).
+    """
+    seen: Dict[str, ModuleType] = {}
+    pending = list(modules)
+    while pending:
+        module = pending.pop()
+        if module.__name__ in seen:
+            continue
+        seen[module.__name__] = module
+        for value in vars(module).values():
+            name = value.__name__ if isinstance(value, ModuleType) else getattr(value, "__module__", None)
+            if not isinstance(name, str) or name in seen:
+                continue
+            if name.split(".")[0] != _PACKAGE:
+                continue
+            dependency = sys.modules.get(name)
+            if dependency is not None and getattr(dependency, "__file__", None):
+                pending.append(dependency)
+    return list(seen.values())
+
+
+def code_fingerprint(modules: Iterable[ModuleType]) -> str:
+    """
+    Hash del código fuente de los módulos de la etapa y de los módulos de
+    tp2025 de los que dependen: un cambio en la transformación o en lo que
+    usa (p.ej. landing_manifest en las cargas RAW) invalida los fingerprints
+    anteriores.
+    """
+    h = hashlib.sha256()
+    for module in sorted(_package_dependencies(modules), key=lambda m: m.__name__):
+        h.update(module.__name__.encode())
+        h.update(Path(inspect.getsourcefile(module)).read_bytes())
+    return h.hexdigest()
+
+
+# ===== Cache de etapas =====
+
+@dataclass
+class StageFingerprint:
+    stage: str
+    processing_date: str
+    inputs: Dict[str, str]
+    code: str
+
+    @property
+    def digest(self) -> str:
+        payload = json.dumps(
+            {"processing_date": self.processing_date, "inputs": self.inputs, "code": self.code},
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+
+@dataclass
+class StageCache:
+    """
+    Último run exitoso de cada etapa en un sidecar JSON (data/fingerprints/<etapa>.json):
+    fingerprint de las entradas, checksums de las salidas y contadores de hits / misses.
+
+    Se guarda sólo el último run por etapa (no uno por fecha): las tablas CUR
+    tienen un solo día, así que correr otra fecha en el medio invalida el cache.
+    """
+
+    root: Path = FINGERPRINT_DIR
+    enabled: bool = STAGE_CACHE
+
+    def _path(self, stage: str) -> Path:
+        return self.root / f"{stage}.json"
+
+    def last(self, stage: str) -> Optional[Dict[str, Any]]:
+        path = self._path(stage)
+        if not path.exists():
+            return None
+        return json.loads(path.read_text(encoding="utf-8"))
+
+    def _save(self, stage: str, state: Dict[str, Any]) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = self._path(stage).with_suffix(".json.tmp")
+        tmp.write_text(json.dumps(state, indent=2, sort_keys=True), encoding="utf-8")
+        tmp.replace(self._path(stage))
+
+    def miss_reason(
+        self, fingerprint: StageFingerprint, outputs: Optional[Dict[str, str]]
+    ) -> Optional[str]:
+        """
+        None si la etapa puede saltearse; si no, por qué hay que correrla.
+        """
+        if not self.enabled:
+            return "cache deshabilitado (STAGE_CACHE=0)"
+        last = self.last(fingerprint.stage)
+        if last is None:
+            return "sin corrida previa"
+        if last["processing_date"] != fingerprint.processing_date:
+            return f"la última corrida fue para {last['processing_date']}"
+        if last["code"] != fingerprint.code:
+            return "cambió el código"
+        changed = sorted(
+            k for k in set(last["inputs"]) | set(fingerprint.inputs)
+            if last["inputs"].get(k) != fingerprint.inputs.get(k)
+        )
+        if changed:
+            return f"cambiaron las entradas: {', '.join(changed)}"
+        if outputs is not None and outputs != last.get("outputs"):
+            return "las salidas cambiaron desde la última corrida"
+        return None
+
+    def record(
+        self,
+        fingerprint: StageFingerprint,
+        outputs: Optional[Dict[str, str]],
+        hit: bool,
+    ) -> None:
+        last = self.last(fingerprint.stage) or {}
+        stats = {"hits": last.get("hits", 0) + int(hit), "misses": last.get("misses", 0) + int(not hit)}
+        self._save(
+            fingerprint.stage,
+            {
+                "stage": fingerprint.stage,
+                "processing_date": fingerprint.processing_date,
+                "digest": fingerprint.digest,
+                "inputs": fingerprint.inputs,
+                "code": fingerprint.code,
+                "outputs": outputs if outputs is not None else last.get("outputs"),
+                "finished_at": time.time() if not hit else last.get("finished_at"),
+                "last_result": "hit" if hit else "miss",
+                **stats,
+            },
+        )
+
+    def report(self) -> List[Dict[str, Any]]:
+        """
+        Estado de todas las etapas (para ver qué se salteó en la última corrida).
+        """
+        if not self.root.exists():
+            return []
+        rows = []
+        for path in sorted(self.root.glob("*.json")):
+            state = json.loads(path.read_text(encoding="utf-8"))
+            rows.append(
+                {k: state.get(k) for k in ("stage", "processing_date", "last_result", "hits", "misses")}
+            )
+        return rows
+
+
+def run_stage(
+    stage: str,
+    processing_date: str,
+    run: Callable[[], Any],
+    inputs: Callable[[], Dict[str, str]],
+    outputs: Optional[Callable[[], Dict[str, str]]] = None,
+    code: Iterable[ModuleType] = (),
+    cache: Optional[StageCache] = None,
+) -> bool:
+    """
+    Corre `run()` salvo que el fingerprint (entradas + código + fecha) sea el
+    del último run exitoso de la etapa y sus salidas sigan intactas.
+
+    inputs / outputs: callables que devuelven {nombre: hash} (archivos de
+    landing, checksums de tablas). Las salidas se registran después de correr;
+    una etapa sin salidas locales (p.ej. la carga a Redshift) pasa outputs=None.
+
+    Devuelve True si la etapa corrió, False si se salteó.
+    """
+    cache = cache or StageCache(FINGERPRINT_DIR, STAGE_CACHE)
+    start = time.perf_counter()
+    fingerprint = StageFingerprint(stage, processing_date, inputs(), code_fingerprint(code))
+    current_outputs = outputs() if outputs is not None else None
+
+    reason = cache.miss_reason(fingerprint, current_outputs)
+    if reason is None:
+        cache.record(fingerprint, None, hit=True)
+        print(
+            f"[stage_cache] HIT {stage} fecha_proceso={processing_date}: "
+            f"entradas sin cambios, se saltea ({time.perf_counter() - start:.2f}s)"
+        )
+        return False
+
+    print(f"[stage_cache] MISS {stage} fecha_proceso={processing_date}: {reason}")
+    run()
+    cache.record(fingerprint, outputs() if outputs is not None else None, hit=False)
+    return True
+
+
+if __name__ == "__main__":
+    for row in StageCache(FINGERPRINT_DIR).report():
+        print(
+            f"{row['stage']:<32} {row['processing_date']}  {row['last_result']:<5} "
+            f"hits={row['hits']} misses={row['misses']}"
+        )
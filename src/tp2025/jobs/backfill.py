@@ -0,0 +1,258 @@
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+import duckdb
+import pandas as pd
+
+from tp2025.io.duckdb_resources import get_resource_profile
+from tp2025.io.landing_manifest import LandingFile
+from tp2025.io.load_localdb import get_connection
+from tp2025.jobs import load_chinfo_raw_to_db as chinfo_raw
+from tp2025.jobs import load_leaderboard_raw_to_db as leaderboard_raw
+from tp2025.io.load_localdb import run_sql
+from tp2025.transforms.leaderboard_history import update_history
+from tp2025.transforms.leaderboard_summary import SUMMARY_TABLES, build_summaries
+from tp2025.transforms.transform_chinfo import create_cur_chinfo
+from tp2025.transforms.transform_leaderboard import create_cur_leaderboard
+
+# Cantidad de días procesados en paralelo (= instancias de DuckDB escribiendo a la vez)
+BACKFILL_WORKERS = int(os.getenv("BACKFILL_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+
+def date_range(start: str, end: str) -> List[str]:
+    """
+    Fechas YYYYMMDD entre start y end (ambas inclusive).
+    """
+    d0 = datetime.strptime(start, "%Y%m%d").date()
+    d1 = datetime.strptime(end, "%Y%m%d").date()
+    if d1 < d0:
+        raise ValueError(f"Rango inválido: {start} > {end}")
+    return [(d0 + timedelta(days=i)).strftime("%Y%m%d") for i in range((d1 - d0).days + 1)]
+
+
+def _read_landing(files: List[LandingFile], loader) -> pd.DataFrame:
+    if not files:
+        return pd.DataFrame()
+    return pd.concat([loader.load_parquet_to_dataframe(p) for p in files], ignore_index=True)
+
+
+def process_day(processing_date: str, n_workers: int = 1) -> Dict[str, Any]:
+    """
+    Landing -> RAW -> CUR -> agregados para un día, en un proceso worker.
+
+    Cada worker usa su propia DuckDB en memoria: no compite por el lock del
+    archivo local. La memoria y los threads del perfil de recursos se reparten
+    entre los n_workers que corren a la vez. Devuelve los DataFrames RAW (para
+    persistir en la base local), CUR (para el warehouse) y los agregados del
+    día por tabla (para ambos).
+    """
+    raw_lb = _read_landing(leaderboard_raw.list_parquet_for_processing_date(processing_date), leaderboard_raw)
+    raw_ch = _read_landing(chinfo_raw.list_parquet_for_processing_date(processing_date), chinfo_raw)
+
+    result = {
+        "raw_leaderboard": raw_lb,
+        "raw_chinfo": raw_ch,
+        "cur_leaderboard": pd.DataFrame(),
+        "cur_chinfo": pd.DataFrame(),
+        "summaries": {},
+    }
+
+    conn = duckdb.connect()
+    get_resource_profile().split(n_workers, str(os.getpid())).apply(conn)
+    try:
+        if not raw_lb.empty:
+            conn.register("tmp_raw_lb", raw_lb)
+            conn.execute("CREATE TABLE raw_pvp_leaderboard AS SELECT * FROM tmp_raw_lb;")
+            create_cur_leaderboard(processing_date, conn=conn)
+            result["cur_leaderboard"] = conn.execute("SELECT * FROM cur_pvp_leaderboard;").df()
+
+        if not raw_ch.empty:
+            conn.register("tmp_raw_ch", raw_ch)
+            conn.execute("CREATE TABLE raw_chinfo AS SELECT * FROM tmp_raw_ch;")
+            create_cur_chinfo(processing_date, conn=conn)
+            result["cur_chinfo"] = conn.execute("SELECT * FROM cur_chinfo;").df()
+        elif not raw_lb.empty:
+            # sin perfiles del día los agregados por clase / spec quedan en NULL
+            conn.execute(
+                "CREATE TABLE cur_chinfo (char_id BIGINT, fecha_proceso VARCHAR, "
+                "class_name VARCHAR, current_spec VARCHAR);"
+            )
+
+        if not raw_lb.empty:
+            build_summaries(processing_date, conn=conn)
+            result["summaries"] = {
+                table: conn.execute(f"SELECT * FROM {table};").df() for table in SUMMARY_TABLES
+            }
+    finally:
+        conn.close()
+
+    return result
+
+
+def replace_raw_day(conn, table: str, df: pd.DataFrame, processing_date: str) -> None:
+    """
+    Reemplaza el slice de un día en una tabla RAW (idempotente ante reintentos).
+    """
+    if df.empty:
+        return
+    conn.execute(f"DELETE FROM {table} WHERE fecha_proceso = ?;", [processing_date])
+    conn.register("tmp_backfill_df", df)
+    conn.execute(f"INSERT INTO {table} SELECT * FROM tmp_backfill_df;")
+    conn.unregister("tmp_backfill_df")
+
+
+def replace_summary_day(conn, table: str, df: pd.DataFrame, processing_date: str) -> None:
+    """
+    Reemplaza el slice de un día en una tabla de agregados local.
+    """
+    run_sql(conn, SUMMARY_TABLES[table][0])
+    replace_raw_day(conn, table, df, processing_date)
+
+
+def _days(df: pd.DataFrame) -> List[str]:
+    return sorted(df["fecha_proceso"].astype(str).unique()) if not df.empty else []
+
+
+def load_warehouse_batch(
+    df_chinfo: pd.DataFrame,
+    df_leaderboard: pd.DataFrame,
+    summaries: Dict[str, pd.DataFrame],
+) -> None:
+    """
+    Reemplaza los días del backfill en el warehouse en una sola transacción:
+    DELETE de esos días en dim, fact y agg_* y una carga bulk por tabla.
+    Re-correr un rango (o reintentar después de un error) no duplica filas.
+
+    Cada tabla sólo borra los días para los que trae filas: un día sin landing
+    (o ya podado por la retención) conserva lo que tenga en el warehouse.
+    """
+    import pyarrow as pa
+
+    from tp2025.warehouse.arrow_transfer import insert_batches
+    from tp2025.warehouse.connect_redshift import get_connection as get_redshift_connection
+    from tp2025.warehouse.redshift_model import (
+        create_tables,
+        delete_days,
+        load_dim_character_scd2,
+        load_fact_leaderboard,
+    )
+
+    red_conn = get_redshift_connection()
+    try:
+        create_tables(red_conn)
+        try:
+            delete_days(red_conn, _days(df_chinfo), tables=("dim_character_scd2",))
+            delete_days(red_conn, _days(df_leaderboard), tables=("fact_pvp_leaderboard_snapshot",))
+            for table, df in summaries.items():
+                delete_days(red_conn, _days(df), tables=(table,))
+            load_dim_character_scd2(red_conn, df_chinfo, commit=False)
+            # snapshot_date=None: cada fila usa su propia fecha_proceso
+            load_fact_leaderboard(red_conn, df_leaderboard, snapshot_date=None, commit=False)
+            for table, df in summaries.items():
+                if not df.empty:
+                    batches = pa.Table.from_pandas(df, preserve_index=False).to_batches()
+                    insert_batches(red_conn, table, list(df.columns), batches)
+            red_conn.commit()
+        except Exception:
+            red_conn.rollback()
+            raise
+    finally:
+        red_conn.close()
+
+
+def run_backfill(
+    start: str,
+    end: str,
+    max_workers: int = BACKFILL_WORKERS,
+    load_warehouse: bool = True,
+) -> None:
+    """
+    Reprocesa landing -> RAW -> CUR -> warehouse para un rango de fechas.
+
+    - Los días se procesan en paralelo en un pool de procesos (max_workers).
+    - La base DuckDB local tiene un único escritor (este proceso), que
+      reemplaza el slice RAW y de agregados de cada día y actualiza la
+      historia en orden. Las tablas cur_* locales (un solo día) no se tocan.
+      La conexión local se abre recién cuando terminó el pool: los workers
+      (fork) no heredan un handle de DuckDB abierto ni sus threads.
+    - Al final, los días con filas CUR se reemplazan en el warehouse (dim,
+      fact y agg_*) en una sola transacción, con un batch por tabla.
+    """
+    dates = date_range(start, end)
+    print(f"[backfill] {len(dates)} días ({start} -> {end}) con {max_workers} workers")
+
+    results: Dict[str, Dict[str, Any]] = {}
+    failed: Dict[str, str] = {}
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        future_to_date = {executor.submit(process_day, d, max_workers): d for d in dates}
+        for fut in as_completed(future_to_date):
+            processing_date = future_to_date[fut]
+            try:
+                results[processing_date] = fut.result()
+            except Exception as exc:
+                failed[processing_date] = repr(exc)
+                print(f"[backfill] {processing_date} falló: {exc!r}", file=sys.stderr)
+                continue
+            print(
+                f"[backfill] {processing_date}: {len(results[processing_date]['cur_leaderboard'])} filas leaderboard, "
+                f"{len(results[processing_date]['cur_chinfo'])} filas chinfo"
+            )
+
+    chinfo_raw.ensure_table_exists()
+    conn = get_connection()
+    try:
+        leaderboard_raw.ensure_table_exists(conn)
+        # La historia depende del día anterior: se actualiza en orden (y los
+        # agregados del día junto con ella)
+        for processing_date in sorted(results):
+            result = results[processing_date]
+            replace_raw_day(conn, leaderboard_raw.TABLE_NAME, result["raw_leaderboard"], processing_date)
+            replace_raw_day(conn, chinfo_raw.TABLE_NAME, result["raw_chinfo"], processing_date)
+            if result["raw_leaderboard"].empty:
+                continue
+            update_history(processing_date, conn)
+            for table, df in result["summaries"].items():
+                replace_summary_day(conn, table, df, processing_date)
+    finally:
+        conn.close()
+
+    ordered = [results[d] for d in sorted(results)]
+    if load_warehouse and any(not r["cur_leaderboard"].empty or not r["cur_chinfo"].empty for r in ordered):
+        df_chinfo = pd.concat([r["cur_chinfo"] for r in ordered], ignore_index=True)
+        df_leaderboard = pd.concat([r["cur_leaderboard"] for r in ordered], ignore_index=True)
+        df_summaries = {
+            table: pd.concat(
+                [r["summaries"][table] for r in ordered if r["summaries"]] or [pd.DataFrame()],
+                ignore_index=True,
+            )
+            for table in SUMMARY_TABLES
+        }
+        load_warehouse_batch(df_chinfo, df_leaderboard, df_summaries)
+        n_agg = {table: len(df) for table, df in df_summaries.items()}
+        print(
+            f"[backfill] Warehouse: {len(_days(df_leaderboard))} días de leaderboard y "
+            f"{len(_days(df_chinfo))} de perfiles reemplazados, "
+            f"{len(df_chinfo)} filas dim_character_scd2, "
+            f"{len(df_leaderboard)} filas fact_pvp_leaderboard_snapshot, agregados {n_agg}"
+        )
+
+    if failed:
+        raise RuntimeError(f"Backfill incompleto, días con error: {sorted(failed)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill multi-día landing -> RAW -> CUR -> warehouse")
+    parser.add_argument("start", help="Fecha inicial YYYYMMDD")
+    parser.add_argument("end", help="Fecha final YYYYMMDD (inclusive)")
+    parser.add_argument("--workers", type=int, default=BACKFILL_WORKERS)
+    parser.add_argument("--no-warehouse", action="store_true", help="No carga Redshift")
+    args = parser.parse_args()
+
+    run_backfill(args.start, args.end, max_workers=args.workers, load_warehouse=not args.no_warehouse)
@@ -1,22 +1,24 @@
 from __future__ import annotations
 
-import sys
-from pathlib import Path
-
-THIS_FILE = Path(__file__).resolve()
-PROJECT_ROOT = THIS_FILE.parents[3]
-SRC_DIR = PROJECT_ROOT / "src"
-
-if str(SRC_DIR) not in sys.path:
-    sys.path.insert(0, str(SRC_DIR))
-
-from tp2025.transforms.transform_leaderboard import create_cur_leaderboard
-
-
-def run_build_leaderboard_cur() -> None:
-    create_cur_leaderboard()
+from datetime import date
+
+from tp2025.io.stage_fingerprint import TableSlice, day_slice, run_stage, table_checksums
+from tp2025.transforms import dimension_encoding, transform_leaderboard
+from tp2025.transforms.transform_leaderboard import CUR_TABLE, RAW_TABLE, create_cur_leaderboard
+
+
+def run_build_leaderboard_cur(processing_date: str | None = None) -> None:
+    processing_date = processing_date or date.today().strftime("%Y%m%d")
+    run_stage(
+        "build_leaderboard_cur",
+        processing_date,
+        run=lambda: create_cur_leaderboard(processing_date),
+        inputs=lambda: table_checksums({RAW_TABLE: day_slice(RAW_TABLE, processing_date)}),
+        outputs=lambda: table_checksums({CUR_TABLE: TableSlice(CUR_TABLE)}),
+        code=(transform_leaderboard, dimension_encoding),
+    )
     print("[build_leaderboard_cur] Proceso CUR de PvP leaderboard finalizado correctamente.")
 
 
 if __name__ == "__main__":
-    run_build_leaderboard_cur()
\ No newline at end of file
+    run_build_leaderboard_cur()
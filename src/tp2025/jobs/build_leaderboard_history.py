@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+from datetime import date
+
+from tp2025.io.stage_fingerprint import TableSlice, day_slice, run_stage, table_checksums
+from tp2025.transforms import leaderboard_history
+from tp2025.transforms.leaderboard_history import HIST_TABLE, RAW_TABLE, build_history
+
+
+def run_build_leaderboard_history(processing_date: str | None = None) -> None:
+    processing_date = processing_date or date.today().strftime("%Y%m%d")
+    # la historia previa (ASOF JOIN) queda cubierta por el checksum de salida
+    run_stage(
+        "build_leaderboard_history",
+        processing_date,
+        run=lambda: build_history(processing_date),
+        inputs=lambda: table_checksums({RAW_TABLE: day_slice(RAW_TABLE, processing_date)}),
+        outputs=lambda: table_checksums({HIST_TABLE: TableSlice(HIST_TABLE)}),
+        code=(leaderboard_history,),
+    )
+    print("[build_leaderboard_history] Historia de PvP leaderboard actualizada correctamente.")
+
+
+if __name__ == "__main__":
+    run_build_leaderboard_history()
@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+from datetime import date
+
+from tp2025.io.stage_fingerprint import TableSlice, day_slice, run_stage, table_checksums
+from tp2025.transforms import leaderboard_summary
+from tp2025.transforms.leaderboard_summary import (
+    CHINFO_CUR,
+    LEADERBOARD_CUR,
+    SUMMARY_TABLES,
+    build_summaries,
+)
+
+
+def run_build_leaderboard_summary(processing_date: str | None = None) -> None:
+    processing_date = processing_date or date.today().strftime("%Y%m%d")
+    run_stage(
+        "build_leaderboard_summary",
+        processing_date,
+        run=lambda: build_summaries(processing_date),
+        inputs=lambda: table_checksums(
+            {LEADERBOARD_CUR: TableSlice(LEADERBOARD_CUR), CHINFO_CUR: TableSlice(CHINFO_CUR)}
+        ),
+        outputs=lambda: table_checksums(
+            {table: day_slice(table, processing_date) for table in SUMMARY_TABLES}
+        ),
+        code=(leaderboard_summary,),
+    )
+    print("[build_leaderboard_summary] Agregados diarios de PvP leaderboard actualizados correctamente.")
+
+
+if __name__ == "__main__":
+    run_build_leaderboard_summary()
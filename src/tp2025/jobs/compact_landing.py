@@ -0,0 +1,217 @@
+from __future__ import annotations
+
+import copy
+import os
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+import pandas as pd
+
+from tp2025.io.landing_manifest import (
+    COMPACTED_DIR_NAME,
+    LandingFile,
+    LandingManifest,
+    update_manifest,
+)
+from tp2025.io.landing_writer import LandingWriteOptions, write_landing_parquet
+from tp2025.jobs import load_chinfo_raw_to_db as chinfo_raw
+from tp2025.jobs import load_leaderboard_raw_to_db as leaderboard_raw
+
+THIS_FILE = Path(__file__).resolve()
+PROJECT_ROOT = THIS_FILE.parents[3]
+LANDING_DIR = PROJECT_ROOT / "data" / "landing"
+
+# Los días más recientes quedan como archivos diarios (re-extracciones baratas)
+COMPACT_AFTER_DAYS = int(os.getenv("LANDING_COMPACT_AFTER_DAYS", "7"))
+# Días de landing que se conservan; 0 = sin límite
+RETENTION_DAYS = int(os.getenv("LANDING_RETENTION_DAYS", "0"))
+
+
+@dataclass(frozen=True)
+class CompactionSpec:
+    """
+    Cómo se compacta un dataset de landing.
+
+    - to_raw: lee un archivo diario y lo deja en formato RAW (el mismo que
+      produce el loader), así leer un día compactado da exactamente lo mismo.
+      Recibe el manifest del landing que se compacta (los días CDC del
+      leaderboard se reconstruyen con su cadena).
+    - partition: nombre de la partición destino para un día.
+    - options: escritura de la partición (ordenada por fecha_proceso para que
+      la lectura de un día saltee el resto de los row groups).
+    """
+
+    to_raw: Callable[[LandingFile, LandingManifest], pd.DataFrame]
+    partition: Callable[[str, pd.DataFrame], str]
+    options: LandingWriteOptions
+
+
+COMPACTION_SPECS: Dict[str, CompactionSpec] = {
+    # una partición por temporada
+    "pvp_leaderboard": CompactionSpec(
+        to_raw=leaderboard_raw.load_parquet_to_dataframe,
+        partition=lambda processing_date, df: f"pvp_leaderboard_s{df['s_id'].iloc[0]}",
+        options=LandingWriteOptions(
+            dictionary_columns=("slug", "faction", "bracket", "s_id", "fecha_proceso"),
+            sort_by=("fecha_proceso", "bracket"),
+        ),
+    ),
+    # perfiles: una partición por mes
+    "ch_profile": CompactionSpec(
+        to_raw=lambda file, manifest: chinfo_raw.load_parquet_to_dataframe(file),
+        partition=lambda processing_date, df: f"ch_profile_{processing_date[:6]}",
+        options=LandingWriteOptions(
+            dictionary_columns=("realm_slug", "faction", "class", "spec", "fecha_proceso"),
+            sort_by=("fecha_proceso",),
+        ),
+    ),
+}
+
+
+def _cutoff(today: date, days: int) -> str:
+    return (today - timedelta(days=days)).strftime("%Y%m%d")
+
+
+def _rewrite_partition(
+    path: Path,
+    new_days: Dict[str, pd.DataFrame],
+    drop_days: set,
+    options: LandingWriteOptions,
+) -> int:
+    """
+    Reescribe una partición: saca drop_days y los días que se vuelven a
+    agregar, y suma new_days. Devuelve las filas resultantes (0 = se borró).
+    """
+    parts: List[pd.DataFrame] = []
+    if path.exists():
+        existing = pd.read_parquet(path)
+        replaced = drop_days | set(new_days)
+        parts.append(existing[~existing["fecha_proceso"].isin(replaced)])
+    parts.extend(new_days.values())
+
+    merged = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame()
+    if merged.empty:
+        path.unlink(missing_ok=True)
+        return 0
+
+    write_landing_parquet(merged, path, options)
+    return len(merged)
+
+
+def compact_dataset(
+    manifest: LandingManifest,
+    dataset: str,
+    spec: CompactionSpec | None,
+    compact_before: str,
+    retain_from: str | None,
+    source: LandingManifest | None = None,
+) -> Tuple[Dict[str, int], List[Path]]:
+    """
+    Compacta los días < compact_before y aplica retención (< retain_from).
+    Con spec=None (datasets sin compactación, p.ej. sub-recursos del perfil)
+    sólo se aplica la retención. Actualiza el manifest en memoria y devuelve (métricas, archivos diarios
+    a borrar una vez guardado el manifest).
+
+    source: estado del landing antes de compactar, para leer los días
+    (las particiones nuevas recién se escriben al final).
+    """
+    source = source or LandingManifest(manifest.landing_dir, copy.deepcopy(manifest.datasets))
+    compacted_dir = manifest.landing_dir / COMPACTED_DIR_NAME
+    new_rows: Dict[str, Dict[str, pd.DataFrame]] = {}
+    expired: Dict[str, set] = {}
+    daily_to_delete: List[Path] = []
+    stats = {"compacted_days": 0, "expired_days": 0}
+
+    for processing_date in manifest.days(dataset):
+        files = manifest.files(dataset, processing_date) or []
+
+        if retain_from is not None and processing_date < retain_from:
+            for f in files:
+                if f.compacted:
+                    expired.setdefault(f.path.stem, set()).add(processing_date)
+                else:
+                    daily_to_delete.append(f.path)
+            manifest.drop_day(dataset, processing_date)
+            stats["expired_days"] += 1
+            continue
+
+        daily = [f for f in files if not f.compacted and f.path.exists()]
+        if spec is None or processing_date >= compact_before or not daily:
+            continue
+
+        df = pd.concat([spec.to_raw(f, source) for f in daily], ignore_index=True)
+        if df.empty:
+            continue
+        partition = spec.partition(processing_date, df)
+        new_rows.setdefault(partition, {})[processing_date] = df
+        manifest.set_compacted(dataset, processing_date, compacted_dir / f"{partition}.parquet")
+        daily_to_delete.extend(f.path for f in daily)
+        stats["compacted_days"] += 1
+
+    for partition in sorted(set(new_rows) | set(expired)):
+        _rewrite_partition(
+            compacted_dir / f"{partition}.parquet",
+            new_rows.get(partition, {}),
+            expired.get(partition, set()),
+            spec.options if spec else LandingWriteOptions(),
+        )
+
+    stats["daily_files"] = len(daily_to_delete)
+    return stats, daily_to_delete
+
+
+def compact_landing(
+    today: date | None = None,
+    landing_dir: Path | None = None,
+    compact_after_days: int = COMPACT_AFTER_DAYS,
+    retention_days: int = RETENTION_DAYS,
+) -> Dict[str, Dict[str, int]]:
+    """
+    Compacta los archivos diarios chicos de landing en particiones grandes
+    (leaderboard por temporada, perfiles por mes) y aplica la retención.
+
+    Orden seguro ante fallas: primero se escriben las particiones, después
+    el manifest y recién al final se borran los archivos diarios. Si se corta
+    en el medio, el manifest sigue apuntando a archivos que existen.
+
+    Todo el load -> compactar -> save corre con el lock del manifest
+    (update_manifest): una extracción que registra archivos al mismo tiempo
+    espera a que termine en vez de perder su entrada.
+    """
+    today = today or date.today()
+    landing_dir = Path(landing_dir or LANDING_DIR)
+    compact_before = _cutoff(today, compact_after_days)
+    retain_from = _cutoff(today, retention_days) if retention_days > 0 else None
+
+    results: Dict[str, Dict[str, int]] = {}
+    to_delete: List[Path] = []
+    with update_manifest(landing_dir) as manifest:
+        adopted = manifest.scan_directory()
+        if adopted:
+            print(f"[compact_landing] {adopted} archivos diarios sin registrar agregados al manifest")
+
+        source = LandingManifest(landing_dir, copy.deepcopy(manifest.datasets))
+        for dataset in sorted(set(COMPACTION_SPECS) | set(manifest.datasets)):
+            spec = COMPACTION_SPECS.get(dataset)
+            results[dataset], daily = compact_dataset(
+                manifest, dataset, spec, compact_before, retain_from, source
+            )
+            to_delete.extend(daily)
+
+    # el manifest ya se guardó al salir del lock
+    for path in to_delete:
+        path.unlink(missing_ok=True)
+
+    print(f"[compact_landing] compactado antes de {compact_before}, retención desde {retain_from}: {results}")
+    return results
+
+
+def run_compact_landing(processing_date: str | None = None) -> None:
+    today = datetime.strptime(processing_date, "%Y%m%d").date() if processing_date else None
+    compact_landing(today)
+
+
+if __name__ == "__main__":
+    run_compact_landing()
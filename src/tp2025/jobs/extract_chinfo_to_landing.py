@@ -1,29 +1,56 @@
 from __future__ import annotations
 
+import os
 from datetime import date
 from pathlib import Path
+from typing import Dict, List, Tuple
 
-import sys
 import pandas as pd
 
 
 THIS_FILE = Path(__file__).resolve()
 PROJECT_ROOT = THIS_FILE.parents[3]
-SRC_DIR = PROJECT_ROOT / "src"
-
-if str(SRC_DIR) not in sys.path:
-    sys.path.insert(0, str(SRC_DIR))
 
 DATA_DIR = PROJECT_ROOT / "data"
 LANDING_DIR = DATA_DIR / "landing"
 
+from tp2025.blizzard_api.decoding import ProfilePayload
+from tp2025.blizzard_api.endpoints import get_character_profile_url
 from tp2025.services.character_selection import get_top_pvp_characters
 from tp2025.services.ch_profile_client import (
+    archive_profile_body,
     get_bearer_token,
+    decode_body,
     fetch_profiles_concurrently,
     build_profiles_dataframe,
+    profile_meta,
+)
+from tp2025.services.missing_characters import MissingCharacterCache
+from tp2025.services.profile_decode_pool import (
+    ProfileDecodePool,
+    fetch_and_decode_profiles,
+    open_decode_pool,
+)
+from tp2025.services.profile_resources import fetch_profile_resources
+from tp2025.io.landing_checkpoint import CHECKPOINT_DIR, ProfileCheckpoint, make_checkpoint_key
+from tp2025.io.landing_manifest import register_landing_file
+from tp2025.io.payload_archive import get_payload_archive, profile_key
+from tp2025.orchestration.fanout import read_spool
+from tp2025.io.landing_writer import (
+    PROFILE_WRITE_OPTIONS,
+    RESOURCE_WRITE_OPTIONS,
+    write_landing_parquet,
 )
 
+# Cantidad de personajes por chunk persistido en el checkpoint
+CHUNK_SIZE = int(os.getenv("CHINFO_CHUNK_SIZE", "100"))
+# Si está activo, también se bajan equipment / pvp-summary / specializations
+FETCH_PROFILE_RESOURCES = os.getenv("CHINFO_FETCH_RESOURCES", "0") == "1"
+# Máximo de personajes seleccionados desde cur_pvp_leaderboard
+SELECTION_LIMIT = 500
+# Cantidad de shards (tasks mapeadas en el DAG) en que se reparte la extracción
+CHINFO_SHARDS = int(os.getenv("CHINFO_SHARDS", "4"))
+
 
 def get_processing_date_str() -> str:
     return date.today().strftime("%Y%m%d")
@@ -40,39 +67,340 @@ def save_profiles_to_parquet(
     LANDING_DIR.mkdir(parents=True, exist_ok=True)
 
     filename = f"ch_profile_{processing_date}.parquet"
-    path = LANDING_DIR / filename
-    df.to_parquet(path, index=False)
+    path = write_landing_parquet(df, LANDING_DIR / filename, PROFILE_WRITE_OPTIONS)
+    register_landing_file("ch_profile", processing_date, path, LANDING_DIR)
     return path
 
 
-def run_extract_chinfo_to_landing() -> None:
-    processing_date = get_processing_date_str()
-    print(f"[extract_chinfo_to_landing] Fecha de proceso: {processing_date}")
+def save_profile_resource_to_parquet(
+    df: pd.DataFrame,
+    resource: str,
+    processing_date: str,
+) -> Path:
+    """
+    Guarda un parquet por tipo de sub-recurso del perfil:
+    ch_{resource}_{processing_date}.parquet
+    """
+    LANDING_DIR.mkdir(parents=True, exist_ok=True)
 
-    # 1) Selección de personajes desde cur_pvp_leaderboard
-    chars_df = get_top_pvp_characters(processing_date, limit_total=500)
+    filename = f"ch_{resource}_{processing_date}.parquet"
+    path = write_landing_parquet(df, LANDING_DIR / filename, RESOURCE_WRITE_OPTIONS)
+    register_landing_file(f"ch_{resource}", processing_date, path, LANDING_DIR)
+    return path
+
+
+def select_characters(processing_date: str) -> pd.DataFrame:
+    # Selección de personajes desde cur_pvp_leaderboard
+    chars_df = get_top_pvp_characters(processing_date, limit_total=SELECTION_LIMIT)
     print(
     f"[extract_chinfo_to_landing] Personajes seleccionados: "
-    f"{len(chars_df)} filas (máx 500, únicos por char_id)."
+    f"{len(chars_df)} filas (máx {SELECTION_LIMIT}, únicos por char_id)."
     )
+    return chars_df
 
 
-    # 2) Token
+def extract_into_checkpoint(
+    chars_df: pd.DataFrame,
+    checkpoint: ProfileCheckpoint,
+    chunk_size: int = CHUNK_SIZE,
+    fetch_resources: bool = FETCH_PROFILE_RESOURCES,
+) -> None:
+    """
+    Pide a la API los perfiles de chars_df (salteando los que ya están en el
+    checkpoint y los que dieron 404 hace poco) y los persiste chunk a chunk.
+    """
+    # 1) + 2) Checkpoint y cache negativo
+    missing_cache = MissingCharacterCache()
+    chars_df = _pending_characters(chars_df, checkpoint, missing_cache)
+
+    # 3) Token
     token = get_bearer_token()
 
-    # 3) Requests concurrentes al endpoint de profile
-    meta_and_payloads = fetch_profiles_concurrently(chars_df, token)
+    # 4) Requests concurrentes por chunk + normalización + escritura del chunk
+    #    (con CHINFO_DECODE_PROCESSES > 0 la decodificación va a un pool de procesos)
+    media_seen: set = set()
+    with open_decode_pool() as decode_pool:
+        for start in range(0, len(chars_df), chunk_size):
+            chunk_df = chars_df.iloc[start:start + chunk_size]
+            df_chunk, fetched = _fetch_chunk(chunk_df, token, missing_cache, decode_pool)
+            if df_chunk is None:
+                print(
+                    f"[extract_chinfo_to_landing] Chunk {start}-{start + len(chunk_df)} "
+                    f"sin perfiles válidos."
+                )
+                continue
+            _write_chunk(checkpoint, df_chunk, fetched, token if fetch_resources else None, media_seen)
+
+
+def _pending_characters(
+    chars_df: pd.DataFrame,
+    checkpoint: ProfileCheckpoint,
+    missing_cache: MissingCharacterCache,
+) -> pd.DataFrame:
+    """
+    Personajes de chars_df que falta pedir a la API.
+    """
+    # Checkpoint: descartamos los personajes ya extraídos en una corrida previa
+    done = checkpoint.completed_keys()
+    if done:
+        pending_mask = [
+            make_checkpoint_key(slug, name) not in done
+            for slug, name in zip(chars_df["slug_name"], chars_df["char_name"])
+        ]
+        chars_df = chars_df.loc[pending_mask].reset_index(drop=True)
+        print(
+            f"[extract_chinfo_to_landing] Checkpoint: {len(done)} perfiles ya extraídos, "
+            f"{len(chars_df)} pendientes."
+        )
 
-    # 4) Normalización
-    df_profiles = build_profiles_dataframe(meta_and_payloads)
+    # Cache negativo: no gastar cuota en personajes que sabemos que dan 404
+    return missing_cache.filter_selection(chars_df)
+
+
+def _write_chunk(
+    checkpoint: ProfileCheckpoint,
+    df_chunk: pd.DataFrame,
+    fetched: List[Tuple[Dict, Dict]],
+    resources_token: str | None,
+    media_seen: set,
+) -> None:
+    """
+    Persiste un chunk en el checkpoint; con resources_token baja además los
+    sub-recursos de sus perfiles.
+    """
+    extra = (
+        fetch_profile_resources(fetched, resources_token, media_seen=media_seen)
+        if resources_token else None
+    )
+    keys = [make_checkpoint_key(m["slug_name"], m["char_name"]) for m, _ in fetched]
+    chunk_path = checkpoint.write_chunk(df_chunk, keys, extra=extra)
+    print(
+        f"[extract_chinfo_to_landing] Chunk con {len(df_chunk)} perfiles "
+        f"guardado en: {chunk_path}"
+    )
+
+
+def _fetch_chunk(
+    chunk_df: pd.DataFrame,
+    token: str,
+    missing_cache: MissingCharacterCache,
+    decode_pool: ProfileDecodePool | None,
+) -> Tuple[pd.DataFrame | None, List[Tuple[Dict, Dict]]]:
+    """
+    Perfiles de un chunk: (DataFrame normalizado o None si no hubo ninguno,
+    [(meta, payload)] para el checkpoint y los sub-recursos).
+    """
+    if decode_pool is not None:
+        batch = fetch_and_decode_profiles(chunk_df, token, decode_pool, missing_cache=missing_cache)
+        if not len(batch):
+            return None, []
+        return batch.to_frame(), batch.meta_and_payloads()
+
+    meta_and_payloads = fetch_profiles_concurrently(chunk_df, token, missing_cache=missing_cache)
+    fetched = [(meta, payload) for meta, payload in meta_and_payloads if payload]
+    if not fetched:
+        return None, []
+    return build_profiles_dataframe(fetched), fetched
+
+
+def publish_checkpoints(checkpoints: List[ProfileCheckpoint], processing_date: str) -> Path:
+    """
+    Une los chunks de uno o varios checkpoints (shards) y guarda los parquet
+    finales en landing. Recién después se borran los checkpoints.
+    """
+    parts = [cp.merge_chunks() for cp in checkpoints]
+    parts = [df for df in parts if not df.empty]
+    if not parts:
+        raise RuntimeError("No se pudo construir ningún registro de perfil de personaje.")
+    df_profiles = pd.concat(parts, ignore_index=True)
+    # shards de una corrida anterior (con otro n_shards) pueden repetir personajes
+    dedup_key = df_profiles["realm_slug"].astype(str) + "\t" + df_profiles["name"].astype(str).str.lower()
+    df_profiles = df_profiles.loc[~dedup_key.duplicated(keep="last")].reset_index(drop=True)
 
-    # 5) Guardado a landing
     path = save_profiles_to_parquet(df_profiles, processing_date)
 
+    for resource in sorted({name for cp in checkpoints for name in cp.extra_names()}):
+        df_resource = pd.concat(
+            [cp.merge_extra(resource) for cp in checkpoints], ignore_index=True
+        ).drop_duplicates(ignore_index=True)
+        resource_path = save_profile_resource_to_parquet(df_resource, resource, processing_date)
+        print(
+            f"[extract_chinfo_to_landing] Guardado {len(df_resource)} filas "
+            f"de {resource} en: {resource_path}"
+        )
+
+    for cp in checkpoints:
+        cp.clear()
+
     print(
         f"[extract_chinfo_to_landing] Guardado {len(df_profiles)} perfiles "
         f"de personajes en: {path}"
     )
+    return path
+
+
+def run_extract_chinfo_to_landing(
+    chunk_size: int = CHUNK_SIZE,
+    fetch_resources: bool = FETCH_PROFILE_RESOURCES,
+    processing_date: str | None = None,
+) -> None:
+    processing_date = processing_date or get_processing_date_str()
+    print(f"[extract_chinfo_to_landing] Fecha de proceso: {processing_date}")
+
+    chars_df = select_characters(processing_date)
+    checkpoint = ProfileCheckpoint(processing_date, CHECKPOINT_DIR)
+    extract_into_checkpoint(chars_df, checkpoint, chunk_size, fetch_resources)
+    publish_checkpoints([checkpoint], processing_date)
+
+
+# ===== Extracción repartida en shards (tasks mapeadas del DAG) =====
+
+def _selection_path(processing_date: str) -> Path:
+    return CHECKPOINT_DIR / f"ch_profile_{processing_date}_selection.parquet"
+
+
+def plan_chinfo_shards(
+    processing_date: str | None = None,
+    n_shards: int = CHINFO_SHARDS,
+) -> List[Dict]:
+    """
+    Paso "map": selecciona los personajes una sola vez (DuckDB no admite
+    varios procesos escribiendo el mismo archivo), la deja en el checkpoint y
+    devuelve los kwargs de cada shard para el DAG.
+    """
+    processing_date = processing_date or get_processing_date_str()
+    chars_df = select_characters(processing_date)
+
+    path = _selection_path(processing_date)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    chars_df.to_parquet(path, index=False)
+
+    return [
+        {"shard": shard, "n_shards": n_shards, "processing_date": processing_date}
+        for shard in range(n_shards)
+    ]
+
+
+def extract_chinfo_shard(
+    shard: int,
+    n_shards: int,
+    processing_date: str | None = None,
+    chunk_size: int = CHUNK_SIZE,
+    fetch_resources: bool = FETCH_PROFILE_RESOURCES,
+) -> int:
+    """
+    Extrae los personajes de la selección con char_id % n_shards == shard.
+    Devuelve cuántos le tocaron.
+    """
+    processing_date = processing_date or get_processing_date_str()
+    chars_df = _shard_selection(shard, n_shards, processing_date)
+    checkpoint = _shard_checkpoint(shard, n_shards, processing_date)
+    extract_into_checkpoint(chars_df, checkpoint, chunk_size, fetch_resources)
+    return len(chars_df)
+
+
+def _shard_selection(shard: int, n_shards: int, processing_date: str) -> pd.DataFrame:
+    chars_df = pd.read_parquet(_selection_path(processing_date))
+    chars_df = chars_df[chars_df["char_id"].astype("int64") % n_shards == shard].reset_index(drop=True)
+    print(
+        f"[extract_chinfo_to_landing] Shard {shard}/{n_shards}: {len(chars_df)} personajes."
+    )
+    return chars_df
+
+
+def _shard_checkpoint(shard: int, n_shards: int, processing_date: str) -> ProfileCheckpoint:
+    return ProfileCheckpoint(processing_date, CHECKPOINT_DIR, shard=f"{shard:03d}of{n_shards:03d}")
+
+
+# ===== Extracción diferida de un shard (ver tp2025.orchestration) =====
+
+def plan_chinfo_shard_requests(
+    shard: int,
+    n_shards: int,
+    processing_date: str | None = None,
+) -> List[Dict[str, str]]:
+    """
+    Requests de perfil pendientes de un shard (sin los del checkpoint ni los
+    del cache negativo) para el fan-out del trigger. La key es la del archivo
+    de payloads (realm/nombre).
+    """
+    processing_date = processing_date or get_processing_date_str()
+    chars_df = _pending_characters(
+        _shard_selection(shard, n_shards, processing_date),
+        _shard_checkpoint(shard, n_shards, processing_date),
+        MissingCharacterCache(),
+    )
+    return [
+        {
+            "key": profile_key(slug, name),
+            "url": get_character_profile_url(realm_slug=slug, character_name=name.lower()),
+        }
+        for slug, name in zip(chars_df["slug_name"], chars_df["char_name"])
+    ]
+
+
+def land_spooled_profiles(
+    shard: int,
+    n_shards: int,
+    spool_path: Path,
+    processing_date: str | None = None,
+    chunk_size: int = CHUNK_SIZE,
+    fetch_resources: bool = FETCH_PROFILE_RESOURCES,
+) -> int:
+    """
+    Lado worker de la extracción diferida: toma las respuestas que dejó el
+    trigger, archiva los bodies, registra los 404 en el cache negativo y
+    escribe los perfiles en el checkpoint del shard (merge_chinfo_shards los
+    une igual que en la extracción sincrónica). Devuelve cuántos perfiles guardó.
+
+    Los sub-recursos (CHINFO_FETCH_RESOURCES=1) se piden desde el worker.
+    """
+    processing_date = processing_date or get_processing_date_str()
+    metas = {
+        profile_key(rec["slug_name"], rec["char_name"]): profile_meta(rec)
+        for rec in _shard_selection(shard, n_shards, processing_date).to_dict("records")
+    }
+
+    fetched: List[Tuple[Dict, Dict]] = []
+    not_found: List[Tuple[str, str, object]] = []
+    for item in read_spool(spool_path):
+        meta = metas.get(item.key)
+        if meta is None:
+            continue
+        if item.status == 404:
+            not_found.append((meta["slug_name"], meta["char_name"], meta["char_id"]))
+        elif item.body is not None:
+            archive_profile_body(meta["slug_name"], meta["char_name"], item.body, processing_date)
+            payload = decode_body(item.body, ProfilePayload, item.key)
+            if payload:
+                fetched.append((meta, payload))
+
+    archive = get_payload_archive()
+    if archive is not None:
+        archive.flush()
+    if not_found:
+        MissingCharacterCache().add_many(not_found)
+        print(f"[extract_chinfo_to_landing] {len(not_found)} perfiles con 404 agregados al cache negativo")
+
+    checkpoint = _shard_checkpoint(shard, n_shards, processing_date)
+    resources_token = get_bearer_token() if fetch_resources else None
+    media_seen: set = set()
+    for start in range(0, len(fetched), chunk_size):
+        part = fetched[start:start + chunk_size]
+        _write_chunk(checkpoint, build_profiles_dataframe(part), part, resources_token, media_seen)
+    return len(fetched)
+
+
+def merge_chinfo_shards(processing_date: str | None = None) -> None:
+    """
+    Paso "reduce": une los checkpoints de todos los shards en los parquet de landing.
+    """
+    processing_date = processing_date or get_processing_date_str()
+    checkpoints = ProfileCheckpoint.shard_checkpoints(processing_date, CHECKPOINT_DIR)
+    print(f"[extract_chinfo_to_landing] Uniendo {len(checkpoints)} shards de {processing_date}")
+
+    publish_checkpoints(checkpoints, processing_date)
+    _selection_path(processing_date).unlink(missing_ok=True)
 
 
 if __name__ == "__main__":
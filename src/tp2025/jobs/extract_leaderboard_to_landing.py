@@ -1,37 +1,68 @@
 from __future__ import annotations
 
-import sys
+import os
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 from datetime import date
 
 import pandas as pd
-import requests
 
 
 THIS_FILE = Path(__file__).resolve()
 PROJECT_ROOT = THIS_FILE.parents[3]
-SRC_DIR = PROJECT_ROOT / "src"
-
-if str(SRC_DIR) not in sys.path:
-    sys.path.insert(0, str(SRC_DIR))
 
 from tp2025.blizzard_api.auth_client import load_token_from_file, get_default_auth_client
-from tp2025.blizzard_api.endpoints import (
-    get_pvp_season_index_url,
-    get_pvp_leaderboard_url,
+from tp2025.blizzard_api.credential_pool import (
+    blizzard_get,
+    credential_pool_enabled,
+    get_credential_pool,
+)
+from tp2025.blizzard_api.decoding import LeaderboardPayload, decode, decode_response
+from tp2025.blizzard_api.endpoints import DEFAULT_REGION, get_pvp_leaderboard_url
+from tp2025.blizzard_api.static_data import get_static_data_cache
+from tp2025.io.landing_manifest import register_landing_file, update_manifest
+from tp2025.io.payload_archive import (
+    LEADERBOARD_ENDPOINT,
+    get_payload_archive,
+    leaderboard_key,
+    parse_leaderboard_key,
+)
+from tp2025.io.landing_writer import (
+    LEADERBOARD_CDC_WRITE_OPTIONS,
+    LEADERBOARD_WRITE_OPTIONS,
+    write_landing_parquet,
 )
+from tp2025.jobs import load_leaderboard_raw_to_db as leaderboard_raw
+from tp2025.orchestration.fanout import read_spool
+from tp2025.transforms.leaderboard_cdc import diff_snapshots
 
 LANDING_DIR = PROJECT_ROOT / "data" / "landing"
+DATASET = "pvp_leaderboard"
 
+# Modo CDC: en lugar del snapshot completo se guardan sólo los cambios contra el día anterior
+LEADERBOARD_CDC = os.getenv("LEADERBOARD_CDC", "0") == "1"
+# Cada cuántos días se fuerza un snapshot completo (acota la cadena a reconstruir)
+CDC_BASE_EVERY = int(os.getenv("LEADERBOARD_CDC_BASE_EVERY", "7"))
+
+BRACKETS = ("2v2", "3v3")
+# Regiones a extraer (coma separadas). La primera / BLIZZARD_REGION es la que
+# sigue el pipeline (RAW -> CUR -> Redshift); el resto queda en landing como
+# pvp_leaderboard_{region}_*.
+EXTRACT_REGIONS = [
+    r.strip() for r in os.getenv("BLIZZARD_REGIONS", DEFAULT_REGION).split(",") if r.strip()
+]
 
 
 def get_token() -> str:
     """
     Devuelve un access token válido.
+    - Con BLIZZARD_CLIENTS, el de algún cliente del pool.
     - Si existe .blizzard_access_token, lo usa.
     - Si no, usa client_credentials via BlizzardAuthClient y lo persiste en ese archivo.
     """
+    if credential_pool_enabled():
+        return get_credential_pool().token()
+
     token = load_token_from_file()
     if token:
         return token
@@ -40,32 +71,56 @@ def get_token() -> str:
     return client.get_token()
 
 
-def get_current_season_id(token: str) -> int:
+def get_current_season_id(token: str, region: str | None = None) -> int:
+    """
+    Devuelve current_season.id del PvP Season Index de la región.
+    Pasa por el cache de game data estática: la mayoría de las corridas
+    no hacen ninguna llamada de red para resolver la temporada.
+    """
+    return get_static_data_cache().current_season_id(token, region)
+
+
+def fetch_leaderboard_raw(
+    token: str,
+    season_id: int,
+    bracket: str,
+    region: str | None = None,
+    processing_date: str | None = None,
+) -> Dict[str, Any]:
     """
-    Llama al endpoint de PvP Season Index y devuelve current_season.id.
+    Llama al endpoint de PvP Leaderboard para un bracket (y región) dado
+    y devuelve el payload JSON (sólo los campos de LeaderboardPayload si el
+    backend de decodificación es msgspec).
+    El body crudo queda en el archivo de payloads (ver payload_archive).
     """
-    url = get_pvp_season_index_url()
-    headers = {"Authorization": f"Bearer {token}"}
-    resp = requests.get(url, headers=headers, timeout=15)
+    url = get_pvp_leaderboard_url(season_id=season_id, bracket=bracket, region=region)
+    resp = blizzard_get(url, token, timeout=30)
     resp.raise_for_status()
-    data: Dict[str, Any] = resp.json()
 
-    try:
-        return int(data["current_season"]["id"])
-    except (KeyError, TypeError, ValueError) as exc:
-        raise RuntimeError("No se pudo obtener 'current_season.id' del payload") from exc
+    archive_leaderboard_body(resp.content, season_id, bracket, region, processing_date)
+    return decode_response(resp, LeaderboardPayload)
 
 
-def fetch_leaderboard_raw(token: str, season_id: int, bracket: str) -> Dict[str, Any]:
+def archive_leaderboard_body(
+    body: bytes,
+    season_id: int,
+    bracket: str,
+    region: str | None = None,
+    processing_date: str | None = None,
+) -> None:
     """
-    Llama al endpoint de PvP Leaderboard para un bracket dado
-    y devuelve el payload JSON completo.
+    Guarda el body crudo del leaderboard en el archivo de payloads
+    (no hace nada con PAYLOAD_ARCHIVE=0).
     """
-    url = get_pvp_leaderboard_url(season_id=season_id, bracket=bracket)
-    headers = {"Authorization": f"Bearer {token}"}
-    resp = requests.get(url, headers=headers, timeout=30)
-    resp.raise_for_status()
-    return resp.json()
+    archive = get_payload_archive()
+    if archive is not None:
+        archive.add(
+            LEADERBOARD_ENDPOINT,
+            leaderboard_key(region or DEFAULT_REGION, season_id, bracket),
+            body,
+            processing_date or date.today().strftime("%Y%m%d"),
+        )
+        archive.flush()
 
 
 def normalize_leaderboard_entries(payload: Dict[str, Any]) -> pd.DataFrame:
@@ -99,44 +154,211 @@ def normalize_leaderboard_entries(payload: Dict[str, Any]) -> pd.DataFrame:
     return pd.DataFrame(rows)
 
 
+def landing_dataset(region: str | None = None) -> str:
+    """
+    Dataset de landing de una región: pvp_leaderboard para la región
+    configurada, pvp_leaderboard_{region} para las demás.
+    """
+    if region is None or region == DEFAULT_REGION:
+        return DATASET
+    return f"{DATASET}_{region}"
+
+
+def _leaderboard_filename(
+    season_id: int, bracket: str, processing_date: str, cdc: bool, region: str | None = None
+) -> str:
+    prefix = landing_dataset(region) + ("_cdc" if cdc else "")
+    return f"{prefix}_s{season_id}_{bracket}_{processing_date}.parquet"
+
+
+def _register(
+    path: Path, season_id: int, bracket: str, processing_date: str, cdc: bool, region: str | None = None
+) -> None:
+    """
+    Registra el archivo del día y saca la otra variante (completo / CDC) si
+    quedó de una extracción anterior del mismo día.
+    """
+    dataset = landing_dataset(region)
+    stale = LANDING_DIR / _leaderboard_filename(season_id, bracket, processing_date, not cdc, region)
+    if stale.exists():
+        with update_manifest(LANDING_DIR) as manifest:
+            manifest.remove(dataset, processing_date, stale)
+        stale.unlink()
+    register_landing_file(dataset, processing_date, path, LANDING_DIR)
+
+
 def save_leaderboard_to_parquet(
     df: pd.DataFrame,
     season_id: int,
     bracket: str,
     processing_date: str,
+    region: str | None = None,
 ) -> Path:
     """
-    Guarda el DataFrame en data/landing como parquet.
+    Guarda el DataFrame en data/landing como parquet (zstd, ordenado por rank,
+    ver landing_writer).
     Nombre: pvp_leaderboard_s{season_id}_{bracket}_{processing_date}.parquet
+    (pvp_leaderboard_{region}_s... para regiones distintas de la configurada)
     """
     LANDING_DIR.mkdir(parents=True, exist_ok=True)
-    filename = f"pvp_leaderboard_s{season_id}_{bracket}_{processing_date}.parquet"
-    path = LANDING_DIR / filename
-    df.to_parquet(path, index=False)
+    filename = _leaderboard_filename(season_id, bracket, processing_date, cdc=False, region=region)
+    path = write_landing_parquet(df, LANDING_DIR / filename, LEADERBOARD_WRITE_OPTIONS)
+    _register(path, season_id, bracket, processing_date, cdc=False, region=region)
     return path
 
 
+def save_leaderboard_changes_to_parquet(
+    changes: pd.DataFrame,
+    season_id: int,
+    bracket: str,
+    processing_date: str,
+) -> Path:
+    """
+    Guarda los cambios del día (salida de diff_snapshots, formato RAW + op).
+    Nombre: pvp_leaderboard_cdc_s{season_id}_{bracket}_{processing_date}.parquet
+    """
+    LANDING_DIR.mkdir(parents=True, exist_ok=True)
+    # las bajas sólo traen la clave
+    changes = changes.assign(s_id=str(season_id), bracket=bracket, fecha_proceso=processing_date)
+    filename = _leaderboard_filename(season_id, bracket, processing_date, cdc=True)
+    path = write_landing_parquet(changes, LANDING_DIR / filename, LEADERBOARD_CDC_WRITE_OPTIONS)
+    _register(path, season_id, bracket, processing_date, cdc=True)
+    return path
+
 
-def run_extract_leaderboard_to_landing() -> None:
+def land_leaderboard(
+    df: pd.DataFrame,
+    season_id: int,
+    bracket: str,
+    processing_date: str,
+    cdc: bool = LEADERBOARD_CDC,
+    region: str | None = None,
+) -> Path:
     """
-    Orquestador de la etapa de extracción a landing:
+    Guarda el leaderboard del día en landing.
 
-    1) Obtiene token.
-    2) Obtiene current_season_id.
-    3) Extrae 2v2 y 3v3.
-    4) Normaliza al modelo raw y guarda en parquet.
+    Con cdc=True se guardan sólo las altas / cambios / bajas contra el último
+    snapshot, salvo que no haya snapshot previo o que la cadena de archivos
+    CDC llegue a CDC_BASE_EVERY: ahí se guarda un snapshot completo.
+    Los loaders siempre leen el snapshot completo reconstruido.
+    El modo CDC aplica sólo a la región configurada (la que carga RAW).
     """
-    token = get_token()
-    season_id = get_current_season_id(token)
-    processing_date = date.today().strftime("%Y%m%d")
+    if cdc and landing_dataset(region) == DATASET:
+        previous = leaderboard_raw.latest_snapshot(season_id, bracket, before=processing_date)
+        if previous is not None and previous.chain_length + 1 < CDC_BASE_EVERY:
+            current = leaderboard_raw.to_raw_frame(df, season_id, bracket, processing_date)
+            changes = diff_snapshots(previous.frame, current)
+            print(
+                f"[extract_leaderboard_to_landing] CDC {bracket}: {len(changes)} cambios "
+                f"sobre {len(current)} filas (base {previous.processing_date})"
+            )
+            return save_leaderboard_changes_to_parquet(changes, season_id, bracket, processing_date)
+
+    return save_leaderboard_to_parquet(df, season_id, bracket, processing_date, region=region)
+
+
+def leaderboard_shards(regions: Optional[List[str]] = None) -> List[Dict[str, str]]:
+    """
+    Unidades de extracción independientes: una por (región, bracket).
+    El DAG mapea una task por cada una (dynamic task mapping).
+    """
+    return [
+        {"region": region, "bracket": bracket}
+        for region in (regions or EXTRACT_REGIONS)
+        for bracket in BRACKETS
+    ]
+
+
+def extract_leaderboard_shard(
+    bracket: str,
+    region: str | None = None,
+    processing_date: str | None = None,
+    token: str | None = None,
+    season_id: int | None = None,
+) -> str:
+    """
+    Extrae y guarda en landing el leaderboard de un (región, bracket).
+    Devuelve la ruta del parquet (como str, para XCom).
+    """
+    token = token or get_token()
+    season_id = season_id or get_current_season_id(token, region)
+    processing_date = processing_date or date.today().strftime("%Y%m%d")
+
+    payload = fetch_leaderboard_raw(
+        token, season_id, bracket, region=region, processing_date=processing_date
+    )
+    df = normalize_leaderboard_entries(payload)
+    path = land_leaderboard(df, season_id, bracket, processing_date, region=region)
+    print(
+        f"[extract_leaderboard_to_landing] Guardado {len(df)} filas "
+        f"para region={region or DEFAULT_REGION} bracket={bracket} en: {path}"
+    )
+    return str(path)
+
+
+# ===== Extracción diferida (ver tp2025.orchestration) =====
 
-    for bracket in ("2v2", "3v3"):
-        payload = fetch_leaderboard_raw(token, season_id, bracket)
-        df = normalize_leaderboard_entries(payload)
-        path = save_leaderboard_to_parquet(df, season_id, bracket, processing_date)
+def leaderboard_request(
+    bracket: str,
+    region: str | None = None,
+    token: str | None = None,
+    season_id: int | None = None,
+) -> Dict[str, str]:
+    """
+    Request del leaderboard de un (región, bracket) para el fan-out del
+    trigger. La key es la del archivo de payloads: al reanudar alcanza con
+    ella para saber región, temporada y bracket.
+    """
+    token = token or get_token()
+    season_id = season_id or get_current_season_id(token, region)
+    return {
+        "key": leaderboard_key(region or DEFAULT_REGION, season_id, bracket),
+        "url": get_pvp_leaderboard_url(season_id=season_id, bracket=bracket, region=region),
+    }
+
+
+def land_spooled_leaderboard(spool_path: Path, processing_date: str) -> List[str]:
+    """
+    Lado worker de la extracción diferida: toma las respuestas que dejó el
+    trigger, las archiva, normaliza y guarda en landing como extract_leaderboard_shard.
+    """
+    paths: List[str] = []
+    for item in read_spool(spool_path):
+        if item.status != 200 or item.body is None:
+            raise RuntimeError(f"Leaderboard {item.key}: la API respondió status {item.status}")
+        region, season_id, bracket = parse_leaderboard_key(item.key)
+        archive_leaderboard_body(item.body, season_id, bracket, region, processing_date)
+
+        df = normalize_leaderboard_entries(decode(item.body, LeaderboardPayload))
+        path = land_leaderboard(df, season_id, bracket, processing_date, region=region)
         print(
             f"[extract_leaderboard_to_landing] Guardado {len(df)} filas "
-            f"para bracket={bracket} en: {path}"
+            f"para region={region} bracket={bracket} en: {path}"
+        )
+        paths.append(str(path))
+    return paths
+
+
+def run_extract_leaderboard_to_landing(processing_date: str | None = None) -> None:
+    """
+    Orquestador de la etapa de extracción a landing (todas las unidades en
+    serie; el DAG las reparte en tasks mapeadas, ver leaderboard_shards):
+
+    1) Obtiene token.
+    2) Obtiene current_season_id de cada región.
+    3) Extrae 2v2 y 3v3 de cada región.
+    4) Normaliza al modelo raw y guarda en parquet (completo o CDC, ver land_leaderboard).
+    """
+    token = get_token()
+    processing_date = processing_date or date.today().strftime("%Y%m%d")
+
+    for shard in leaderboard_shards():
+        extract_leaderboard_shard(
+            shard["bracket"],
+            region=shard["region"],
+            processing_date=processing_date,
+            token=token,
+            season_id=get_current_season_id(token, shard["region"]),
         )
 
 
@@ -10,18 +10,17 @@ import pandas as pd
 
 THIS_FILE = Path(__file__).resolve()
 PROJECT_ROOT = THIS_FILE.parents[3]
-SRC_DIR = PROJECT_ROOT / "src"
-
-if str(SRC_DIR) not in sys.path:
-    sys.path.insert(0, str(SRC_DIR))
 
 # Reutilizamos la conexión local
+from tp2025.io.landing_manifest import LandingFile, discover_landing_files, read_compacted_day
 from tp2025.io.load_localdb import get_connection, run_sql
+from tp2025.io.stage_fingerprint import day_slice, files_fingerprint, run_stage, table_checksums
 
 DATA_DIR = PROJECT_ROOT / "data"
 LANDING_DIR = DATA_DIR / "landing"
 
 TABLE_NAME = "wow_data.main.raw_chinfo"
+DATASET = "ch_profile"
 
 
 def get_processing_date_str() -> str:
@@ -32,21 +31,32 @@ def get_processing_date_str() -> str:
     return date.today().strftime("%Y%m%d")
 
 
-def list_parquet_for_processing_date(processing_date: str) -> List[Path]:
+def list_parquet_for_processing_date(processing_date: str) -> List[LandingFile]:
     """
     Lista los parquet de character info para la fecha dada.
     Un único archivo del estilo:
       ch_profile_{processing_date}.parquet
+    o la partición compactada del mes (ver compact_landing), según el manifest.
     """
-    pattern = f"ch_profile_{processing_date}.parquet"
-    return list(LANDING_DIR.glob(pattern))
+    return discover_landing_files(
+        DATASET,
+        processing_date,
+        LANDING_DIR,
+        fallback_glob=f"ch_profile_{processing_date}.parquet",
+    )
 
 
-def load_parquet_to_dataframe(path: Path) -> pd.DataFrame:
+def load_parquet_to_dataframe(path: Path | LandingFile) -> pd.DataFrame:
     """
     Lee el parquet y lo normaliza a las columnas esperadas en RAW.
     Todo se guarda como string (igual que el leaderboard RAW).
     """
+    if isinstance(path, LandingFile):
+        if path.compacted:
+            # la partición compactada ya tiene el formato RAW
+            return read_compacted_day(path)
+        path = path.path
+
     df = pd.read_parquet(path)
 
     expected_cols = [
@@ -127,9 +137,16 @@ def load_into_duckdb(processing_date: str) -> None:
     )
 
 
-def run_load_chinfo_raw_to_db() -> None:
-    processing_date = get_processing_date_str()
-    load_into_duckdb(processing_date)
+def run_load_chinfo_raw_to_db(processing_date: str | None = None) -> None:
+    processing_date = processing_date or get_processing_date_str()
+    run_stage(
+        "load_chinfo_raw_to_db",
+        processing_date,
+        run=lambda: load_into_duckdb(processing_date),
+        inputs=lambda: files_fingerprint(list_parquet_for_processing_date(processing_date)),
+        outputs=lambda: table_checksums({TABLE_NAME: day_slice(TABLE_NAME, processing_date)}),
+        code=(sys.modules[__name__],),
+    )
 
 
 if __name__ == "__main__":
@@ -1,75 +1,105 @@
 from __future__ import annotations
 
+import os
+import re
 import sys
-from datetime import date
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
 from pathlib import Path
-from typing import List
+from typing import List, Optional, Tuple
 
 import pandas as pd
 
 
 THIS_FILE = Path(__file__).resolve()
 PROJECT_ROOT = THIS_FILE.parents[3]
-SRC_DIR = PROJECT_ROOT / "src"
-
-if str(SRC_DIR) not in sys.path:
-    sys.path.insert(0, str(SRC_DIR))
 
+from tp2025.io.landing_manifest import (
+    LandingFile,
+    LandingManifest,
+    discover_landing_files,
+    parse_daily_filename,
+    read_compacted_day,
+)
 from tp2025.io.load_localdb import get_connection, run_sql
+from tp2025.io.stage_fingerprint import day_slice, files_fingerprint, run_stage, table_checksums
+from tp2025.transforms import leaderboard_cdc
+from tp2025.transforms.leaderboard_cdc import apply_changes
 
 
 LANDING_DIR = PROJECT_ROOT / "data" / "landing"
 
 TABLE_NAME = "raw_pvp_leaderboard"
+DATASET = "pvp_leaderboard"
+
+RAW_COLUMNS = [
+    "id", "name", "slug", "faction",
+    "rank", "rating", "played", "won", "lost",
+    "bracket", "s_id", "fecha_proceso"
+]
+
+# Cuántos días hacia atrás se busca el snapshot completo de una cadena CDC
+CDC_MAX_LOOKBACK_DAYS = int(os.getenv("LEADERBOARD_CDC_MAX_LOOKBACK", "31"))
 
 
-def list_parquet_for_processing_date(processing_date: str) -> List[Path]:
+def list_parquet_for_processing_date(processing_date: str) -> List[LandingFile]:
     """
     Lista solo los archivos parquet de la corrida actual.
     Formato esperado:
-      pvp_leaderboard_s{season_id}_{bracket}_{processing_date}.parquet
+      pvp_leaderboard_s{season_id}_{bracket}_{processing_date}.parquet      (snapshot completo)
+      pvp_leaderboard_cdc_s{season_id}_{bracket}_{processing_date}.parquet  (sólo cambios)
+    o la partición compactada de la temporada (ver compact_landing).
+
+    Se resuelve con el manifest de landing; si el día no está registrado,
+    se busca en el directorio.
     """
     if not LANDING_DIR.exists():
         raise FileNotFoundError(f"No existe landing: {LANDING_DIR}")
 
-    files = []
-    for p in LANDING_DIR.iterdir():
-        if not p.is_file() or not p.name.endswith(".parquet"):
-            continue
-        if not p.name.startswith("pvp_leaderboard_s"):
-            continue
-        if processing_date in p.name:
-            files.append(p)
-
-    return sorted(files)
+    return discover_landing_files(
+        DATASET,
+        processing_date,
+        LANDING_DIR,
+        fallback_glob=f"pvp_leaderboard_*_{processing_date}.parquet",
+    )
 
 
 def parse_metadata(path: Path):
     """
     De:
         pvp_leaderboard_{season_id}_{bracket}_{processing_date}.parquet
+        pvp_leaderboard_cdc_{season_id}_{bracket}_{processing_date}.parquet
+        pvp_leaderboard_{region}_{season_id}_{bracket}_{processing_date}.parquet
     extrae:
         s_id = {season_id}
         bracket = {bracket}
         fecha_proceso = {processing_date}
+
+    Los tokens entre "pvp_leaderboard" y la temporada (cdc / región) se ignoran.
     """
     stem = path.stem
     parts = stem.split("_")
 
-    season_raw = parts[2]
-    bracket = parts[3]
-    fecha = parts[4]
+    season_idx = next(i for i, p in enumerate(parts) if re.fullmatch(r"s\d+", p))
+    season_raw = parts[season_idx]
+    bracket = parts[season_idx + 1]
+    fecha = parts[-1]
 
     s_id = int(season_raw.lstrip("s"))
 
     return s_id, bracket, fecha
 
 
-def load_parquet_to_dataframe(path: Path) -> pd.DataFrame:
-    df = pd.read_parquet(path)
+def is_cdc_file(path: Path) -> bool:
+    return Path(path).name.startswith("pvp_leaderboard_cdc_")
 
-    s_id, bracket, fecha = parse_metadata(path)
 
+def to_raw_frame(df: pd.DataFrame, s_id: int, bracket: str, fecha: str) -> pd.DataFrame:
+    """
+    Lleva un leaderboard normalizado (extract) al formato RAW: todo texto,
+    con bracket / s_id / fecha_proceso.
+    """
+    df = df.copy()
     df["s_id"] = str(s_id)
     df["bracket"] = bracket
     df["fecha_proceso"] = fecha
@@ -77,16 +107,161 @@ def load_parquet_to_dataframe(path: Path) -> pd.DataFrame:
     # Convertir todo a string (texto crudo en RAW)
     df = df.astype(str)
 
-    # Reordenar columnas
-    ordered = [
-        "id", "name", "slug", "faction",
-        "rank", "rating", "played", "won", "lost",
-        "bracket", "s_id", "fecha_proceso"
-    ]
-
     # en caso de columnas no esperadas:
-    remaining = [c for c in df.columns if c not in ordered]
-    return df[ordered + remaining]
+    remaining = [c for c in df.columns if c not in RAW_COLUMNS]
+    return df[RAW_COLUMNS + remaining]
+
+
+def load_parquet_to_dataframe(
+    path: Path | LandingFile, manifest: Optional[LandingManifest] = None
+) -> pd.DataFrame:
+    """
+    Un archivo de landing en formato RAW. Los archivos CDC se reconstruyen
+    con la cadena del manifest (por defecto, el de LANDING_DIR).
+    """
+    if isinstance(path, LandingFile):
+        if path.compacted:
+            # la partición compactada ya tiene el formato RAW
+            return read_compacted_day(path)
+        path = path.path
+
+    s_id, bracket, fecha = parse_metadata(path)
+    if is_cdc_file(path):
+        # sólo cambios: se reconstruye el snapshot completo del día
+        return rebuild_snapshot(s_id, bracket, fecha, manifest)
+
+    return to_raw_frame(pd.read_parquet(path), s_id, bracket, fecha)
+
+
+# ===== CDC: reconstrucción de snapshots =====
+
+@dataclass
+class Snapshot:
+    processing_date: str
+    frame: pd.DataFrame
+    # cantidad de archivos CDC aplicados sobre el último snapshot completo
+    chain_length: int
+
+
+def _previous_day(processing_date: str) -> str:
+    d = datetime.strptime(processing_date, "%Y%m%d").date() - timedelta(days=1)
+    return d.strftime("%Y%m%d")
+
+
+def _snapshot_file(
+    manifest: LandingManifest, processing_date: str, s_id: int, bracket: str
+) -> Optional[LandingFile]:
+    """
+    El archivo con el leaderboard de (temporada, bracket) en un día, si existe.
+    """
+    files = manifest.files(DATASET, processing_date)
+    if files is None:
+        pattern = f"pvp_leaderboard_*s{s_id}_{bracket}_{processing_date}.parquet"
+        files = [
+            LandingFile(p, processing_date)
+            for p in sorted(manifest.landing_dir.glob(pattern))
+            if (parse_daily_filename(p.name) or (None,))[0] == DATASET
+        ]
+
+    for f in files:
+        if f.compacted:
+            return f
+        if parse_metadata(f.path)[:2] == (s_id, bracket):
+            return f
+    return None
+
+
+def _read_full_snapshot(file: LandingFile, s_id: int, bracket: str) -> pd.DataFrame:
+    df = load_parquet_to_dataframe(file)
+    if file.compacted:
+        df = df[(df["s_id"] == str(s_id)) & (df["bracket"] == bracket)]
+    return df.reset_index(drop=True)
+
+
+def _resolve_chain(
+    manifest: LandingManifest, s_id: int, bracket: str, processing_date: str
+) -> Tuple[LandingFile, List[LandingFile]]:
+    """
+    (snapshot completo base, archivos CDC posteriores en orden) para llegar a processing_date.
+    """
+    chain: List[LandingFile] = []
+    day = processing_date
+    for _ in range(CDC_MAX_LOOKBACK_DAYS + 1):
+        file = _snapshot_file(manifest, day, s_id, bracket)
+        if file is not None:
+            if file.compacted or not is_cdc_file(file.path):
+                return file, chain[::-1]
+            chain.append(file)
+        elif day == processing_date:
+            break
+        day = _previous_day(day)
+
+    raise FileNotFoundError(
+        f"No hay snapshot completo de s{s_id}/{bracket} para reconstruir {processing_date} "
+        f"(buscado {CDC_MAX_LOOKBACK_DAYS} días hacia atrás)"
+    )
+
+
+def _rebuild(
+    manifest: LandingManifest, s_id: int, bracket: str, processing_date: str
+) -> Tuple[pd.DataFrame, int]:
+    base, chain = _resolve_chain(manifest, s_id, bracket, processing_date)
+
+    snapshot = _read_full_snapshot(base, s_id, bracket)
+    for file in chain:
+        snapshot = apply_changes(snapshot, pd.read_parquet(file.path))
+
+    snapshot = snapshot.assign(fecha_proceso=processing_date)
+    order = pd.to_numeric(snapshot["rank"], errors="coerce").argsort(kind="stable")
+    return snapshot.iloc[order].reset_index(drop=True), len(chain)
+
+
+def rebuild_snapshot(
+    s_id: int, bracket: str, processing_date: str, manifest: Optional[LandingManifest] = None
+) -> pd.DataFrame:
+    """
+    Snapshot completo (formato RAW) de (temporada, bracket) en processing_date:
+    último snapshot completo + los archivos CDC hasta ese día.
+    manifest: el del landing a usar (por defecto, el de LANDING_DIR).
+    """
+    manifest = manifest or LandingManifest.load(LANDING_DIR)
+    return _rebuild(manifest, s_id, bracket, processing_date)[0]
+
+
+def latest_snapshot(
+    s_id: int, bracket: str, before: str, manifest: Optional[LandingManifest] = None
+) -> Optional[Snapshot]:
+    """
+    El último snapshot disponible de (temporada, bracket) anterior a `before`, o None.
+    """
+    manifest = manifest or LandingManifest.load(LANDING_DIR)
+    day = _previous_day(before)
+    for _ in range(CDC_MAX_LOOKBACK_DAYS):
+        if _snapshot_file(manifest, day, s_id, bracket) is not None:
+            try:
+                frame, chain_length = _rebuild(manifest, s_id, bracket, day)
+            except FileNotFoundError:
+                return None
+            return Snapshot(day, frame, chain_length)
+        day = _previous_day(day)
+    return None
+
+
+def input_files(processing_date: str) -> List[LandingFile]:
+    """
+    Archivos de landing de los que depende el RAW del día: los del día y, para
+    los CDC, la cadena hasta su snapshot completo.
+    """
+    files = list_parquet_for_processing_date(processing_date)
+    inputs = list(files)
+    manifest: Optional[LandingManifest] = None
+    for f in files:
+        if not f.compacted and is_cdc_file(f.path):
+            manifest = manifest or LandingManifest.load(LANDING_DIR)
+            s_id, bracket, _ = parse_metadata(f.path)
+            base, chain = _resolve_chain(manifest, s_id, bracket, processing_date)
+            inputs.extend([base, *chain])
+    return inputs
 
 
 def ensure_table_exists(conn):
@@ -115,6 +290,10 @@ def ensure_table_exists(conn):
 def load_into_duckdb(processing_date: str):
     """
     Lee los parquet de la fecha de procesamiento y los inserta en DuckDB.
+
+    Los días CDC se reconstruyen como snapshot completo antes de insertar:
+    RAW guarda el snapshot entero de cada día, no las filas de cambio (el
+    modo CDC sólo achica landing, no RAW ni el warehouse).
     """
     files = list_parquet_for_processing_date(processing_date)
     if not files:
@@ -135,9 +314,16 @@ def load_into_duckdb(processing_date: str):
     print(f"Cargadas {len(full_df)} filas en tabla {TABLE_NAME}")
 
 
-def run_load_leaderboard_raw_to_db():
-    processing_date = date.today().strftime("%Y%m%d")
-    load_into_duckdb(processing_date)
+def run_load_leaderboard_raw_to_db(processing_date: str | None = None):
+    processing_date = processing_date or date.today().strftime("%Y%m%d")
+    run_stage(
+        "load_leaderboard_raw_to_db",
+        processing_date,
+        run=lambda: load_into_duckdb(processing_date),
+        inputs=lambda: files_fingerprint(input_files(processing_date)),
+        outputs=lambda: table_checksums({TABLE_NAME: day_slice(TABLE_NAME, processing_date)}),
+        code=(sys.modules[__name__], leaderboard_cdc),
+    )
 
 
 if __name__ == "__main__":
@@ -1,96 +1,209 @@
 from __future__ import annotations
 
-from datetime import date
-from typing import Optional
 import sys
-from pathlib import Path
-
-THIS_FILE = Path(__file__).resolve()
-PROJECT_ROOT = THIS_FILE.parents[3]
-SRC_DIR = PROJECT_ROOT / "src"
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from typing import Dict, List, Optional, Sequence, Tuple
 
-if str(SRC_DIR) not in sys.path:
-    sys.path.insert(0, str(SRC_DIR))
+from psycopg2.errors import UndefinedTable
 
 from tp2025.io.load_localdb import get_connection as get_duckdb_connection
+from tp2025.io.stage_fingerprint import day_slice, run_stage, table_checksums
+from tp2025.transforms.leaderboard_summary import CHINFO_CUR, LEADERBOARD_CUR, SUMMARY_TABLES
+from tp2025.warehouse import arrow_transfer, redshift_model
 from tp2025.warehouse.connect_redshift import get_connection as get_redshift_connection
+from tp2025.warehouse.arrow_transfer import transfer_query
 from tp2025.warehouse.redshift_model import (
-    create_tables,
-    load_dim_character_scd2,
-    load_fact_leaderboard,
+    DIM_CHARACTER_COLUMNS,
+    FACT_LEADERBOARD_COLUMNS,
+    delete_days,
+    ensure_tables,
+    invalidate_ddl_cache,
+    snapshot_date_for,
 )
 
 
+# Lecturas de CUR con parámetros posicionales ($1, $2): DuckDB bindea los
+# valores (no se mezclan con el texto del SQL) y cachea el plan de cada statement.
+CUR_CHINFO_BY_DATE_SQL = """
+    SELECT
+        char_id,
+        char_name,
+        slug_name,
+        faction_type,
+        class_name,
+        current_spec,
+        fecha_proceso
+    FROM wow_data.main.cur_chinfo
+    WHERE fecha_proceso = $1
+"""
+
+CUR_LEADERBOARD_BY_DATE_SQL = """
+    SELECT
+        char_id,
+        char_name,
+        slug_name,
+        faction_type,
+        ranking,
+        rating,
+        games_played,
+        games_won,
+        games_lost,
+        bracket_id,
+        season_id,
+        fecha_proceso
+    FROM wow_data.main.cur_pvp_leaderboard
+    WHERE fecha_proceso = $1
+"""
+
+# Lecturas para el streaming Arrow: mismo orden de columnas que las tablas destino,
+# ENUMs casteados a VARCHAR y tipos ya alineados con Redshift.
+DIM_CHARACTER_ROWS_SQL = """
+    SELECT
+        char_id,
+        char_name,
+        slug_name::VARCHAR     AS slug_name,
+        faction_type::VARCHAR  AS faction_type,
+        class_name::VARCHAR    AS class_name,
+        current_spec::VARCHAR  AS current_spec,
+        fecha_proceso
+    FROM wow_data.main.cur_chinfo
+    WHERE fecha_proceso = $1
+"""
+
+FACT_LEADERBOARD_ROWS_SQL = """
+    SELECT
+        CAST($2 AS DATE)       AS snapshot_date,
+        char_id,
+        season_id,
+        bracket_id::VARCHAR    AS bracket_id,
+        rating,
+        ranking,
+        games_played,
+        games_won,
+        games_lost
+    FROM wow_data.main.cur_pvp_leaderboard
+    WHERE fecha_proceso = $1
+"""
+
+SUMMARY_ROWS_SQL = {table: f"SELECT * FROM {table} WHERE fecha_proceso = $1" for table in SUMMARY_TABLES}
+
+
 def fetch_cur_chinfo(processing_date: str, duck_conn):
-    query = f"""
-        SELECT
-            char_id,
-            char_name,
-            slug_name,
-            faction_type,
-            class_name,
-            current_spec,
-            fecha_proceso
-        FROM wow_data.main.cur_chinfo
-        WHERE fecha_proceso = '{processing_date}';
-    """
-    return duck_conn.execute(query).fetchdf()
+    return duck_conn.execute(CUR_CHINFO_BY_DATE_SQL, [processing_date]).fetchdf()
 
 
 def fetch_cur_leaderboard(processing_date: str, duck_conn):
-    query = f"""
-        SELECT
-            char_id,
-            char_name,
-            slug_name,
-            faction_type,
-            ranking,
-            rating,
-            games_played,
-            games_won,
-            games_lost,
-            bracket_id,
-            season_id,
-            fecha_proceso
-        FROM wow_data.main.cur_pvp_leaderboard
-        WHERE fecha_proceso = '{processing_date}';
+    return duck_conn.execute(CUR_LEADERBOARD_BY_DATE_SQL, [processing_date]).fetchdf()
+
+
+def day_reads(processing_date: str) -> List[Tuple[str, Sequence[str] | None, str, list]]:
     """
-    return duck_conn.execute(query).fetchdf()
+    (tabla destino, columnas, SELECT de DuckDB, parámetros) de cada tabla que
+    se carga por día. Columnas None = las del SELECT (agregados).
+    """
+    snapshot_date = snapshot_date_for(processing_date)
+    return [
+        ("dim_character_scd2", DIM_CHARACTER_COLUMNS, DIM_CHARACTER_ROWS_SQL, [processing_date]),
+        (
+            "fact_pvp_leaderboard_snapshot",
+            FACT_LEADERBOARD_COLUMNS,
+            FACT_LEADERBOARD_ROWS_SQL,
+            [processing_date, snapshot_date],
+        ),
+        *[(table, None, SUMMARY_ROWS_SQL[table], [processing_date]) for table in SUMMARY_TABLES],
+    ]
+
+
+def load_day(processing_date: str, duck_conn, red_conn) -> Dict[str, int]:
+    """
+    Reemplaza el día en Redshift (dim, fact y agg_*) en una sola transacción
+    de red_conn:
+
+    - DELETE del slice del día en todas las tablas (ver delete_days) y después
+      INSERT de cada una, en serie por la misma conexión.
+    - Un único commit al final. Si algo falla se hace rollback y el día queda
+      como estaba; el reintento vuelve a borrar y cargar (no duplica).
+    - Sólo las lecturas de DuckDB corren en paralelo: cada SELECT arranca en
+      su propio cursor mientras se escriben las tablas anteriores.
+    """
+    reads = day_reads(processing_date)
+    cursors = [duck_conn.cursor() for _ in reads]
+    counts: Dict[str, int] = {}
+    try:
+        with ThreadPoolExecutor(max_workers=len(reads)) as executor:
+            results = [
+                executor.submit(cursor.execute, sql, params)
+                for cursor, (_, _, sql, params) in zip(cursors, reads)
+            ]
+            delete_days(red_conn, [processing_date])
+            for fut, (table, columns, _, _) in zip(results, reads):
+                result = fut.result()
+                columns = columns or [d[0] for d in result.description]
+                counts[table] = transfer_query(result, red_conn, table, columns, commit=False)
+        red_conn.commit()
+    except Exception:
+        red_conn.rollback()
+        raise
+    finally:
+        for cursor in cursors:
+            cursor.close()
+    return counts
 
 
-def main(processing_date: Optional[str] = None) -> None:
+def load_warehouse_day(processing_date: str) -> None:
     """
     Carga diaria hacia Redshift:
 
-    - Lee cur_chinfo y cur_pvp_leaderboard de DuckDB para una fecha de proceso.
-    - Crea las tablas del modelo estrella si no existen.
-    - Appendea snapshot de personajes en dim_character_scd2 (SCD2 simple por fecha_proceso).
-    - Appendea snapshot del leaderboard en fact_pvp_leaderboard_snapshot.
+    - Lee cur_chinfo, cur_pvp_leaderboard y los agregados de DuckDB para una
+      fecha de proceso, como RecordBatches de Arrow de tamaño fijo (memoria
+      constante, sin pandas).
+    - Crea las tablas del modelo estrella si no existen (cacheado: los DDL
+      no se re-emiten en cada corrida).
+    - Reemplaza el día en dim_character_scd2 (SCD2 simple por fecha_proceso),
+      fact_pvp_leaderboard_snapshot (snapshot_date = fecha_proceso) y agg_*,
+      en una sola transacción sobre una única conexión (ver load_day).
     """
-    if processing_date is None:
-        processing_date = date.today().strftime("%Y%m%d")
-
-    # 1) Leer datos desde DuckDB
+    # DuckDB queda abierta mientras se streamean los batches
     duck_conn = get_duckdb_connection()
+    red_conn = get_redshift_connection()
     try:
-        df_chinfo = fetch_cur_chinfo(processing_date, duck_conn)
-        df_leaderboard = fetch_cur_leaderboard(processing_date, duck_conn)
+        ensure_tables(red_conn)
+        try:
+            counts = load_day(processing_date, duck_conn, red_conn)
+        except UndefinedTable:
+            # Las tablas se borraron desde la última corrida: el cache de DDL quedó viejo
+            invalidate_ddl_cache()
+            ensure_tables(red_conn)
+            counts = load_day(processing_date, duck_conn, red_conn)
     finally:
+        red_conn.close()
         duck_conn.close()
 
-    # 2) Conectar a Redshift
-    red_conn = get_redshift_connection()
-    try:
-        # Crear tablas del modelo estrella (dim + fact)
-        create_tables(red_conn)
+    n_agg = {t: n for t, n in counts.items() if t in SUMMARY_TABLES}
+    print(
+        f"[load_warehouse_redshift] {counts['dim_character_scd2']} filas en dim_character_scd2, "
+        f"{counts['fact_pvp_leaderboard_snapshot']} filas en fact_pvp_leaderboard_snapshot, "
+        f"agregados {n_agg} (fecha_proceso={processing_date})"
+    )
 
-        # Cargar dimensión SCD2 simplificada
-        load_dim_character_scd2(red_conn, df_chinfo)
 
-        # Cargar fact de snapshot del leaderboard
-        load_fact_leaderboard(red_conn, df_leaderboard, snapshot_date=date.today())
-    finally:
-        red_conn.close()
+def main(processing_date: Optional[str] = None) -> None:
+    """
+    load_warehouse_day salvo que las tablas de DuckDB del día sean las mismas
+    de la última carga exitosa (recargar reemplaza el día: sólo ahorra la carga).
+    """
+    if processing_date is None:
+        processing_date = date.today().strftime("%Y%m%d")
+
+    sources = [CHINFO_CUR, LEADERBOARD_CUR, *SUMMARY_TABLES]
+    run_stage(
+        "load_warehouse_redshift",
+        processing_date,
+        run=lambda: load_warehouse_day(processing_date),
+        inputs=lambda: table_checksums({t: day_slice(t, processing_date) for t in sources}),
+        code=(sys.modules[__name__], redshift_model, arrow_transfer),
+    )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from tp2025.blizzard_api.decoding import LeaderboardPayload, ProfilePayload, decode
+from tp2025.io.payload_archive import (
+    ARCHIVE_DIR,
+    LEADERBOARD_ENDPOINT,
+    PROFILE_ENDPOINT,
+    PayloadArchive,
+    parse_leaderboard_key,
+)
+from tp2025.jobs.backfill import date_range
+from tp2025.jobs.extract_chinfo_to_landing import save_profiles_to_parquet
+from tp2025.jobs.extract_leaderboard_to_landing import land_leaderboard, normalize_leaderboard_entries
+from tp2025.services.ch_profile_client import build_profiles_dataframe, decode_body
+
+DATASETS = ("leaderboard", "profiles")
+
+
+def replay_leaderboard(processing_date: str, archive: PayloadArchive) -> List[Path]:
+    """
+    Vuelve a generar el landing del leaderboard de un día desde los payloads
+    archivados (el último de cada región / temporada / bracket), sin llamar a la API.
+    Se guarda siempre el snapshot completo (no CDC): los días se pueden
+    reprocesar en cualquier orden.
+    """
+    paths: List[Path] = []
+    for item in archive.iter_day(LEADERBOARD_ENDPOINT, processing_date):
+        region, season_id, bracket = parse_leaderboard_key(item.key)
+        df = normalize_leaderboard_entries(decode(item.body, LeaderboardPayload))
+        paths.append(land_leaderboard(df, season_id, bracket, processing_date, cdc=False, region=region))
+        print(f"[replay_archive] {item.key} ({processing_date}): {len(df)} filas")
+    return paths
+
+
+def replay_profiles(processing_date: str, archive: PayloadArchive) -> Optional[Path]:
+    """
+    Vuelve a generar ch_profile_{fecha}.parquet desde los perfiles archivados.
+    """
+    meta_and_payloads: List[Tuple[Dict[str, Any], Dict[str, Any] | None]] = []
+    for item in archive.iter_day(PROFILE_ENDPOINT, processing_date):
+        realm_slug, char_name = item.key.split("/", 1)
+        meta = {"slug_name": realm_slug, "char_name": char_name, "fecha_proceso": processing_date}
+        meta_and_payloads.append((meta, decode_body(item.body, ProfilePayload, item.key)))
+
+    if not meta_and_payloads:
+        print(f"[replay_archive] Sin perfiles archivados para {processing_date}")
+        return None
+    path = save_profiles_to_parquet(build_profiles_dataframe(meta_and_payloads), processing_date)
+    print(f"[replay_archive] {len(meta_and_payloads)} perfiles ({processing_date}) en: {path}")
+    return path
+
+
+def run_replay_archive(
+    processing_date: str,
+    end_date: str | None = None,
+    datasets: Tuple[str, ...] = DATASETS,
+    archive: PayloadArchive | None = None,
+) -> None:
+    """
+    Replay de uno o varios días del archivo de payloads a landing. Después,
+    el backfill (o el DAG sin las extracciones) carga RAW / CUR / warehouse.
+    """
+    archive = archive or PayloadArchive(ARCHIVE_DIR)
+    for day in date_range(processing_date, end_date or processing_date):
+        if "leaderboard" in datasets:
+            replay_leaderboard(day, archive)
+        if "profiles" in datasets:
+            replay_profiles(day, archive)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay del archivo de payloads crudos a landing")
+    parser.add_argument("start", help="Fecha inicial YYYYMMDD")
+    parser.add_argument("end", nargs="?", help="Fecha final YYYYMMDD (inclusive)")
+    parser.add_argument("--only", choices=DATASETS, help="Sólo leaderboard o sólo perfiles")
+    args = parser.parse_args()
+
+    run_replay_archive(args.start, args.end, datasets=(args.only,) if args.only else DATASETS)
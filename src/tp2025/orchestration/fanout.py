@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+THIS_FILE = Path(__file__).resolve()
+PROJECT_ROOT = THIS_FILE.parents[3]
+
+# Respuestas crudas que el trigger deja para que la task las procese al reanudar.
+# Tiene que ser un directorio compartido entre el triggerer y los workers.
+SPOOL_DIR = Path(os.getenv("DEFERRABLE_SPOOL_DIR", str(PROJECT_ROOT / "data" / "spool")))
+# Requests en vuelo por trigger (el rate limiter compartido sigue mandando)
+FANOUT_CONCURRENCY = int(os.getenv("DEFERRABLE_CONCURRENCY", "16"))
+
+# fetch(session, url, label) -> (status, body crudo o None)
+Fetch = Callable[[Any, str, str], Tuple[Optional[int], Optional[bytes]]]
+
+
+@dataclass(frozen=True)
+class SpooledResponse:
+    key: str
+    status: Optional[int]
+    body: Optional[bytes]
+
+
+def spool_path(stage: str, processing_date: str, unit: str) -> Path:
+    """
+    Archivo de spool de una unidad (shard / región-bracket) de una etapa y día.
+    """
+    return SPOOL_DIR / f"{stage}_{processing_date}_{unit}.jsonl"
+
+
+def read_spool(path: Path) -> Iterator[SpooledResponse]:
+    """
+    Respuestas del spool, una por request (status None = sin respuesta).
+    """
+    with Path(path).open("r", encoding="utf-8") as fh:
+        for line in fh:
+            record = json.loads(line)
+            body = record["body"]
+            yield SpooledResponse(
+                record["key"], record["status"], body.encode("utf-8") if body is not None else None
+            )
+
+
+def _default_fetch() -> Fetch:
+    # import diferido: el triggerer importa este módulo sin pandas
+    from tp2025.services.ch_profile_client import fetch_json_response, get_bearer_token
+
+    token = get_bearer_token()
+
+    def fetch(session: Any, url: str, label: str) -> Tuple[Optional[int], Optional[bytes]]:
+        return fetch_json_response(session, token, url, label, raw=True)
+
+    return fetch
+
+
+async def fan_out(
+    requests_: List[Dict[str, str]],
+    path: Path,
+    concurrency: int = FANOUT_CONCURRENCY,
+    fetch: Fetch | None = None,
+) -> Dict[str, int]:
+    """
+    Hace los GET de requests_ ([{"key", "url"}]) con hasta `concurrency` en
+    vuelo y escribe cada respuesta cruda en el spool (JSON lines). El archivo
+    aparece recién completo (tmp + rename). Devuelve cuántas dieron 200, 404
+    o fallaron.
+
+    Cada GET corre sobre blizzard_get: pasa por el mismo rate limiter, pool
+    de credenciales y reintentos de 429 que las extracciones sincrónicas.
+    Como esas esperas bloquean, corren en un executor propio de `concurrency`
+    threads y no en el executor por defecto del loop, que el triggerer
+    comparte con el resto de los triggers.
+    """
+    import requests
+
+    concurrency = max(1, concurrency)
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="fanout")
+    semaphore = asyncio.Semaphore(concurrency)
+    counts = {"ok": 0, "not_found": 0, "failed": 0}
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+
+    try:
+        fetch = fetch or await loop.run_in_executor(executor, _default_fetch)
+        with requests.Session() as session, tmp.open("w", encoding="utf-8") as out:
+
+            async def one(request: Dict[str, str]) -> None:
+                async with semaphore:
+                    status, body = await loop.run_in_executor(
+                        executor, fetch, session, request["url"], request["key"]
+                    )
+                # las escrituras corren en el loop: no se pisan entre requests
+                out.write(json.dumps({
+                    "key": request["key"],
+                    "status": status,
+                    "body": body.decode("utf-8") if body is not None else None,
+                }) + "\n")
+                if status == 200 and body is not None:
+                    counts["ok"] += 1
+                elif status == 404:
+                    counts["not_found"] += 1
+                else:
+                    counts["failed"] += 1
+
+            await asyncio.gather(*(one(r) for r in requests_))
+        tmp.replace(path)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+        tmp.unlink(missing_ok=True)
+
+    print(
+        f"[fanout] {len(requests_)} requests -> {path.name}: "
+        f"{counts['ok']} ok, {counts['not_found']} 404, {counts['failed']} fallidos"
+    )
+    return counts
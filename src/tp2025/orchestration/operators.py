@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import os
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Dict, List
+
+from airflow.exceptions import AirflowException  # type: ignore
+from airflow.models import BaseOperator  # type: ignore
+
+# Sólo stdlib + airflow: el DAG importa este módulo al parsear. Los jobs
+# (pandas, duckdb, requests) se importan recién en execute / execute_complete.
+from tp2025.orchestration.fanout import FANOUT_CONCURRENCY, spool_path
+from tp2025.orchestration.triggers import BlizzardFanOutTrigger
+
+# Tope para el fan-out en el triggerer (si se pasa, la task falla y reintenta)
+DEFERRABLE_TIMEOUT = timedelta(minutes=int(os.getenv("DEFERRABLE_TIMEOUT_MINUTES", "60")))
+
+
+def _today() -> str:
+    return date.today().strftime("%Y%m%d")
+
+
+def _spool_from_event(event: Dict[str, Any]) -> Path:
+    if event.get("status") != "success":
+        raise AirflowException(f"Falló el fan-out a la API: {event.get('message')}")
+    print(
+        f"[deferrable] Fan-out terminado: {event['ok']} ok, "
+        f"{event['not_found']} 404, {event['failed']} fallidos"
+    )
+    return Path(event["spool_path"])
+
+
+class DeferrableLeaderboardOperator(BaseOperator):
+    """
+    Extracción del leaderboard de un (región, bracket) en modo diferido:
+    execute resuelve token / temporada y difiere; el GET corre en el triggerer
+    y la task vuelve a un worker sólo para normalizar y guardar en landing.
+    Mismo resultado (y XCom) que extract_leaderboard_shard.
+    """
+
+    template_fields = ("processing_date",)
+
+    def __init__(
+        self,
+        *,
+        bracket: str,
+        region: str | None = None,
+        processing_date: str | None = None,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(**kwargs)
+        self.bracket = bracket
+        self.region = region
+        self.processing_date = processing_date
+
+    def execute(self, context: Any) -> None:
+        from tp2025.jobs.extract_leaderboard_to_landing import leaderboard_request
+
+        processing_date = self.processing_date or _today()
+        request = leaderboard_request(self.bracket, region=self.region)
+        path = spool_path("pvp_leaderboard", processing_date, request["key"].replace("/", "_"))
+        self.defer(
+            trigger=BlizzardFanOutTrigger([request], str(path), concurrency=1),
+            method_name="execute_complete",
+            kwargs={"processing_date": processing_date},
+            timeout=DEFERRABLE_TIMEOUT,
+        )
+
+    def execute_complete(self, context: Any, event: Dict[str, Any], processing_date: str) -> str:
+        from tp2025.jobs.extract_leaderboard_to_landing import land_spooled_leaderboard
+
+        spool = _spool_from_event(event)
+        paths = land_spooled_leaderboard(spool, processing_date)
+        spool.unlink(missing_ok=True)
+        return paths[0]
+
+
+class DeferrableChinfoShardOperator(BaseOperator):
+    """
+    Extracción de perfiles de un shard en modo diferido: execute arma las URLs
+    pendientes (selección del shard menos checkpoint y cache negativo) y
+    difiere; los GET corren en el triggerer y la task vuelve a un worker para
+    escribir el checkpoint del shard. Deja lo mismo que extract_chinfo_shard,
+    así que merge_chinfo_shards no cambia. XCom: perfiles guardados.
+    """
+
+    template_fields = ("processing_date",)
+
+    def __init__(
+        self,
+        *,
+        shard: int,
+        n_shards: int,
+        processing_date: str | None = None,
+        concurrency: int = FANOUT_CONCURRENCY,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(**kwargs)
+        self.shard = shard
+        self.n_shards = n_shards
+        self.processing_date = processing_date
+        self.concurrency = concurrency
+
+    def execute(self, context: Any) -> int:
+        from tp2025.jobs.extract_chinfo_to_landing import plan_chinfo_shard_requests
+
+        processing_date = self.processing_date or _today()
+        requests: List[Dict[str, str]] = plan_chinfo_shard_requests(
+            self.shard, self.n_shards, processing_date
+        )
+        if not requests:
+            print(f"[deferrable] Shard {self.shard}/{self.n_shards} sin perfiles pendientes.")
+            return 0
+
+        path = spool_path("ch_profile", processing_date, f"{self.shard:03d}of{self.n_shards:03d}")
+        self.defer(
+            trigger=BlizzardFanOutTrigger(requests, str(path), concurrency=self.concurrency),
+            method_name="execute_complete",
+            kwargs={"processing_date": processing_date},
+            timeout=DEFERRABLE_TIMEOUT,
+        )
+
+    def execute_complete(self, context: Any, event: Dict[str, Any], processing_date: str) -> int:
+        from tp2025.jobs.extract_chinfo_to_landing import land_spooled_profiles
+
+        spool = _spool_from_event(event)
+        count = land_spooled_profiles(self.shard, self.n_shards, spool, processing_date)
+        spool.unlink(missing_ok=True)
+        return count
@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Tuple
+
+from airflow.triggers.base import BaseTrigger, TriggerEvent  # type: ignore
+
+from tp2025.orchestration.fanout import FANOUT_CONCURRENCY, fan_out
+
+
+class BlizzardFanOutTrigger(BaseTrigger):
+    """
+    Corre en el triggerer: hace los GET de una task diferida (ver fanout.fan_out),
+    deja las respuestas en el spool y avisa a la task con un evento chico
+    (ruta del spool + conteos). Mientras tanto la task no ocupa worker ni slot.
+    """
+
+    def __init__(
+        self,
+        requests: List[Dict[str, str]],
+        spool_path: str,
+        concurrency: int = FANOUT_CONCURRENCY,
+    ) -> None:
+        super().__init__()
+        self.requests = requests
+        self.spool_path = spool_path
+        self.concurrency = concurrency
+
+    def serialize(self) -> Tuple[str, Dict[str, Any]]:
+        return (
+            "tp2025.orchestration.triggers.BlizzardFanOutTrigger",
+            {
+                "requests": self.requests,
+                "spool_path": self.spool_path,
+                "concurrency": self.concurrency,
+            },
+        )
+
+    async def run(self) -> AsyncIterator[TriggerEvent]:
+        try:
+            counts = await fan_out(self.requests, Path(self.spool_path), self.concurrency)
+        except Exception as exc:
+            yield TriggerEvent({"status": "error", "message": f"{type(exc).__name__}: {exc}"})
+            return
+        yield TriggerEvent({"status": "success", "spool_path": self.spool_path, **counts})
@@ -2,21 +2,22 @@ from __future__ import annotations
 
 import sys
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from pathlib import Path
-from typing import Any, Dict, List, Tuple
+from datetime import date
+from typing import Any, Callable, Dict, List, Tuple
 
 import pandas as pd
 import requests
 
-THIS_FILE = Path(__file__).resolve()
-PROJECT_ROOT = THIS_FILE.parents[3]
-SRC_DIR = PROJECT_ROOT / "src"
-
-if str(SRC_DIR) not in sys.path:
-    sys.path.insert(0, str(SRC_DIR))
-
+from tp2025.blizzard_api.decoding import ProfilePayload, decode
 from tp2025.blizzard_api.endpoints import get_character_profile_url
 from tp2025.blizzard_api.auth_client import load_token_from_file
+from tp2025.blizzard_api.credential_pool import (
+    blizzard_get,
+    credential_pool_enabled,
+    get_credential_pool,
+)
+from tp2025.io.payload_archive import PROFILE_ENDPOINT, get_payload_archive, profile_key
+from tp2025.services.missing_characters import MissingCharacterCache
 
 MAX_WORKERS = 8
 
@@ -24,6 +25,9 @@ MAX_WORKERS = 8
 # ===== Token =====
 
 def get_bearer_token() -> str:
+    if credential_pool_enabled():
+        # con varios clientes cada request lleva el token de su cliente (ver fetch_json_url)
+        return get_credential_pool().token()
     token = load_token_from_file()
     if not token:
         raise RuntimeError(
@@ -35,43 +39,146 @@ def get_bearer_token() -> str:
 
 # ===== Requests concurrentes =====
 
-def fetch_single_character_profile(
+def fetch_json_response(
     session: requests.Session,
     token: str,
-    realm_slug: str,
-    character_name: str,
-) -> Dict[str, Any] | None:
-    url = get_character_profile_url(
-        realm_slug=realm_slug,
-        character_name=character_name,
-    )
-    headers = {"Authorization": f"Bearer {token}"}
-
+    url: str,
+    label: str,
+    schema: Any = None,
+    raw: bool = False,
+) -> Tuple[int | None, Any]:
+    """
+    GET autenticado a la API. Devuelve (status, JSON); el JSON es None si falla
+    (el error se loguea por stderr con el label indicado) y el status es None
+    si no hubo respuesta.
+    schema: esquema de decoding (p.ej. ProfilePayload) para decodificar sólo esos campos.
+    raw: devuelve los bytes del body sin decodificar (los decodifica otro proceso).
+    Con pool de credenciales (BLIZZARD_CLIENTS) el request se reparte entre clientes.
+    """
     try:
-        resp = session.get(url, headers=headers, timeout=10)
+        resp = blizzard_get(url, token, session=session, timeout=10)
     except requests.RequestException as exc:
         print(
-            f"[ch_profile_client] Error de conexión para {realm_slug}/{character_name}: {exc}",
+            f"[ch_profile_client] Error de conexión para {label}: {exc}",
             file=sys.stderr,
         )
-        return None
+        return None, None
 
     if resp.status_code != 200:
         print(
-            f"[ch_profile_client] Status {resp.status_code} para {realm_slug}/{character_name} - url={url}",
+            f"[ch_profile_client] Status {resp.status_code} para {label} - url={url}",
             file=sys.stderr,
         )
+        return resp.status_code, None
+
+    if raw:
+        return resp.status_code, resp.content
+    return resp.status_code, decode_body(resp.content, schema, label)
+
+
+def decode_body(body: bytes, schema: Any, label: str) -> Dict[str, Any] | None:
+    """
+    Decodifica un body de la API; si es inválido lo loguea y devuelve None.
+    """
+    try:
+        return decode(body, schema)
+    except ValueError as exc:
+        print(f"[ch_profile_client] Payload inválido para {label}: {exc}", file=sys.stderr)
         return None
 
-    return resp.json()
 
+def fetch_json_url(
+    session: requests.Session,
+    token: str,
+    url: str,
+    label: str,
+) -> Dict[str, Any] | None:
+    """
+    Como fetch_json_response, pero sólo el JSON (o None si falla).
+    """
+    return fetch_json_response(session, token, url, label)[1]
 
-def fetch_profiles_concurrently(
-    chars_df: pd.DataFrame,
+
+def _fetch_profile_response(
+    session: requests.Session,
     token: str,
+    realm_slug: str,
+    character_name: str,
+    raw: bool = False,
+    processing_date: str | None = None,
+) -> Tuple[int | None, Any]:
+    """
+    (status, perfil decodificado o bytes crudos si raw). El body crudo queda
+    además en el archivo de payloads (ver payload_archive), salvo PAYLOAD_ARCHIVE=0.
+    """
+    url = get_character_profile_url(
+        realm_slug=realm_slug,
+        character_name=character_name,
+    )
+    label = f"{realm_slug}/{character_name}"
+    status, body = fetch_json_response(session, token, url, label, raw=True)
+    if body is None:
+        return status, None
+
+    archive_profile_body(realm_slug, character_name, body, processing_date)
+    if raw:
+        return status, body
+    return status, decode_body(body, ProfilePayload, label)
+
+
+def archive_profile_body(
+    realm_slug: str,
+    character_name: str,
+    body: bytes,
+    processing_date: str | None = None,
+) -> None:
+    """
+    Guarda el body crudo de un perfil en el archivo de payloads (sin flush;
+    lo hace quien termina el lote). No hace nada con PAYLOAD_ARCHIVE=0.
+    """
+    archive = get_payload_archive()
+    if archive is not None:
+        archive.add(
+            PROFILE_ENDPOINT,
+            profile_key(realm_slug, character_name),
+            body,
+            processing_date or date.today().strftime("%Y%m%d"),
+        )
+
+
+def profile_meta(rec: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Meta de un personaje de la selección que acompaña a su perfil.
+    """
+    return {
+        "char_id": rec["char_id"],
+        "char_name": rec["char_name"],
+        "slug_name": rec["slug_name"],
+        "bracket_id": rec["bracket_id"],
+        "season_id": rec["season_id"],
+        "fecha_proceso": rec["fecha_proceso"],
+    }
+
+
+def fetch_single_character_profile(
+    session: requests.Session,
+    token: str,
+    realm_slug: str,
+    character_name: str,
+) -> Dict[str, Any] | None:
+    return _fetch_profile_response(session, token, realm_slug, character_name)[1]
+
+
+def run_profile_fetches(
+    chars_df: pd.DataFrame,
+    fetch: Callable[[requests.Session, Dict[str, Any]], Tuple[int | None, Any]],
     max_workers: int = MAX_WORKERS,
-) -> List[Tuple[Dict[str, Any], Dict[str, Any] | None]]:
+    missing_cache: MissingCharacterCache | None = None,
+) -> List[Tuple[Dict[str, Any], Any]]:
     """
+    Corre `fetch(session, meta)` por cada personaje de chars_df en un pool de
+    threads y devuelve [(meta, resultado)]. Los 404 van al cache negativo.
+
     chars_df: columnas mínimas:
       - char_id
       - char_name
@@ -81,37 +188,56 @@ def fetch_profiles_concurrently(
       - fecha_proceso
     """
     records = chars_df.to_dict("records")
-    results: List[Tuple[Dict[str, Any], Dict[str, Any] | None]] = []
+    results: List[Tuple[Dict[str, Any], Any]] = []
+    not_found: List[Tuple[str, str, Any]] = []
 
     with requests.Session() as session:
         with ThreadPoolExecutor(max_workers=max_workers) as executor:
             future_to_meta = {}
             for rec in records:
-                meta = {
-                    "char_id": rec["char_id"],
-                    "char_name": rec["char_name"],
-                    "slug_name": rec["slug_name"],
-                    "bracket_id": rec["bracket_id"],
-                    "season_id": rec["season_id"],
-                    "fecha_proceso": rec["fecha_proceso"],
-                }
-                fut = executor.submit(
-                    fetch_single_character_profile,
-                    session,
-                    token,
-                    rec["slug_name"],
-                    rec["char_name"].lower(),
-                )
-                future_to_meta[fut] = meta
+                meta = profile_meta(rec)
+                future_to_meta[executor.submit(fetch, session, meta)] = meta
 
             for fut in as_completed(future_to_meta):
                 meta = future_to_meta[fut]
-                payload = fut.result()
-                results.append((meta, payload))
+                status, result = fut.result()
+                if status == 404:
+                    not_found.append((meta["slug_name"], meta["char_name"], meta["char_id"]))
+                results.append((meta, result))
+
+    archive = get_payload_archive()
+    if archive is not None:
+        archive.flush()
+
+    if missing_cache is not None and not_found:
+        missing_cache.add_many(not_found)
+        print(f"[ch_profile_client] {len(not_found)} perfiles con 404 agregados al cache negativo")
 
     return results
 
 
+def fetch_profiles_concurrently(
+    chars_df: pd.DataFrame,
+    token: str,
+    max_workers: int = MAX_WORKERS,
+    missing_cache: MissingCharacterCache | None = None,
+) -> List[Tuple[Dict[str, Any], Dict[str, Any] | None]]:
+    """
+    Perfiles de chars_df (ver run_profile_fetches), decodificados en los threads.
+
+    missing_cache: si se pasa, los 404 se registran ahí (ver missing_characters).
+    """
+    return run_profile_fetches(
+        chars_df,
+        lambda session, meta: _fetch_profile_response(
+            session, token, meta["slug_name"], meta["char_name"].lower(),
+            processing_date=meta["fecha_proceso"],
+        ),
+        max_workers=max_workers,
+        missing_cache=missing_cache,
+    )
+
+
 # ===== Normalización =====
 
 def normalize_profile_row(
@@ -137,7 +263,6 @@ def normalize_profile_row(
     return row
 
 
-
 def build_profiles_dataframe(
     meta_and_payloads: List[Tuple[Dict[str, Any], Dict[str, Any] | None]]
 ) -> pd.DataFrame:
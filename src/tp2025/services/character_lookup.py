@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlparse
+
+import numpy as np
+
+from tp2025.io.load_localdb import get_connection
+
+LOOKUP_QUERY = """
+SELECT
+    l.char_id,
+    l.char_name,
+    l.slug_name::VARCHAR     AS slug_name,
+    l.faction_type::VARCHAR  AS faction_type,
+    l.bracket_id::VARCHAR    AS bracket_id,
+    l.ranking,
+    l.rating,
+    l.games_played,
+    l.games_won,
+    l.games_lost,
+    l.season_id,
+    c.class_name::VARCHAR    AS class_name,
+    c.current_spec::VARCHAR  AS current_spec,
+    l.fecha_proceso
+FROM cur_pvp_leaderboard l
+LEFT JOIN cur_chinfo c
+    ON  c.char_id = l.char_id
+    AND c.fecha_proceso = l.fecha_proceso
+"""
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+
+@dataclass
+class CharacterIndex:
+    """
+    Índice en memoria sobre el último CUR (leaderboard + chinfo).
+
+    - Los datos se guardan por columna (arrays de numpy).
+    - Hash lookups: char_id -> filas, (realm_slug, nombre) -> filas.
+    - Por bracket: filas ordenadas por ranking y por rating, para consultas
+      de rango con búsqueda binaria (np.searchsorted).
+    """
+
+    columns: Dict[str, np.ndarray]
+    _by_char_id: Dict[int, List[int]] = field(default_factory=dict, init=False, repr=False)
+    _by_name: Dict[Tuple[str, str], List[int]] = field(default_factory=dict, init=False, repr=False)
+    _by_rank: Dict[str, Tuple[np.ndarray, np.ndarray]] = field(default_factory=dict, init=False, repr=False)
+    _by_rating: Dict[str, Tuple[np.ndarray, np.ndarray]] = field(default_factory=dict, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        char_ids = self.columns["char_id"]
+        realms = self.columns["slug_name"]
+        names = self.columns["char_name"]
+        brackets = self.columns["bracket_id"]
+
+        for i in range(len(char_ids)):
+            self._by_char_id.setdefault(int(char_ids[i]), []).append(i)
+            key = (str(realms[i]), str(names[i]).lower())
+            self._by_name.setdefault(key, []).append(i)
+
+        for bracket in np.unique(brackets.astype(str)):
+            rows = np.flatnonzero(brackets == bracket)
+            for values_col, target in (("ranking", self._by_rank), ("rating", self._by_rating)):
+                values = self.columns[values_col][rows].astype(np.int64)
+                order = np.argsort(values, kind="stable")
+                target[bracket] = (values[order], rows[order])
+
+    def __len__(self) -> int:
+        return len(self.columns["char_id"])
+
+    # ===== Construcción =====
+
+    @classmethod
+    def from_duckdb(cls, conn=None) -> "CharacterIndex":
+        """
+        Carga el CUR actual. Por defecto abre la base local en modo lectura,
+        sin bloquear al pipeline.
+        """
+        own_conn = conn is None
+        conn = conn or get_connection(read_only=True)
+        try:
+            table = conn.execute(LOOKUP_QUERY).arrow()
+            # DuckDB >= 1.4 devuelve un RecordBatchReader en lugar de una Table
+            if hasattr(table, "read_all"):
+                table = table.read_all()
+        finally:
+            if own_conn:
+                conn.close()
+
+        columns = {}
+        for name in table.column_names:
+            col = table.column(name)
+            if name in ("ranking", "rating", "games_played", "games_won", "games_lost"):
+                col = col.fill_null(-1)
+            columns[name] = col.to_numpy(zero_copy_only=False)
+        return cls(columns)
+
+    # ===== Lookups =====
+
+    def _rows(self, idx, bracket: Optional[str] = None) -> List[Dict[str, Any]]:
+        out = []
+        for i in idx:
+            if bracket is not None and self.columns["bracket_id"][i] != bracket:
+                continue
+            row = {}
+            for name, col in self.columns.items():
+                value = col[i]
+                row[name] = value.item() if isinstance(value, np.generic) else value
+            out.append(row)
+        return out
+
+    def get(self, char_id: int, bracket: Optional[str] = None) -> List[Dict[str, Any]]:
+        return self._rows(self._by_char_id.get(int(char_id), ()), bracket)
+
+    def find(self, realm_slug: str, name: str, bracket: Optional[str] = None) -> List[Dict[str, Any]]:
+        return self._rows(self._by_name.get((realm_slug, name.lower()), ()), bracket)
+
+    def _range(self, index, bracket: str, lo: int, hi: int) -> List[Dict[str, Any]]:
+        if bracket not in index:
+            return []
+        values, rows = index[bracket]
+        start = np.searchsorted(values, lo, side="left")
+        end = np.searchsorted(values, hi, side="right")
+        return self._rows(rows[start:end])
+
+    def by_rank_range(self, bracket: str, rank_from: int, rank_to: int) -> List[Dict[str, Any]]:
+        """
+        Personajes con ranking en [rank_from, rank_to], ordenados por ranking.
+        """
+        return self._range(self._by_rank, bracket, rank_from, rank_to)
+
+    def by_rating_range(self, bracket: str, min_rating: int, max_rating: int) -> List[Dict[str, Any]]:
+        """
+        Personajes con rating en [min_rating, max_rating], de mayor a menor rating.
+        """
+        return self._range(self._by_rating, bracket, min_rating, max_rating)[::-1]
+
+
+# ===== HTTP opcional =====
+
+def _make_handler(index: CharacterIndex):
+    class LookupHandler(BaseHTTPRequestHandler):
+        """
+        GET /character/{char_id}[?bracket=3v3]
+        GET /character/{realm_slug}/{name}[?bracket=3v3]
+        GET /rank?bracket=3v3&from=1&to=100
+        GET /rating?bracket=3v3&min=2400&max=3000
+        """
+
+        def do_GET(self) -> None:  # noqa: N802 (API de http.server)
+            url = urlparse(self.path)
+            params = {k: v[0] for k, v in parse_qs(url.query).items()}
+            parts = [unquote(p) for p in url.path.strip("/").split("/") if p]
+            bracket = params.get("bracket")
+
+            try:
+                if len(parts) == 2 and parts[0] == "character":
+                    body = index.get(int(parts[1]), bracket)
+                elif len(parts) == 3 and parts[0] == "character":
+                    body = index.find(parts[1], parts[2], bracket)
+                elif parts == ["rank"]:
+                    body = index.by_rank_range(params["bracket"], int(params["from"]), int(params["to"]))
+                elif parts == ["rating"]:
+                    body = index.by_rating_range(params["bracket"], int(params["min"]), int(params["max"]))
+                else:
+                    self._send(404, {"error": "ruta desconocida"})
+                    return
+            except (KeyError, ValueError) as exc:
+                self._send(400, {"error": f"parámetros inválidos: {exc}"})
+                return
+
+            self._send(200, body)
+
+        def _send(self, status: int, body: Any) -> None:
+            data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format: str, *args: Any) -> None:
+            return
+
+    return LookupHandler
+
+
+def make_server(index: CharacterIndex, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> ThreadingHTTPServer:
+    """
+    Servidor HTTP local (sólo lectura) sobre el índice. port=0 elige uno libre.
+    """
+    return ThreadingHTTPServer((host, port), _make_handler(index))
+
+
+if __name__ == "__main__":
+    idx = CharacterIndex.from_duckdb()
+    server = make_server(idx)
+    print(f"[character_lookup] {len(idx)} filas indexadas, escuchando en http://{DEFAULT_HOST}:{server.server_port}")
+    server.serve_forever()
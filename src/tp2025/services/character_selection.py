@@ -1,31 +1,12 @@
 from __future__ import annotations
 
-from pathlib import Path
-import sys
 import pandas as pd
 
-THIS_FILE = Path(__file__).resolve()
-PROJECT_ROOT = THIS_FILE.parents[3]
-SRC_DIR = PROJECT_ROOT / "src"
-
-if str(SRC_DIR) not in sys.path:
-    sys.path.insert(0, str(SRC_DIR))
-
+from tp2025.io.duckdb_resources import track_spill
 from tp2025.io.load_localdb import get_connection
 
 
-def get_top_pvp_characters(processing_date: str, limit_total: int = 500) -> pd.DataFrame:
-    """
-    Devuelve hasta N personajes únicos (por char_id) desde cur_pvp_leaderboard
-    para la fecha_proceso indicada.
-
-    Lógica:
-    - Calcula ranking por bracket (ROW_NUMBER particionado por bracket_id).
-    - Para cada char_id, se queda con la mejor fila (menor ranking).
-    - De esos personajes únicos, trae hasta limit_total, ordenados por ranking.
-    """
-
-    query = """
+TOP_PVP_CHARACTERS_QUERY = """
     WITH ranked AS (
         SELECT
             char_id,
@@ -38,7 +19,7 @@ def get_top_pvp_characters(processing_date: str, limit_total: int = 500) -> pd.D
             games_won,
             games_lost
         FROM wow_data.main.cur_pvp_leaderboard
-        WHERE fecha_proceso = ?
+        WHERE fecha_proceso = $1
           AND bracket_id IN ('2v2', '3v3')
     ),
     per_bracket AS (
@@ -87,11 +68,22 @@ def get_top_pvp_characters(processing_date: str, limit_total: int = 500) -> pd.D
         ranking
     FROM best_per_char
     ORDER BY ranking, bracket_id
-    LIMIT ?;
+    LIMIT $2
+    """
+
+def get_top_pvp_characters(processing_date: str, limit_total: int = 500) -> pd.DataFrame:
     """
+    Devuelve hasta N personajes únicos (por char_id) desde cur_pvp_leaderboard
+    para la fecha_proceso indicada.
 
+    Lógica:
+    - Calcula ranking por bracket (ROW_NUMBER particionado por bracket_id).
+    - Para cada char_id, se queda con la mejor fila (menor ranking).
+    - De esos personajes únicos, trae hasta limit_total, ordenados por ranking.
+    """
     conn = get_connection()
-    df = conn.execute(query, [processing_date, limit_total]).df()
+    with track_spill(conn, "top_pvp_characters"):
+        df = conn.execute(TOP_PVP_CHARACTERS_QUERY, [processing_date, int(limit_total)]).df()
 
     if df.empty:
         raise RuntimeError(
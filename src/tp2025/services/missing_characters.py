@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Tuple
+
+import pandas as pd
+
+from tp2025.blizzard_api.endpoints import DEFAULT_REGION
+
+THIS_FILE = Path(__file__).resolve()
+PROJECT_ROOT = THIS_FILE.parents[3]
+DB_PATH = PROJECT_ROOT / "data" / "localdb" / "missing_characters.sqlite"
+
+# Cuánto se recuerda un 404 antes de volver a intentar el perfil
+TTL_DAYS = float(os.getenv("CHINFO_MISSING_TTL_DAYS", "7"))
+
+MissingKey = Tuple[str, str]
+
+
+def make_missing_key(realm_slug: str, char_name: str) -> MissingKey:
+    return str(realm_slug), str(char_name).lower()
+
+
+class MissingCharacterCache:
+    """
+    Cache negativo persistente de perfiles que dieron 404 (personaje renombrado,
+    transferido o borrado), por (región, realm, nombre) y con TTL.
+
+    Se guarda el char_id del 404: si al día siguiente el leaderboard trae ese
+    mismo char_id con otro realm / nombre, el personaje se "movió" y se vuelve a
+    pedir con los datos nuevos; si trae el mismo realm / nombre con otro char_id,
+    es otro personaje y tampoco se saltea.
+
+    SQLite: lo comparten los shards de extracción de perfiles.
+    """
+
+    def __init__(
+        self,
+        path: Path = DB_PATH,
+        ttl_seconds: float = TTL_DAYS * 86400,
+        region: str = DEFAULT_REGION,
+    ) -> None:
+        self.path = Path(path)
+        self.ttl_seconds = ttl_seconds
+        self.region = region
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS missing_characters ("
+                " region TEXT NOT NULL, realm_slug TEXT NOT NULL, name TEXT NOT NULL,"
+                " char_id TEXT, missed_at REAL NOT NULL,"
+                " PRIMARY KEY (region, realm_slug, name))"
+            )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def known_missing(self, now: float | None = None) -> Dict[MissingKey, str]:
+        """
+        (realm, nombre) -> char_id de los 404 vigentes. Borra los vencidos.
+        """
+        cutoff = (now or time.time()) - self.ttl_seconds
+        with self._connect() as conn:
+            conn.execute(
+                "DELETE FROM missing_characters WHERE region = ? AND missed_at < ?",
+                (self.region, cutoff),
+            )
+            rows = conn.execute(
+                "SELECT realm_slug, name, char_id FROM missing_characters WHERE region = ?",
+                (self.region,),
+            ).fetchall()
+        return {(realm, name): char_id for realm, name, char_id in rows}
+
+    def add_many(self, entries: Iterable[Tuple[str, str, object]], now: float | None = None) -> int:
+        """
+        Registra 404s: (realm, nombre, char_id).
+        """
+        now = now or time.time()
+        rows = [
+            (self.region, *make_missing_key(realm, name), str(char_id), now)
+            for realm, name, char_id in entries
+        ]
+        if rows:
+            with self._connect() as conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO missing_characters "
+                    "(region, realm_slug, name, char_id, missed_at) VALUES (?, ?, ?, ?, ?)",
+                    rows,
+                )
+        return len(rows)
+
+    def remove(self, keys: Iterable[MissingKey]) -> None:
+        rows = [(self.region, realm, name) for realm, name in keys]
+        if rows:
+            with self._connect() as conn:
+                conn.executemany(
+                    "DELETE FROM missing_characters WHERE region = ? AND realm_slug = ? AND name = ?",
+                    rows,
+                )
+
+    def filter_selection(self, chars_df: pd.DataFrame, now: float | None = None) -> pd.DataFrame:
+        """
+        Saca de la selección (columnas slug_name / char_name / char_id) los
+        personajes con un 404 vigente, y olvida los 404 de char_ids que el
+        leaderboard ya muestra con otro realm / nombre.
+        """
+        missing = self.known_missing(now)
+        if not missing or chars_df.empty:
+            return chars_df
+
+        keys = [make_missing_key(s, n) for s, n in zip(chars_df["slug_name"], chars_df["char_name"])]
+        char_ids = chars_df["char_id"].astype(str).tolist()
+
+        skip = [missing.get(key) == char_id for key, char_id in zip(keys, char_ids)]
+
+        # char_id con 404 en una clave vieja que hoy aparece con otra clave: se movió
+        current_key_by_id = dict(zip(char_ids, keys))
+        moved = [
+            key for key, char_id in missing.items()
+            if char_id in current_key_by_id and current_key_by_id[char_id] != key
+        ]
+        self.remove(moved)
+
+        print(
+            f"[missing_characters] {sum(skip)} personajes salteados por 404 reciente, "
+            f"{len(moved)} re-resueltos por char_id"
+        )
+        return chars_df.loc[[not s for s in skip]].reset_index(drop=True)
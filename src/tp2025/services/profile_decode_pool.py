@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+import multiprocessing
+import os
+import sys
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+from tp2025.blizzard_api.decoding import ProfilePayload, decode
+from tp2025.services.ch_profile_client import (
+    MAX_WORKERS,
+    _fetch_profile_response,
+    normalize_profile_row,
+    run_profile_fetches,
+)
+from tp2025.services.missing_characters import MissingCharacterCache
+
+# Procesos que decodifican y normalizan los perfiles (0 = en los threads de fetch, sin pool)
+DECODE_PROCESSES = int(os.getenv("CHINFO_DECODE_PROCESSES", "0"))
+# Bodies por batch que se manda a un proceso
+DECODE_BATCH_SIZE = int(os.getenv("CHINFO_DECODE_BATCH_SIZE", "25"))
+# Batches en vuelo (enviados y sin decodificar) antes de frenar a los threads de fetch
+DECODE_MAX_PENDING = int(os.getenv("CHINFO_DECODE_MAX_PENDING", "0")) or 2 * max(DECODE_PROCESSES, 1)
+
+# Campos del payload que se conservan para planificar los sub-recursos
+# (mismos nombres que profile_resources.PROFILE_RESOURCES)
+LINK_FIELDS = ("equipment", "pvp_summary", "specializations")
+
+
+@dataclass
+class DecodedBatch:
+    """
+    Perfiles decodificados en columnas (una lista por columna del RAW), la
+    meta de cada fila, un payload reducido (id + hrefs de sub-recursos) para
+    profile_resources y la meta de los bodies que no se pudieron decodificar.
+    """
+
+    columns: Dict[str, List[Any]] = field(default_factory=dict)
+    metas: List[Dict[str, Any]] = field(default_factory=list)
+    links: List[Dict[str, Any]] = field(default_factory=list)
+    failed: List[Dict[str, Any]] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.metas)
+
+    def extend(self, other: "DecodedBatch") -> None:
+        for name, values in other.columns.items():
+            self.columns.setdefault(name, []).extend(values)
+        self.metas.extend(other.metas)
+        self.links.extend(other.links)
+        self.failed.extend(other.failed)
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame(self.columns)
+
+    def meta_and_payloads(self) -> List[Tuple[Dict[str, Any], Dict[str, Any]]]:
+        return list(zip(self.metas, self.links))
+
+
+def decode_profile_batch(metas: List[Dict[str, Any]], bodies: List[bytes]) -> DecodedBatch:
+    """
+    Corre en un proceso del pool: bytes -> payload -> fila normalizada, en columnas.
+    """
+    batch = DecodedBatch()
+    for meta, body in zip(metas, bodies):
+        try:
+            payload = decode(body, ProfilePayload)
+        except ValueError:
+            batch.failed.append(meta)
+            continue
+        for name, value in normalize_profile_row(meta, payload).items():
+            batch.columns.setdefault(name, []).append(value)
+        batch.metas.append(meta)
+        batch.links.append(
+            {"id": payload.get("id"), **{f: payload[f] for f in LINK_FIELDS if payload.get(f)}}
+        )
+    return batch
+
+
+class ProfileDecodePool:
+    """
+    Etapa de decodificación en procesos: los threads de fetch sólo hacen I/O y
+    entregan los bytes crudos; N procesos decodifican y normalizan en batches
+    (fuera del GIL de los threads) y devuelven columnas compactas.
+
+    Back-pressure: con `max_pending` batches en vuelo, submit() bloquea al
+    thread de fetch hasta que un proceso termine uno.
+    """
+
+    def __init__(
+        self,
+        processes: int = DECODE_PROCESSES,
+        batch_size: int = DECODE_BATCH_SIZE,
+        max_pending: int = DECODE_MAX_PENDING,
+        executor: Optional[Executor] = None,
+    ) -> None:
+        self.processes = max(1, processes)
+        self.batch_size = max(1, batch_size)
+        self._executor = executor
+        self._owns_executor = executor is None
+        self._slots = threading.BoundedSemaphore(max(1, max_pending))
+        self._lock = threading.Lock()
+        self._metas: List[Dict[str, Any]] = []
+        self._bodies: List[bytes] = []
+        self._futures: List[Future] = []
+
+    def __enter__(self) -> "ProfileDecodePool":
+        if self._executor is None:
+            # spawn: el proceso que llena el pool ya tiene threads (fork no es seguro)
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.processes, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        if self._owns_executor and self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    def submit(self, meta: Dict[str, Any], body: bytes) -> None:
+        """
+        Encola un body; cada batch_size bodies se manda un batch a un proceso.
+        """
+        with self._lock:
+            self._metas.append(meta)
+            self._bodies.append(body)
+            if len(self._bodies) < self.batch_size:
+                return
+            metas, bodies = self._take()
+        self._dispatch(metas, bodies)
+
+    def _take(self) -> Tuple[List[Dict[str, Any]], List[bytes]]:
+        metas, bodies = self._metas, self._bodies
+        self._metas, self._bodies = [], []
+        return metas, bodies
+
+    def _dispatch(self, metas: List[Dict[str, Any]], bodies: List[bytes]) -> None:
+        if self._executor is None:
+            raise RuntimeError("ProfileDecodePool se usa dentro de un with")
+        self._slots.acquire()
+        try:
+            fut = self._executor.submit(decode_profile_batch, metas, bodies)
+        except BaseException:
+            self._slots.release()
+            raise
+        fut.add_done_callback(lambda _: self._slots.release())
+        with self._lock:
+            self._futures.append(fut)
+
+    def collect(self) -> DecodedBatch:
+        """
+        Manda lo que quedó en el buffer y espera todos los batches en vuelo.
+        """
+        with self._lock:
+            metas, bodies = self._take()
+        if bodies:
+            self._dispatch(metas, bodies)
+        with self._lock:
+            futures, self._futures = self._futures, []
+
+        merged = DecodedBatch()
+        for fut in futures:
+            merged.extend(fut.result())
+        for meta in merged.failed:
+            print(
+                f"[profile_decode_pool] Payload inválido para {meta['slug_name']}/{meta['char_name']}",
+                file=sys.stderr,
+            )
+        return merged
+
+
+@contextmanager
+def open_decode_pool(processes: int = DECODE_PROCESSES) -> Iterator[Optional[ProfileDecodePool]]:
+    """
+    Pool de decodificación configurado por entorno, o None si está apagado
+    (CHINFO_DECODE_PROCESSES=0).
+    """
+    if processes <= 0:
+        yield None
+        return
+    with ProfileDecodePool(processes) as pool:
+        yield pool
+
+
+def fetch_and_decode_profiles(
+    chars_df: pd.DataFrame,
+    token: str,
+    decode_pool: ProfileDecodePool,
+    max_workers: int = MAX_WORKERS,
+    missing_cache: MissingCharacterCache | None = None,
+) -> DecodedBatch:
+    """
+    Como fetch_profiles_concurrently, pero los threads pasan los bytes crudos
+    al pool de decodificación y el resultado vuelve en columnas.
+    """
+
+    def fetch(session: Any, meta: Dict[str, Any]) -> Tuple[int | None, None]:
+        status, body = _fetch_profile_response(
+            session, token, meta["slug_name"], meta["char_name"].lower(),
+            raw=True, processing_date=meta["fecha_proceso"],
+        )
+        if body is not None:
+            decode_pool.submit(meta, body)
+        return status, None
+
+    run_profile_fetches(chars_df, fetch, max_workers=max_workers, missing_cache=missing_cache)
+    return decode_pool.collect()
@@ -0,0 +1,267 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+import requests
+
+from tp2025.blizzard_api.endpoints import (
+    get_character_equipment_url,
+    get_character_pvp_summary_url,
+    get_character_specializations_url,
+    get_item_media_url,
+    get_playable_specialization_media_url,
+    with_locale,
+)
+from tp2025.services.ch_profile_client import MAX_WORKERS, fetch_json_url
+
+# Sub-recursos del perfil: campo con el href en el payload raíz -> builder de fallback
+PROFILE_RESOURCES: Dict[str, Callable[..., str]] = {
+    "equipment": get_character_equipment_url,
+    "pvp_summary": get_character_pvp_summary_url,
+    "specializations": get_character_specializations_url,
+}
+
+# Recursos estáticos compartidos entre personajes
+ITEM_MEDIA = "item_media"
+SPEC_MEDIA = "spec_media"
+
+
+@dataclass(frozen=True)
+class ResourceRequest:
+    """
+    Un pedido planificado: tipo de recurso, URL y la meta del personaje
+    (None para recursos compartidos como media de items / specs).
+    """
+
+    resource: str
+    url: str
+    meta: Optional[Tuple[Tuple[str, Any], ...]] = None
+
+    @property
+    def meta_dict(self) -> Dict[str, Any]:
+        return dict(self.meta or ())
+
+
+def _freeze_meta(meta: Dict[str, Any]) -> Tuple[Tuple[str, Any], ...]:
+    return tuple(sorted(meta.items()))
+
+
+def _href(payload: Dict[str, Any], field: str) -> str | None:
+    return ((payload.get(field) or {}) if isinstance(payload, dict) else {}).get("href")
+
+
+# ===== Planificación =====
+
+def plan_profile_resources(
+    meta_and_payloads: List[Tuple[Dict[str, Any], Dict[str, Any] | None]],
+    resources: Iterable[str] = tuple(PROFILE_RESOURCES),
+) -> List[ResourceRequest]:
+    """
+    Arma la lista de pedidos de sub-recursos siguiendo los href del payload raíz.
+    Si el href no está, se construye la URL con el builder de endpoints.py.
+    """
+    planned: List[ResourceRequest] = []
+
+    for meta, payload in meta_and_payloads:
+        if not payload:
+            continue
+        for resource in resources:
+            href = _href(payload, resource)
+            if href:
+                url = with_locale(href)
+            else:
+                url = PROFILE_RESOURCES[resource](
+                    realm_slug=meta["slug_name"],
+                    character_name=meta["char_name"],
+                )
+            planned.append(ResourceRequest(resource, url, _freeze_meta(meta)))
+
+    return planned
+
+
+def plan_shared_media(
+    results: List[Tuple[ResourceRequest, Dict[str, Any] | None]],
+    already_fetched: Iterable[str] = (),
+) -> List[ResourceRequest]:
+    """
+    Extrae los recursos estáticos compartidos (media de items y de specs)
+    de los sub-recursos ya descargados, deduplicados por URL.
+    """
+    seen = set(already_fetched)
+    planned: List[ResourceRequest] = []
+
+    def add(resource: str, url: str) -> None:
+        if url not in seen:
+            seen.add(url)
+            planned.append(ResourceRequest(resource, url))
+
+    for req, payload in results:
+        if not payload:
+            continue
+        if req.resource == "equipment":
+            for item in payload.get("equipped_items") or []:
+                item_id = (item.get("item") or {}).get("id")
+                if item_id is not None:
+                    add(ITEM_MEDIA, get_item_media_url(item_id=item_id))
+        elif req.resource == "specializations":
+            for spec in payload.get("specializations") or []:
+                spec_id = (spec.get("specialization") or {}).get("id")
+                if spec_id is not None:
+                    add(SPEC_MEDIA, get_playable_specialization_media_url(spec_id=spec_id))
+
+    return planned
+
+
+# ===== Requests =====
+
+def fetch_resources_concurrently(
+    planned: List[ResourceRequest],
+    token: str,
+    max_workers: int = MAX_WORKERS,
+    session: requests.Session | None = None,
+) -> List[Tuple[ResourceRequest, Dict[str, Any] | None]]:
+    """
+    Descarga los pedidos planificados con el mismo pool de threads y Session
+    que los perfiles. Cada URL se pide una sola vez aunque varios pedidos la compartan.
+    """
+    by_url: Dict[str, List[ResourceRequest]] = {}
+    for req in planned:
+        by_url.setdefault(req.url, []).append(req)
+
+    own_session = session is None
+    session = session or requests.Session()
+    results: List[Tuple[ResourceRequest, Dict[str, Any] | None]] = []
+
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            future_to_url = {
+                executor.submit(fetch_json_url, session, token, url, reqs[0].resource): url
+                for url, reqs in by_url.items()
+            }
+            for fut in as_completed(future_to_url):
+                url = future_to_url[fut]
+                payload = fut.result()
+                for req in by_url[url]:
+                    results.append((req, payload))
+    finally:
+        if own_session:
+            session.close()
+
+    return results
+
+
+# ===== Normalización =====
+
+def normalize_equipment_rows(meta: Dict[str, Any], payload: Dict[str, Any]) -> List[Dict[str, Any]]:
+    rows: List[Dict[str, Any]] = []
+    for item in payload.get("equipped_items") or []:
+        rows.append(
+            {
+                "char_id": meta["char_id"],
+                "realm_slug": meta["slug_name"],
+                "slot": (item.get("slot") or {}).get("type"),
+                "item_id": (item.get("item") or {}).get("id"),
+                "item_name": item.get("name"),
+                "quality": (item.get("quality") or {}).get("type"),
+                "item_level": (item.get("level") or {}).get("value"),
+                "fecha_proceso": meta["fecha_proceso"],
+            }
+        )
+    return rows
+
+
+def normalize_pvp_summary_rows(meta: Dict[str, Any], payload: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [
+        {
+            "char_id": meta["char_id"],
+            "realm_slug": meta["slug_name"],
+            "honor_level": payload.get("honor_level"),
+            "honorable_kills": payload.get("honorable_kills"),
+            "fecha_proceso": meta["fecha_proceso"],
+        }
+    ]
+
+
+def normalize_specializations_rows(meta: Dict[str, Any], payload: Dict[str, Any]) -> List[Dict[str, Any]]:
+    active_id = (payload.get("active_specialization") or {}).get("id")
+    rows: List[Dict[str, Any]] = []
+    for spec in payload.get("specializations") or []:
+        spec_ref = spec.get("specialization") or {}
+        rows.append(
+            {
+                "char_id": meta["char_id"],
+                "realm_slug": meta["slug_name"],
+                "spec_id": spec_ref.get("id"),
+                "spec_name": spec_ref.get("name"),
+                "is_active": spec_ref.get("id") == active_id,
+                "fecha_proceso": meta["fecha_proceso"],
+            }
+        )
+    return rows
+
+
+def normalize_media_rows(req: ResourceRequest, payload: Dict[str, Any]) -> List[Dict[str, Any]]:
+    icon = next(
+        (a.get("value") for a in payload.get("assets") or [] if a.get("key") == "icon"),
+        None,
+    )
+    return [{"media_type": req.resource, "id": payload.get("id"), "icon_url": icon}]
+
+
+NORMALIZERS: Dict[str, Callable[[Dict[str, Any], Dict[str, Any]], List[Dict[str, Any]]]] = {
+    "equipment": normalize_equipment_rows,
+    "pvp_summary": normalize_pvp_summary_rows,
+    "specializations": normalize_specializations_rows,
+}
+
+
+def build_resource_dataframes(
+    results: List[Tuple[ResourceRequest, Dict[str, Any] | None]],
+) -> Dict[str, pd.DataFrame]:
+    """
+    Agrupa los resultados por tipo de recurso: un DataFrame por dataset.
+    La media de items y specs se unifica en un único dataset "media".
+    """
+    rows_by_dataset: Dict[str, List[Dict[str, Any]]] = {}
+
+    for req, payload in results:
+        if not payload:
+            continue
+        if req.resource in (ITEM_MEDIA, SPEC_MEDIA):
+            rows_by_dataset.setdefault("media", []).extend(normalize_media_rows(req, payload))
+        else:
+            rows_by_dataset.setdefault(req.resource, []).extend(
+                NORMALIZERS[req.resource](req.meta_dict, payload)
+            )
+
+    return {name: pd.DataFrame(rows) for name, rows in rows_by_dataset.items() if rows}
+
+
+def fetch_profile_resources(
+    meta_and_payloads: List[Tuple[Dict[str, Any], Dict[str, Any] | None]],
+    token: str,
+    max_workers: int = MAX_WORKERS,
+    media_seen: set | None = None,
+) -> Dict[str, pd.DataFrame]:
+    """
+    Fan-out completo a partir de los perfiles raíz:
+    1) sub-recursos por personaje (siguiendo los href),
+    2) media compartida (items / specs) deduplicada por URL.
+
+    media_seen: set de URLs de media ya descargadas, para no repetirlas
+    entre chunks de una misma corrida (se actualiza in-place).
+    """
+    media_seen = media_seen if media_seen is not None else set()
+
+    with requests.Session() as session:
+        planned = plan_profile_resources(meta_and_payloads)
+        results = fetch_resources_concurrently(planned, token, max_workers, session)
+
+        media_planned = plan_shared_media(results, already_fetched=media_seen)
+        media_seen.update(req.url for req in media_planned)
+        results += fetch_resources_concurrently(media_planned, token, max_workers, session)
+
+    return build_resource_dataframes(results)
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+from typing import Dict
+
+from tp2025.io.load_localdb import run_sql
+
+# dimensión -> (tabla de lookup, tipo ENUM de DuckDB)
+DIMENSIONS: Dict[str, tuple[str, str]] = {
+    "realm": ("enc_realm", "realm_enum"),
+    "faction": ("enc_faction", "faction_enum"),
+    "class": ("enc_class", "class_enum"),
+    "spec": ("enc_spec", "spec_enum"),
+    "bracket": ("enc_bracket", "bracket_enum"),
+}
+
+# Normalización del valor antes de codificarlo. La facción llega como
+# "HORDE" (type, leaderboard) o "Horde" (name, perfil): se guarda en mayúsculas.
+NORMALIZERS: Dict[str, str] = {
+    "faction": "UPPER({})",
+}
+
+
+def normalized(dimension: str, column: str) -> str:
+    """
+    Expresión SQL con el valor de column tal como se guarda en la dimensión.
+    """
+    return NORMALIZERS.get(dimension, "{}").format(column)
+
+
+def encoded(dimension: str, column: str) -> str:
+    """
+    Expresión SQL que codifica column con el ENUM de la dimensión (para los CUR).
+    """
+    return f"CAST({normalized(dimension, column)} AS {enum_type(dimension)})"
+
+
+def enum_type(dimension: str) -> str:
+    """
+    Nombre del tipo ENUM de DuckDB asociado a la dimensión.
+    """
+    return DIMENSIONS[dimension][1]
+
+
+def ensure_lookup_tables(conn) -> None:
+    """
+    Crea las tablas de lookup (dim_key, value) si no existen.
+    Son append-only: una vez asignada, la clave de un valor no cambia.
+    """
+    for table, _ in DIMENSIONS.values():
+        run_sql(
+            conn,
+            f"""
+            CREATE TABLE IF NOT EXISTS {table} (
+                dim_key INTEGER PRIMARY KEY,
+                value   VARCHAR UNIQUE NOT NULL
+            );
+            """,
+        )
+
+
+def _enum_definition(conn, enum_name: str) -> str | None:
+    """
+    Definición actual del ENUM (ej. "ENUM('a', 'b')"), o None si no existe.
+    """
+    row = conn.execute(
+        "SELECT 1 FROM duckdb_types() WHERE type_name = ? AND database_name = current_database()",
+        [enum_name],
+    ).fetchone()
+    if row is None:
+        return None
+    return conn.execute(f"SELECT typeof(CAST(NULL AS {enum_name}));").fetchone()[0]
+
+
+def _retype_columns(conn, old_definition: str, enum_name: str) -> None:
+    """
+    Pasa al ENUM nuevo las columnas que todavía tienen la definición anterior
+    (los valores nuevos van al final, así que los códigos no cambian).
+    """
+    columns = conn.execute(
+        """
+        SELECT c.schema_name, c.table_name, c.column_name
+        FROM duckdb_columns() c
+        JOIN duckdb_tables() t USING (database_name, schema_name, table_name)
+        WHERE c.database_name = current_database() AND c.data_type = ?
+        """,
+        [old_definition],
+    ).fetchall()
+    for schema, table, column in columns:
+        conn.execute(f'ALTER TABLE "{schema}"."{table}" ALTER COLUMN "{column}" TYPE {enum_name};')
+
+
+def sync_dimension(conn, dimension: str, source_table: str, source_column: str, processing_date: str) -> None:
+    """
+    Agrega a la lookup los valores nuevos de source_column para la fecha de proceso
+    (claves max+1, max+2, ...) y, sólo si hubo valores nuevos, extiende el ENUM.
+
+    Como la lookup es append-only y el ENUM se arma ordenado por dim_key,
+    el código interno del ENUM (enum_code) es siempre dim_key - 1:
+    estable entre corridas.
+
+    DuckDB no permite agregar valores a un ENUM: se recrea el tipo y las
+    columnas que usaban la versión anterior (cur_*, historia, agregados) se
+    pasan al tipo nuevo. Así todas las tablas comparten un único tipo por
+    dimensión y los joins / filtros entre ellas comparan códigos enteros
+    (con tipos distintos DuckDB compara como VARCHAR).
+    """
+    table, enum_name = DIMENSIONS[dimension]
+
+    (added,) = conn.execute(
+        f"""
+        INSERT INTO {table}
+        SELECT
+            (SELECT COALESCE(MAX(dim_key), 0) FROM {table}) + ROW_NUMBER() OVER (ORDER BY v) AS dim_key,
+            v AS value
+        FROM (
+            SELECT DISTINCT {normalized(dimension, source_column)} AS v
+            FROM {source_table}
+            WHERE fecha_proceso = ?
+              AND {source_column} IS NOT NULL
+        ) s
+        WHERE v NOT IN (SELECT value FROM {table});
+        """,
+        [processing_date],
+    ).fetchone()
+
+    old_definition = _enum_definition(conn, enum_name)
+    if old_definition is not None and not added:
+        return
+    run_sql(
+        conn,
+        f"CREATE OR REPLACE TYPE {enum_name} AS ENUM (SELECT value FROM {table} ORDER BY dim_key);",
+    )
+    if old_definition is not None:
+        _retype_columns(conn, old_definition, enum_name)
+
+
+def sync_dimensions(conn, source_table: str, columns: Dict[str, str], processing_date: str) -> None:
+    """
+    columns: dimensión -> columna de source_table con sus valores.
+    """
+    ensure_lookup_tables(conn)
+    for dimension, source_column in columns.items():
+        sync_dimension(conn, dimension, source_table, source_column, processing_date)
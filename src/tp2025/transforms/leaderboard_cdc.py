@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+from typing import Sequence
+
+import numpy as np
+import pandas as pd
+
+# Un personaje en un bracket es una fila del leaderboard
+KEY_COLS = ("id", "bracket")
+VALUE_COLS = ("name", "slug", "faction", "rank", "rating", "played", "won", "lost")
+
+OP_COL = "op"
+OP_INSERT = "I"
+OP_UPDATE = "U"
+OP_DELETE = "D"
+
+_HASH_COL = "_row_hash"
+
+
+def row_hashes(df: pd.DataFrame, value_cols: Sequence[str] = VALUE_COLS) -> pd.Series:
+    """
+    Hash de 64 bits por fila sobre las columnas de valor (vectorizado).
+    """
+    return pd.util.hash_pandas_object(df[list(value_cols)], index=False)
+
+
+def diff_snapshots(
+    previous: pd.DataFrame,
+    current: pd.DataFrame,
+    key_cols: Sequence[str] = KEY_COLS,
+    value_cols: Sequence[str] = VALUE_COLS,
+) -> pd.DataFrame:
+    """
+    Cambios de previous -> current, con la columna op:
+
+    - I: la clave sólo está en current.
+    - U: la clave está en ambos y cambió alguna columna de valor.
+    - D: la clave sólo está en previous (se deja sólo la clave, el resto nulo).
+
+    Join por hash: se compara un hash por fila en lugar de columna a columna.
+    Ambos DataFrames tienen que venir con los mismos tipos (p.ej. RAW, todo texto).
+    """
+    key_cols = list(key_cols)
+    prev_keys = previous[key_cols].assign(**{_HASH_COL: row_hashes(previous, value_cols).values})
+    curr = current.assign(**{_HASH_COL: row_hashes(current, value_cols).values})
+
+    joined = curr.merge(prev_keys, on=key_cols, how="outer", suffixes=("", "_prev"), indicator=True)
+
+    inserted = joined["_merge"] == "left_only"
+    updated = (joined["_merge"] == "both") & (joined[_HASH_COL] != joined[f"{_HASH_COL}_prev"])
+    deleted = joined["_merge"] == "right_only"
+
+    changed = inserted | updated | deleted
+    changes = joined[changed].copy()
+    changes[OP_COL] = np.select(
+        [inserted[changed], deleted[changed]], [OP_INSERT, OP_DELETE], OP_UPDATE
+    )
+
+    changes = changes.drop(columns=[_HASH_COL, f"{_HASH_COL}_prev", "_merge"])
+    return changes[list(current.columns) + [OP_COL]].reset_index(drop=True)
+
+
+def apply_changes(
+    base: pd.DataFrame,
+    changes: pd.DataFrame,
+    key_cols: Sequence[str] = KEY_COLS,
+) -> pd.DataFrame:
+    """
+    Aplica un set de cambios (salida de diff_snapshots) sobre un snapshot completo.
+    """
+    key_cols = list(key_cols)
+    if changes.empty:
+        return base.reset_index(drop=True)
+
+    changed_keys = pd.MultiIndex.from_frame(changes[key_cols])
+    keep = ~pd.MultiIndex.from_frame(base[key_cols]).isin(changed_keys)
+
+    upserts = changes[changes[OP_COL] != OP_DELETE].drop(columns=[OP_COL])
+    return pd.concat([base[keep], upserts[base.columns]], ignore_index=True)
@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+from datetime import date, datetime
+from typing import TYPE_CHECKING
+
+from tp2025.io.load_localdb import get_connection, run_sql
+
+if TYPE_CHECKING:  # pandas sólo para anotaciones: no se paga en el import
+    import pandas as pd
+
+RAW_TABLE = "raw_pvp_leaderboard"
+HIST_TABLE = "hist_pvp_leaderboard"
+HIST_INDEX = "idx_hist_pvp_leaderboard_char"
+
+
+def ensure_history_table(conn) -> None:
+    """
+    Crea la tabla de historia y su índice por (char_id, bracket_id) si no existen.
+    """
+    run_sql(
+        conn,
+        f"""
+        CREATE TABLE IF NOT EXISTS {HIST_TABLE} (
+            char_id        BIGINT NOT NULL,
+            bracket_id     VARCHAR NOT NULL,
+            snapshot_date  DATE NOT NULL,
+            season_id      INTEGER,
+            ranking        INTEGER,
+            rating         INTEGER,
+            games_played   INTEGER,
+            games_won      INTEGER,
+            games_lost     INTEGER,
+            rating_delta   INTEGER,
+            games_delta    INTEGER,
+            win_rate_7d    DOUBLE,
+            win_rate_30d   DOUBLE
+        );
+        """,
+    )
+    run_sql(conn, f"CREATE INDEX IF NOT EXISTS {HIST_INDEX} ON {HIST_TABLE} (char_id, bracket_id);")
+
+
+def update_history(processing_date: str, conn) -> int:
+    """
+    Agrega (o reemplaza) el slice de processing_date en la historia.
+
+    Sólo toca las filas del día: las columnas derivadas se calculan contra
+    snapshots previos ya guardados mediante ASOF JOIN.
+    - rating_delta / games_delta: contra el snapshot anterior del mismo
+      personaje, bracket y temporada.
+    - win_rate_7d / win_rate_30d: partidas ganadas / jugadas desde el último
+      snapshot de hace >= 7 / 30 días (NULL si todavía no hay historia suficiente).
+
+    Los días se deben procesar en orden: reprocesar un día viejo no recalcula
+    los derivados de los días posteriores (para eso, rebuild_history).
+    """
+    ensure_history_table(conn)
+    snapshot_date = datetime.strptime(processing_date, "%Y%m%d").date()
+
+    conn.execute(f"DELETE FROM {HIST_TABLE} WHERE snapshot_date = ?;", [snapshot_date])
+    conn.execute(
+        f"""
+        INSERT INTO {HIST_TABLE}
+        WITH today AS (
+            SELECT
+                TRY_CAST(id AS BIGINT)      AS char_id,
+                bracket                     AS bracket_id,
+                CAST(? AS DATE)             AS snapshot_date,
+                TRY_CAST(s_id AS INTEGER)   AS season_id,
+                TRY_CAST(rank AS INTEGER)   AS ranking,
+                TRY_CAST(rating AS INTEGER) AS rating,
+                TRY_CAST(played AS INTEGER) AS games_played,
+                TRY_CAST(won AS INTEGER)    AS games_won,
+                TRY_CAST(lost AS INTEGER)   AS games_lost
+            FROM {RAW_TABLE}
+            WHERE fecha_proceso = ?
+              AND TRY_CAST(id AS BIGINT) IS NOT NULL
+            QUALIFY ROW_NUMBER() OVER (PARTITION BY char_id, bracket_id ORDER BY ranking) = 1
+        )
+        SELECT
+            t.char_id,
+            t.bracket_id,
+            t.snapshot_date,
+            t.season_id,
+            t.ranking,
+            t.rating,
+            t.games_played,
+            t.games_won,
+            t.games_lost,
+            t.rating - p.rating                  AS rating_delta,
+            t.games_played - p.games_played      AS games_delta,
+            (t.games_won - w7.games_won)
+                / NULLIF(t.games_played - w7.games_played, 0)   AS win_rate_7d,
+            (t.games_won - w30.games_won)
+                / NULLIF(t.games_played - w30.games_played, 0)  AS win_rate_30d
+        FROM today t
+        ASOF LEFT JOIN {HIST_TABLE} p
+            ON  t.char_id = p.char_id
+            AND t.bracket_id = p.bracket_id
+            AND t.season_id = p.season_id
+            AND t.snapshot_date > p.snapshot_date
+        ASOF LEFT JOIN {HIST_TABLE} w7
+            ON  t.char_id = w7.char_id
+            AND t.bracket_id = w7.bracket_id
+            AND t.season_id = w7.season_id
+            AND (t.snapshot_date - INTERVAL 7 DAY) >= w7.snapshot_date
+        ASOF LEFT JOIN {HIST_TABLE} w30
+            ON  t.char_id = w30.char_id
+            AND t.bracket_id = w30.bracket_id
+            AND t.season_id = w30.season_id
+            AND (t.snapshot_date - INTERVAL 30 DAY) >= w30.snapshot_date;
+        """,
+        [snapshot_date, processing_date],
+    )
+    return conn.execute(
+        f"SELECT COUNT(*) FROM {HIST_TABLE} WHERE snapshot_date = ?;", [snapshot_date]
+    ).fetchone()[0]
+
+
+def compact_history(conn) -> None:
+    """
+    Reescribe la historia ordenada por (char_id, bracket_id, snapshot_date).
+    Los appends diarios quedan ordenados por fecha; reordenar periódicamente
+    mantiene los zonemaps de DuckDB útiles para las consultas por personaje.
+    """
+    ensure_history_table(conn)
+    run_sql(conn, f"DROP INDEX IF EXISTS {HIST_INDEX};")
+    run_sql(
+        conn,
+        f"""
+        CREATE OR REPLACE TABLE {HIST_TABLE} AS
+        SELECT * FROM {HIST_TABLE}
+        ORDER BY char_id, bracket_id, snapshot_date;
+        """,
+    )
+    run_sql(conn, f"CREATE INDEX IF NOT EXISTS {HIST_INDEX} ON {HIST_TABLE} (char_id, bracket_id);")
+
+
+def rebuild_history(conn) -> None:
+    """
+    Reconstruye toda la historia desde RAW, día por día en orden.
+    """
+    ensure_history_table(conn)
+    run_sql(conn, f"DELETE FROM {HIST_TABLE};")
+    dates = [
+        row[0]
+        for row in conn.execute(
+            f"SELECT DISTINCT fecha_proceso FROM {RAW_TABLE} ORDER BY fecha_proceso;"
+        ).fetchall()
+    ]
+    for processing_date in dates:
+        update_history(processing_date, conn)
+    compact_history(conn)
+
+
+def build_history(processing_date: str | None = None, compact: bool | None = None) -> None:
+    """
+    Actualiza la historia con el slice del día.
+    Por defecto compacta los lunes (una vez por semana).
+    """
+    if processing_date is None:
+        processing_date = date.today().strftime("%Y%m%d")
+    if compact is None:
+        compact = datetime.strptime(processing_date, "%Y%m%d").weekday() == 0
+
+    conn = get_connection()
+    try:
+        n_rows = update_history(processing_date, conn)
+        if compact:
+            compact_history(conn)
+        print(
+            f"[leaderboard_history] {n_rows} filas en {HIST_TABLE} "
+            f"para fecha_proceso={processing_date} (compactado={compact})"
+        )
+    finally:
+        conn.close()
+
+
+def get_rating_history(char_id: int, bracket_id: str, conn=None) -> pd.DataFrame:
+    """
+    Serie de rating / deltas de un personaje en un bracket, ordenada por fecha.
+    """
+    own_conn = conn is None
+    conn = conn or get_connection()
+    try:
+        return conn.execute(
+            f"""
+            SELECT *
+            FROM {HIST_TABLE}
+            WHERE char_id = ? AND bracket_id = ?
+            ORDER BY snapshot_date;
+            """,
+            [char_id, bracket_id],
+        ).df()
+    finally:
+        if own_conn:
+            conn.close()
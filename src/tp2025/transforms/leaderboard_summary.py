@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+from datetime import date
+from typing import Dict, Tuple
+
+from tp2025.io.load_localdb import get_connection, run_sql
+
+LEADERBOARD_CUR = "cur_pvp_leaderboard"
+CHINFO_CUR = "cur_chinfo"
+
+RATING_BUCKET_WIDTH = 100
+
+# tabla -> (DDL de DuckDB, SELECT del día con un parámetro `?` = fecha_proceso)
+SUMMARY_TABLES: Dict[str, Tuple[str, str]] = {
+    "agg_class_spec_daily": (
+        """
+        CREATE TABLE IF NOT EXISTS agg_class_spec_daily (
+            fecha_proceso  VARCHAR NOT NULL,
+            bracket_id     VARCHAR NOT NULL,
+            class_name     VARCHAR,
+            current_spec   VARCHAR,
+            n_chars        INTEGER,
+            avg_rating     DOUBLE,
+            max_rating     INTEGER
+        );
+        """,
+        f"""
+        SELECT
+            l.fecha_proceso,
+            l.bracket_id::VARCHAR          AS bracket_id,
+            c.class_name::VARCHAR          AS class_name,
+            c.current_spec::VARCHAR        AS current_spec,
+            COUNT(*)::INTEGER              AS n_chars,
+            AVG(l.rating)                  AS avg_rating,
+            MAX(l.rating)                  AS max_rating
+        FROM {LEADERBOARD_CUR} l
+        LEFT JOIN {CHINFO_CUR} c
+            ON  c.char_id = l.char_id
+            AND c.fecha_proceso = l.fecha_proceso
+        WHERE l.fecha_proceso = ?
+        GROUP BY ALL
+        """,
+    ),
+    "agg_rating_bucket_daily": (
+        """
+        CREATE TABLE IF NOT EXISTS agg_rating_bucket_daily (
+            fecha_proceso  VARCHAR NOT NULL,
+            bracket_id     VARCHAR NOT NULL,
+            rating_bucket  INTEGER NOT NULL,
+            n_chars        INTEGER
+        );
+        """,
+        f"""
+        SELECT
+            fecha_proceso,
+            bracket_id::VARCHAR                                                AS bracket_id,
+            (FLOOR(rating / {RATING_BUCKET_WIDTH}) * {RATING_BUCKET_WIDTH})::INTEGER AS rating_bucket,
+            COUNT(*)::INTEGER                                                  AS n_chars
+        FROM {LEADERBOARD_CUR}
+        WHERE fecha_proceso = ?
+          AND rating IS NOT NULL
+        GROUP BY ALL
+        """,
+    ),
+    "agg_realm_top_daily": (
+        """
+        CREATE TABLE IF NOT EXISTS agg_realm_top_daily (
+            fecha_proceso  VARCHAR NOT NULL,
+            bracket_id     VARCHAR NOT NULL,
+            slug_name      VARCHAR,
+            n_top100       INTEGER,
+            n_top500       INTEGER,
+            n_total        INTEGER
+        );
+        """,
+        f"""
+        SELECT
+            fecha_proceso,
+            bracket_id::VARCHAR                                  AS bracket_id,
+            slug_name::VARCHAR                                   AS slug_name,
+            (COUNT(*) FILTER (WHERE ranking <= 100))::INTEGER    AS n_top100,
+            (COUNT(*) FILTER (WHERE ranking <= 500))::INTEGER    AS n_top500,
+            COUNT(*)::INTEGER                                    AS n_total
+        FROM {LEADERBOARD_CUR}
+        WHERE fecha_proceso = ?
+        GROUP BY ALL
+        """,
+    ),
+}
+
+
+def build_summaries(processing_date: str | None = None, conn=None) -> Dict[str, int]:
+    """
+    Actualiza los agregados diarios del leaderboard para una fecha de proceso.
+
+    - Sólo se reemplaza el slice de processing_date (DELETE + INSERT):
+      los días anteriores quedan intactos.
+    - Se arma desde CUR, así que debe correr con CUR cargado para esa fecha
+      (después de build_chinfo_cur).
+
+    Devuelve la cantidad de filas generadas por tabla.
+    """
+    if processing_date is None:
+        processing_date = date.today().strftime("%Y%m%d")
+
+    own_conn = conn is None
+    conn = conn or get_connection()
+    counts: Dict[str, int] = {}
+    try:
+        for table, (ddl, select_sql) in SUMMARY_TABLES.items():
+            run_sql(conn, ddl)
+            conn.execute(f"DELETE FROM {table} WHERE fecha_proceso = ?;", [processing_date])
+            conn.execute(f"INSERT INTO {table} {select_sql};", [processing_date])
+            counts[table] = conn.execute(
+                f"SELECT COUNT(*) FROM {table} WHERE fecha_proceso = ?;", [processing_date]
+            ).fetchone()[0]
+
+        print(f"[leaderboard_summary] Agregados para fecha_proceso={processing_date}: {counts}")
+        return counts
+    finally:
+        if own_conn:
+            conn.close()
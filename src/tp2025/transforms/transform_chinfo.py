@@ -2,13 +2,15 @@ from __future__ import annotations
 
 from datetime import date
 
-from tp2025.io.load_localdb import get_connection, run_sql
+from tp2025.io.duckdb_resources import track_spill
+from tp2025.io.load_localdb import get_connection
+from tp2025.transforms.dimension_encoding import encoded, sync_dimensions
 
 RAW_TABLE = "raw_chinfo"
 CUR_TABLE = "cur_chinfo"
 
 
-def create_cur_chinfo(processing_date: str | None = None) -> None:
+def create_cur_chinfo(processing_date: str | None = None, conn=None) -> None:
     """
     Construye la tabla CUR de información de personajes a partir de la tabla RAW
     para una fecha de proceso dada.
@@ -16,32 +18,45 @@ def create_cur_chinfo(processing_date: str | None = None) -> None:
     - Toma datos de raw_chinfo.
     - Filtra por fecha_proceso (por defecto, la fecha de hoy en formato YYYYMMDD).
     - Castea tipos y renombra columnas según el modelo de negocio.
+    - Realm, facción, clase y spec se guardan como ENUM (códigos enteros estables,
+      ver dimension_encoding) en lugar de VARCHAR repetido en cada fila.
+    - Si se pasa conn, la usa (y no la cierra); si no, abre la conexión local.
     - Crea o reemplaza la tabla cur_chinfo.
     """
     if processing_date is None:
         processing_date = date.today().strftime("%Y%m%d")
 
-    conn = get_connection()
+    own_conn = conn is None
+    conn = conn or get_connection()
     try:
+        sync_dimensions(
+            conn,
+            RAW_TABLE,
+            {"realm": "realm_slug", "faction": "faction", "class": "class", "spec": "spec"},
+            processing_date,
+        )
+
         query = f"""
         CREATE OR REPLACE TABLE {CUR_TABLE} AS
         SELECT 
             CAST(id AS BIGINT)      AS char_id,
             name                    AS char_name,
-            realm_slug              AS slug_name,
-            faction                 AS faction_type,
-            class                   AS class_name,
-            spec                    AS current_spec,
+            {encoded("realm", "realm_slug")} AS slug_name,
+            {encoded("faction", "faction")}  AS faction_type,
+            {encoded("class", "class")}      AS class_name,
+            {encoded("spec", "spec")}        AS current_spec,
             CAST(a_ilvl AS INT)     AS average_item_level,
             CAST(e_ilvl AS INT)     AS equipped_item_level,
             fecha_proceso
         FROM {RAW_TABLE}
-        WHERE fecha_proceso = '{processing_date}';
+        WHERE fecha_proceso = ?;
         """
-        run_sql(conn, query)
+        with track_spill(conn, CUR_TABLE):
+            conn.execute(query, [processing_date])
         print(
             f"[transform_chinfo] Tabla {CUR_TABLE} generada "
             f"para fecha_proceso={processing_date}"
         )
     finally:
-        conn.close()
\ No newline at end of file
+        if own_conn:
+            conn.close()
\ No newline at end of file
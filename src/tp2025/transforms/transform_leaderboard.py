@@ -2,48 +2,63 @@ from __future__ import annotations
 
 from datetime import date
 
-from tp2025.io.load_localdb import get_connection, run_sql
+from tp2025.io.duckdb_resources import track_spill
+from tp2025.io.load_localdb import get_connection
+from tp2025.transforms.dimension_encoding import encoded, sync_dimensions
 
 RAW_TABLE = "raw_pvp_leaderboard"
 CUR_TABLE = "cur_pvp_leaderboard"
 
 
-def create_cur_leaderboard(processing_date: str | None = None) -> None:
+def create_cur_leaderboard(processing_date: str | None = None, conn=None) -> None:
     """
     Construye la tabla CUR a partir de la tabla RAW para una fecha de proceso dada.
 
     - Toma datos de raw_pvp_leaderboard.
     - Filtra por fecha_proceso (por defecto, la fecha de hoy en formato YYYYMMDD).
     - Castea tipos y renombra columnas según el modelo de negocio.
+    - Realm, facción y bracket se guardan como ENUM (códigos enteros estables,
+      ver dimension_encoding) en lugar de VARCHAR repetido en cada fila.
+    - Si se pasa conn, la usa (y no la cierra); si no, abre la conexión local.
     - Crea o reemplaza la tabla cur_pvp_leaderboard.
     """
     if processing_date is None:
         processing_date = date.today().strftime("%Y%m%d")
 
-    conn = get_connection()
+    own_conn = conn is None
+    conn = conn or get_connection()
     try:
+        sync_dimensions(
+            conn,
+            RAW_TABLE,
+            {"realm": "slug", "faction": "faction", "bracket": "bracket"},
+            processing_date,
+        )
+
         query = f"""
         CREATE OR REPLACE TABLE {CUR_TABLE} AS
         SELECT 
             CAST(id AS BIGINT)      AS char_id,
             name                    AS char_name,
-            slug                    AS slug_name,
-            faction                 AS faction_type,
+            {encoded("realm", "slug")}       AS slug_name,
+            {encoded("faction", "faction")}  AS faction_type,
             CAST(rank AS INT)       AS ranking,
             CAST(rating AS INT)     AS rating,
             CAST(played AS INT)     AS games_played,
             CAST(won AS INT)        AS games_won,
             CAST(lost AS INT)       AS games_lost,
-            bracket                 AS bracket_id,
+            {encoded("bracket", "bracket")}  AS bracket_id,
             CAST(s_id AS INT)       AS season_id,
             fecha_proceso
         FROM {RAW_TABLE}
-        WHERE fecha_proceso = '{processing_date}';
+        WHERE fecha_proceso = ?;
         """
-        run_sql(conn, query)
+        with track_spill(conn, CUR_TABLE):
+            conn.execute(query, [processing_date])
         print(
             f"[transform_leaderboard] Tabla {CUR_TABLE} generada "
             f"para fecha_proceso={processing_date}"
         )
     finally:
-        conn.close()
\ No newline at end of file
+        if own_conn:
+            conn.close()
\ No newline at end of file
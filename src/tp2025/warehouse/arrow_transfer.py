@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import io
+import os
+from typing import Iterable, Iterator, List, Sequence
+
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+from psycopg2.extensions import connection as PgConnection
+from psycopg2.extras import execute_values
+
+# Filas por RecordBatch leído de DuckDB: acota la memoria de la carga
+BATCH_ROWS = int(os.getenv("WAREHOUSE_BATCH_ROWS", "50000"))
+# "insert": INSERT multi-fila por batch (Redshift no soporta COPY FROM STDIN)
+# "copy":   COPY ... FROM STDIN en CSV (PostgreSQL y compatibles)
+TRANSFER_MODE = os.getenv("WAREHOUSE_TRANSFER_MODE", "insert")
+
+
+def iter_record_batches(duck_result, batch_rows: int = BATCH_ROWS) -> Iterator[pa.RecordBatch]:
+    """
+    Itera el resultado de un execute() de DuckDB como RecordBatches de Arrow
+    de tamaño fijo, sin materializar la tabla completa ni pasar por pandas.
+    """
+    to_reader = getattr(duck_result, "to_arrow_reader", None) or duck_result.fetch_record_batch
+    reader = to_reader(batch_rows)
+    for batch in reader:
+        if batch.num_rows:
+            yield batch
+
+
+def record_batch_to_csv(batch: pa.RecordBatch) -> bytes:
+    """
+    Codifica un batch como CSV sin header (los NULL quedan como campo vacío
+    sin comillas, que es como los interpreta COPY ... CSV).
+    """
+    buf = io.BytesIO()
+    pa_csv.write_csv(batch, buf, pa_csv.WriteOptions(include_header=False))
+    return buf.getvalue()
+
+
+def copy_batches(
+    conn: PgConnection,
+    table: str,
+    columns: Sequence[str],
+    batches: Iterable[pa.RecordBatch],
+) -> int:
+    """
+    Un COPY FROM STDIN por batch, con el CSV generado directamente desde Arrow.
+    """
+    sql = f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)"
+    total = 0
+    with conn.cursor() as cur:
+        for batch in batches:
+            cur.copy_expert(sql, io.BytesIO(record_batch_to_csv(batch)))
+            total += batch.num_rows
+    return total
+
+
+def insert_batches(
+    conn: PgConnection,
+    table: str,
+    columns: Sequence[str],
+    batches: Iterable[pa.RecordBatch],
+    page_size: int = 1000,
+) -> int:
+    """
+    INSERT multi-fila por batch. Sólo existen en memoria las filas del batch
+    actual, armadas columna a columna desde Arrow (sin DataFrame ni iterrows).
+    """
+    sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES %s"
+    total = 0
+    with conn.cursor() as cur:
+        for batch in batches:
+            cols: List[list] = [batch.column(i).to_pylist() for i in range(batch.num_columns)]
+            execute_values(cur, sql, zip(*cols), page_size=page_size)
+            total += batch.num_rows
+    return total
+
+
+def transfer_query(
+    duck_result,
+    conn: PgConnection,
+    table: str,
+    columns: Sequence[str],
+    mode: str = TRANSFER_MODE,
+    batch_rows: int = BATCH_ROWS,
+    commit: bool = True,
+) -> int:
+    """
+    Streamea el resultado de DuckDB hacia `table` en batches de memoria constante.
+    Las columnas del SELECT deben venir en el mismo orden que `columns`.
+    """
+    batches = iter_record_batches(duck_result, batch_rows)
+    if mode == "copy":
+        total = copy_batches(conn, table, columns, batches)
+    elif mode == "insert":
+        total = insert_batches(conn, table, columns, batches)
+    else:
+        raise ValueError(f"WAREHOUSE_TRANSFER_MODE inválido: {mode!r} (usar 'insert' o 'copy')")
+
+    if commit:
+        conn.commit()
+    return total
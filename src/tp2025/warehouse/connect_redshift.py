@@ -4,11 +4,12 @@ import os
 from contextlib import contextmanager
 from typing import Generator
 
-from dotenv import load_dotenv
 import psycopg2
 from psycopg2.extensions import connection as PgConnection, cursor as PgCursor
 
-load_dotenv()
+from tp2025.config import load_env
+
+load_env()
 
 
 def get_redshift_uri() -> str:
@@ -1,11 +1,22 @@
 from __future__ import annotations
 
-from datetime import date
+import hashlib
+import json
+import os
+from datetime import date, datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Sequence
 
-import pandas as pd
 from psycopg2.extensions import connection as PgConnection
 from psycopg2.extras import execute_values
 
+if TYPE_CHECKING:  # pandas sólo para anotaciones: no se paga en el import
+    import pandas as pd
+
+THIS_FILE = Path(__file__).resolve()
+PROJECT_ROOT = THIS_FILE.parents[3]
+DDL_CACHE_FILE = PROJECT_ROOT / "data" / "localdb" / "redshift_ddl_cache.json"
+
 
 DIM_SEASON_DDL = """
 CREATE TABLE IF NOT EXISTS dim_season (
@@ -48,29 +59,173 @@ CREATE TABLE IF NOT EXISTS fact_pvp_leaderboard_snapshot (
     games_lost     INTEGER
 );
 """
+# ===== Agregados diarios del leaderboard (ver transforms.leaderboard_summary) =====
+
+AGG_CLASS_SPEC_DDL = """
+CREATE TABLE IF NOT EXISTS agg_class_spec_daily (
+    fecha_proceso  VARCHAR(8) NOT NULL,
+    bracket_id     VARCHAR(10) NOT NULL,
+    class_name     VARCHAR(50),
+    current_spec   VARCHAR(50),
+    n_chars        INTEGER,
+    avg_rating     DOUBLE PRECISION,
+    max_rating     INTEGER
+);
+"""
+
+AGG_RATING_BUCKET_DDL = """
+CREATE TABLE IF NOT EXISTS agg_rating_bucket_daily (
+    fecha_proceso  VARCHAR(8) NOT NULL,
+    bracket_id     VARCHAR(10) NOT NULL,
+    rating_bucket  INTEGER NOT NULL,
+    n_chars        INTEGER
+);
+"""
+
+AGG_REALM_TOP_DDL = """
+CREATE TABLE IF NOT EXISTS agg_realm_top_daily (
+    fecha_proceso  VARCHAR(8) NOT NULL,
+    bracket_id     VARCHAR(10) NOT NULL,
+    slug_name      VARCHAR(50),
+    n_top100       INTEGER,
+    n_top500       INTEGER,
+    n_total        INTEGER
+);
+"""
+
+STAR_SCHEMA_DDLS = [
+    DIM_SEASON_DDL,
+    DIM_BRACKET_DDL,
+    DIM_CHARACTER_SCD2_DDL,
+    FACT_PVP_LEADERBOARD_DDL,
+    AGG_CLASS_SPEC_DDL,
+    AGG_RATING_BUCKET_DDL,
+    AGG_REALM_TOP_DDL,
+]
+
+# Orden de columnas de las cargas bulk (las lecturas de DuckDB deben respetarlo)
+DIM_CHARACTER_COLUMNS = (
+    "char_id",
+    "char_name",
+    "slug_name",
+    "faction_type",
+    "class_name",
+    "current_spec",
+    "fecha_proceso",
+)
+
+FACT_LEADERBOARD_COLUMNS = (
+    "snapshot_date",
+    "char_id",
+    "season_id",
+    "bracket_id",
+    "rating",
+    "ranking",
+    "games_played",
+    "games_won",
+    "games_lost",
+)
+
+
+# Columna que identifica el día en cada tabla que se carga por slices
+DAY_COLUMNS = {
+    "dim_character_scd2": "fecha_proceso",
+    "fact_pvp_leaderboard_snapshot": "snapshot_date",
+    "agg_class_spec_daily": "fecha_proceso",
+    "agg_rating_bucket_daily": "fecha_proceso",
+    "agg_realm_top_daily": "fecha_proceso",
+}
+
+
+def snapshot_date_for(processing_date: str) -> date:
+    """
+    snapshot_date de la fact para una fecha_proceso YYYYMMDD.
+    """
+    return datetime.strptime(processing_date, "%Y%m%d").date()
+
+
+def delete_days(
+    conn: PgConnection,
+    processing_dates: Sequence[str],
+    tables: Sequence[str] = tuple(DAY_COLUMNS),
+) -> None:
+    """
+    Borra los días indicados de dim, fact y agg_* (o sólo de `tables`) sin
+    commitear: va en la misma transacción que la carga, así que recargar
+    días (reintento o backfill) reemplaza sus filas en lugar de duplicarlas.
+    """
+    if not processing_dates:
+        return
+    days = list(processing_dates)
+    snapshots = [snapshot_date_for(d) for d in days]
+    with conn.cursor() as cur:
+        for table in tables:
+            column = DAY_COLUMNS[table]
+            # psycopg2 expande la tupla a (v1, v2, ...): Redshift no tiene ARRAY
+            values = tuple(snapshots if column == "snapshot_date" else days)
+            cur.execute(f"DELETE FROM {table} WHERE {column} IN %s", (values,))
 
 
 def create_tables(conn: PgConnection) -> None:
     """
     Crea las tablas del modelo estrella en Redshift si no existen.
     """
-    ddls = [
-        DIM_SEASON_DDL,
-        DIM_BRACKET_DDL,
-        DIM_CHARACTER_SCD2_DDL,
-        FACT_PVP_LEADERBOARD_DDL,
-    ]
     with conn.cursor() as cur:
-        for ddl in ddls:
+        for ddl in STAR_SCHEMA_DDLS:
             cur.execute(ddl)
     conn.commit()
 
 
-def load_dim_character_scd2(conn: PgConnection, df_chinfo: pd.DataFrame) -> None:
+def _ddl_cache_key(conn: PgConnection, ddls: list[str]) -> str:
+    """
+    Clave del cache de DDL: destino (host/db/usuario/search_path) + texto de los DDL.
+    Si cambia el destino o algún DDL, la clave cambia y se vuelven a ejecutar.
+    """
+    params = conn.get_dsn_parameters()
+    target = [params.get("host"), params.get("port"), params.get("dbname"), params.get("user")]
+    target.append(os.getenv("REDSHIFT_SCHEMA"))
+    raw = json.dumps([target, ddls])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _read_ddl_cache(path: Path) -> set[str]:
+    try:
+        return set(json.loads(path.read_text(encoding="utf-8")))
+    except (FileNotFoundError, ValueError):
+        return set()
+
+
+def ensure_tables(conn: PgConnection, cache_path: Path = DDL_CACHE_FILE) -> bool:
+    """
+    Igual que create_tables, pero recuerda (en un sidecar local) que los DDL
+    ya se aplicaron a este destino y no los vuelve a emitir en cada corrida.
+    Devuelve True si ejecutó los DDL.
+    """
+    key = _ddl_cache_key(conn, STAR_SCHEMA_DDLS)
+    cached = _read_ddl_cache(cache_path)
+    if key in cached:
+        return False
+
+    create_tables(conn)
+
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    cache_path.write_text(json.dumps(sorted(cached | {key})), encoding="utf-8")
+    return True
+
+
+def invalidate_ddl_cache(cache_path: Path = DDL_CACHE_FILE) -> None:
+    """
+    Olvida los DDL aplicados (por ejemplo, si alguien borró tablas en Redshift).
+    """
+    cache_path.unlink(missing_ok=True)
+
+
+def load_dim_character_scd2(conn: PgConnection, df_chinfo: pd.DataFrame, commit: bool = True) -> None:
     """
     Carga SCD2 "simple" de personajes en modo bulk:
     - Appendea una fila por personaje para la fecha_proceso dada.
     - Usa execute_values para evitar 1 INSERT por fila.
+    - commit=False: la deja en la transacción de quien llama (ver delete_days).
     """
     if df_chinfo.empty:
         return
@@ -104,24 +259,30 @@ def load_dim_character_scd2(conn: PgConnection, df_chinfo: pd.DataFrame) -> None
 
     with conn.cursor() as cur:
         execute_values(cur, sql, rows, page_size=1000)
-    conn.commit()
+    if commit:
+        conn.commit()
 
 
 
 def load_fact_leaderboard(
     conn: PgConnection,
     df_leaderboard: pd.DataFrame,
-    snapshot_date: date,
+    snapshot_date: date | None = None,
+    commit: bool = True,
 ) -> None:
     """
     Carga la tabla de hechos de snapshot del leaderboard en modo bulk.
+
+    Si snapshot_date es None se usa la fecha_proceso de cada fila
+    (útil para cargar varios días de una vez, por ejemplo en un backfill).
+    commit=False: la deja en la transacción de quien llama.
     """
     if df_leaderboard.empty:
         return
 
     rows = [
         (
-            snapshot_date,
+            snapshot_date or snapshot_date_for(row["fecha_proceso"]),
             int(row["char_id"]),
             int(row["season_id"]),
             row["bracket_id"],
@@ -151,5 +312,6 @@ def load_fact_leaderboard(
 
     with conn.cursor() as cur:
         execute_values(cur, sql, rows, page_size=1000)
-    conn.commit()
+    if commit:
+        conn.commit()
 
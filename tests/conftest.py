@@ -0,0 +1,17 @@
+import pytest
+
+from tp2025.blizzard_api import rate_limiter
+from tp2025.io import payload_archive
+
+
+@pytest.fixture(autouse=True)
+def _in_memory_rate_limiter(monkeypatch):
+    # Los tests no comparten (ni crean) el bucket SQLite de data/ratelimit
+    limiter = rate_limiter.RateLimiter(rate_limiter.MemoryBackend(), rate=1000.0, capacity=1000.0)
+    monkeypatch.setattr(rate_limiter, "_default_limiter", limiter)
+
+
+@pytest.fixture(autouse=True)
+def _no_payload_archive(monkeypatch):
+    # Los tests no escriben en data/archive (los de payload_archive usan tmp_path)
+    monkeypatch.setattr(payload_archive, "ARCHIVE_ENABLED", False)
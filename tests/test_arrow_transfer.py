@@ -0,0 +1,75 @@
+import duckdb
+import pytest
+
+from tp2025.warehouse import arrow_transfer as at
+
+
+class FakeCursor:
+    def __init__(self):
+        self.copies = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def copy_expert(self, sql, stream):
+        self.copies.append((sql, stream.read()))
+
+
+class FakeConn:
+    def __init__(self):
+        self.cur = FakeCursor()
+        self.commits = 0
+
+    def cursor(self):
+        return self.cur
+
+    def commit(self):
+        self.commits += 1
+
+
+@pytest.fixture
+def duck():
+    conn = duckdb.connect()
+    conn.execute("CREATE TYPE realm_enum AS ENUM ('stormrage')")
+    conn.execute(
+        """
+        CREATE TABLE cur AS
+        SELECT i AS char_id, 'stormrage'::realm_enum AS slug_name,
+               CASE WHEN i = 0 THEN NULL ELSE 'x' END AS spec
+        FROM range(5) t(i)
+        """
+    )
+    yield conn
+    conn.close()
+
+
+def test_copy_mode_streams_fixed_size_batches(duck):
+    pg = FakeConn()
+    result = duck.execute("SELECT char_id, slug_name::VARCHAR, spec FROM cur ORDER BY char_id")
+
+    total = at.transfer_query(result, pg, "dim", ["char_id", "slug_name", "spec"], mode="copy", batch_rows=2)
+
+    assert total == 5
+    assert pg.commits == 1
+    assert [len(data.splitlines()) for _, data in pg.cur.copies] == [2, 2, 1]
+    sql, first = pg.cur.copies[0]
+    assert sql == "COPY dim (char_id, slug_name, spec) FROM STDIN WITH (FORMAT csv)"
+    # NULL -> campo vacío sin comillas
+    assert first.splitlines()[0] == b'0,"stormrage",'
+
+
+def test_insert_mode_builds_rows_per_batch(duck, monkeypatch):
+    calls = []
+    monkeypatch.setattr(at, "execute_values", lambda cur, sql, rows, page_size: calls.append(list(rows)))
+
+    pg = FakeConn()
+    result = duck.execute("SELECT char_id, slug_name, spec FROM cur ORDER BY char_id")
+    total = at.transfer_query(result, pg, "dim", ["char_id", "slug_name", "spec"], batch_rows=3, commit=False)
+
+    assert total == 5
+    assert pg.commits == 0
+    assert calls[0][0] == (0, "stormrage", None)
+    assert [len(rows) for rows in calls] == [3, 2]
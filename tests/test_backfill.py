@@ -0,0 +1,134 @@
+import duckdb
+import pandas as pd
+import pytest
+
+from tp2025.jobs import backfill
+from tp2025.jobs import load_chinfo_raw_to_db as chinfo_raw
+from tp2025.jobs import load_leaderboard_raw_to_db as leaderboard_raw
+from tp2025.warehouse import arrow_transfer, connect_redshift
+from tp2025.warehouse import redshift_model as rm
+
+
+def _write_landing(landing, fecha, rating):
+    pd.DataFrame(
+        [
+            {
+                "id": 252903401, "name": "Lørdnick", "slug": "stormrage", "faction": "HORDE",
+                "rank": 1, "rating": rating, "played": 217, "won": 144, "lost": 73,
+            }
+        ]
+    ).to_parquet(landing / f"pvp_leaderboard_s40_3v3_{fecha}.parquet", index=False)
+
+
+def test_date_range_is_inclusive():
+    assert backfill.date_range("20251130", "20251202") == ["20251130", "20251201", "20251202"]
+    with pytest.raises(ValueError):
+        backfill.date_range("20251202", "20251130")
+
+
+def test_backfill_loads_raw_history_and_summaries_for_each_day(tmp_path, monkeypatch):
+    landing = tmp_path / "landing"
+    landing.mkdir()
+    _write_landing(landing, "20251117", 2900)
+    _write_landing(landing, "20251118", 2954)
+
+    db_path = tmp_path / "wow_data.db"
+    monkeypatch.setattr(leaderboard_raw, "LANDING_DIR", landing)
+    monkeypatch.setattr(chinfo_raw, "LANDING_DIR", landing)
+    monkeypatch.setattr(chinfo_raw, "ensure_table_exists", lambda: None)
+    monkeypatch.setattr(backfill, "get_connection", lambda: duckdb.connect(str(db_path)))
+
+    batches = []
+    monkeypatch.setattr(backfill, "load_warehouse_batch", lambda *args: batches.append(args))
+
+    backfill.run_backfill("20251117", "20251118", max_workers=2)
+    # Re-correr el rango no duplica filas RAW ni de agregados
+    backfill.run_backfill("20251117", "20251118", max_workers=2)
+
+    # cada corrida reemplaza en el warehouse los días procesados, con sus agregados
+    _, df_leaderboard, summaries = batches[-1]
+    assert sorted(df_leaderboard["fecha_proceso"]) == ["20251117", "20251118"]
+    buckets = summaries["agg_rating_bucket_daily"]
+    assert buckets[["fecha_proceso", "rating_bucket"]].values.tolist() == [["20251117", 2900], ["20251118", 2900]]
+
+    conn = duckdb.connect(str(db_path))
+    try:
+        raw = conn.execute(
+            "SELECT fecha_proceso, rating FROM raw_pvp_leaderboard ORDER BY fecha_proceso"
+        ).fetchall()
+        assert raw == [("20251117", "2900"), ("20251118", "2954")]
+
+        deltas = conn.execute(
+            "SELECT rating_delta FROM hist_pvp_leaderboard ORDER BY snapshot_date"
+        ).fetchall()
+        assert deltas == [(None,), (54,)]
+
+        local = conn.execute(
+            "SELECT fecha_proceso, n_chars FROM agg_rating_bucket_daily ORDER BY fecha_proceso"
+        ).fetchall()
+        assert local == [("20251117", 1), ("20251118", 1)]
+    finally:
+        conn.close()
+
+
+class RecordingCursor:
+    def __init__(self, deleted):
+        self.deleted = deleted
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        if sql.startswith("DELETE FROM"):
+            table = sql.split()[2]
+            self.deleted.setdefault(table, set()).update(str(v) for v in params[0])
+
+
+class RecordingConn:
+    def __init__(self):
+        self.deleted = {}
+
+    def cursor(self):
+        return RecordingCursor(self.deleted)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def test_backfill_keeps_warehouse_rows_of_days_without_landing(tmp_path, monkeypatch):
+    landing = tmp_path / "landing"
+    landing.mkdir()
+    _write_landing(landing, "20251117", 2900)
+    _write_landing(landing, "20251119", 2954)  # el 20251118 no tiene landing
+
+    db_path = tmp_path / "wow_data.db"
+    monkeypatch.setattr(leaderboard_raw, "LANDING_DIR", landing)
+    monkeypatch.setattr(chinfo_raw, "LANDING_DIR", landing)
+    monkeypatch.setattr(chinfo_raw, "ensure_table_exists", lambda: None)
+    monkeypatch.setattr(backfill, "get_connection", lambda: duckdb.connect(str(db_path)))
+
+    red_conn = RecordingConn()
+    monkeypatch.setattr(connect_redshift, "get_connection", lambda: red_conn)
+    monkeypatch.setattr(rm, "create_tables", lambda conn: None)
+    monkeypatch.setattr(rm, "load_dim_character_scd2", lambda *a, **k: None)
+    monkeypatch.setattr(rm, "load_fact_leaderboard", lambda *a, **k: None)
+    monkeypatch.setattr(arrow_transfer, "insert_batches", lambda *a, **k: None)
+
+    backfill.run_backfill("20251117", "20251119", max_workers=2)
+
+    # sólo se borran (y recargan) los días con filas: el 20251118 queda intacto
+    assert red_conn.deleted["fact_pvp_leaderboard_snapshot"] == {"2025-11-17", "2025-11-19"}
+    for table in rm.DAY_COLUMNS:
+        if table.startswith("agg_"):
+            assert red_conn.deleted[table] == {"20251117", "20251119"}
+    # sin perfiles en el rango no se toca la dimensión
+    assert "dim_character_scd2" not in red_conn.deleted
@@ -0,0 +1,66 @@
+import json
+import threading
+import urllib.request
+
+import duckdb
+import pytest
+
+from tp2025.services.character_lookup import CharacterIndex, make_server
+
+
+@pytest.fixture
+def index():
+    conn = duckdb.connect()
+    conn.execute(
+        """
+        CREATE TABLE cur_pvp_leaderboard AS
+        SELECT * FROM (VALUES
+            (1::BIGINT, 'Lørdnick', 'stormrage', 'HORDE', '3v3', 1, 2954, 217, 144, 73, 40, '20251117'),
+            (1::BIGINT, 'Lørdnick', 'stormrage', 'HORDE', '2v2', 5, 2700, 100, 60, 40, 40, '20251117'),
+            (2::BIGINT, 'Manongauz', 'demon-soul', 'ALLIANCE', '3v3', 2, 2900, 300, 180, 120, 40, '20251117'),
+            (3::BIGINT, 'Testchar', 'stormrage', 'HORDE', '3v3', 3, 2850, 90, 50, 40, 40, '20251117')
+        ) v(char_id, char_name, slug_name, faction_type, bracket_id, ranking, rating,
+            games_played, games_won, games_lost, season_id, fecha_proceso)
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE cur_chinfo AS
+        SELECT 1::BIGINT AS char_id, 'Paladin' AS class_name, 'Retribution' AS current_spec,
+               '20251117' AS fecha_proceso
+        """
+    )
+    return CharacterIndex.from_duckdb(conn)
+
+
+def test_hash_lookups(index):
+    rows = index.get(1)
+    assert {r["bracket_id"] for r in rows} == {"2v2", "3v3"}
+    assert index.get(1, bracket="3v3")[0]["current_spec"] == "Retribution"
+
+    found = index.find("stormrage", "LØRDNICK", bracket="2v2")
+    assert len(found) == 1 and found[0]["ranking"] == 5
+    assert index.get(999) == []
+
+
+def test_range_queries(index):
+    assert [r["char_id"] for r in index.by_rank_range("3v3", 2, 3)] == [2, 3]
+    assert [r["char_id"] for r in index.by_rating_range("3v3", 2860, 3000)] == [1, 2]
+    assert index.by_rank_range("5v5", 1, 10) == []
+
+
+def test_http_endpoint(index):
+    server = make_server(index, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base = f"http://127.0.0.1:{server.server_port}"
+    try:
+        with urllib.request.urlopen(f"{base}/character/stormrage/l%C3%B8rdnick?bracket=3v3") as resp:
+            body = json.loads(resp.read())
+        assert body[0]["rating"] == 2954
+
+        with urllib.request.urlopen(f"{base}/rank?bracket=3v3&from=1&to=2") as resp:
+            assert [r["char_id"] for r in json.loads(resp.read())] == [1, 2]
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,79 @@
+import pytest
+import requests
+
+from tp2025.blizzard_api import credential_pool as cp
+
+
+class _Response:
+    def __init__(self, status_code):
+        self.status_code = status_code
+        self.headers = {}
+
+
+class _Session:
+    """Responde 200 salvo a los tokens marcados como vencidos (401)."""
+
+    def __init__(self, expired=()):
+        self.expired = set(expired)
+        self.tokens = []
+
+    def get(self, url, headers, **kwargs):
+        token = headers["Authorization"].split()[1]
+        self.tokens.append(token)
+        return _Response(401 if token in self.expired else 200)
+
+
+def _pool(tmp_path, monkeypatch, clients, mint):
+    monkeypatch.setattr(cp.auth_client, "TOKEN_FILE", tmp_path / ".blizzard_access_token")
+    monkeypatch.setattr(cp.PooledClient, "mint_token", mint)
+    return cp.CredentialPool(cp.parse_clients(clients), region="us")
+
+
+def test_parse_clients():
+    assert cp.parse_clients("a:x, b:y:2") == [
+        cp.ClientCredentials("a", "x", 1.0),
+        cp.ClientCredentials("b", "y", 2.0),
+    ]
+    with pytest.raises(ValueError):
+        cp.parse_clients("solo_id")
+
+
+def test_requests_are_spread_by_weight(tmp_path, monkeypatch):
+    def mint(self):
+        self.token = f"tok-{self.client_id}"
+        return self.token
+
+    pool = _pool(tmp_path, monkeypatch, "a:x:3,b:y:1", mint)
+    session = _Session()
+    for _ in range(40):
+        assert pool.get("https://us.api.blizzard.com/x", session=session).status_code == 200
+
+    assert session.tokens.count("tok-a") == 30
+    assert session.tokens.count("tok-b") == 10
+    assert [s["used_last_hour"] for s in pool.stats()] == [30, 10]
+
+
+def test_revoked_client_leaves_rotation(tmp_path, monkeypatch):
+    def mint(self):
+        if self.client_id == "a":
+            resp = requests.Response()
+            resp.status_code = 401
+            raise requests.HTTPError(response=resp)
+        self.token = "tok-b"
+        return self.token
+
+    # "a" tiene un token viejo en disco que la API ya no acepta
+    pool = _pool(tmp_path, monkeypatch, "a:x,b:y", mint)
+    pool.clients[0].token_file.write_text("tok-a-viejo")
+    session = _Session(expired={"tok-a-viejo"})
+
+    statuses = [pool.get("https://us.api.blizzard.com/x", session=session).status_code for _ in range(4)]
+    assert statuses == [200] * 4
+
+    stats = {s["client_id"]: s for s in pool.stats()}
+    assert not stats["a"]["healthy"] and stats["b"]["healthy"]
+    assert session.tokens.count("tok-a-viejo") == 1
+
+    pool.mark_unhealthy(pool.clients[1], "test")
+    with pytest.raises(RuntimeError):
+        pool.get("https://us.api.blizzard.com/x", session=session)
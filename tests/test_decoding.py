@@ -0,0 +1,71 @@
+import json
+
+import pytest
+
+from tp2025.blizzard_api import decoding
+from tp2025.blizzard_api.decoding import LeaderboardPayload, ProfilePayload, decode
+from tp2025.jobs.extract_leaderboard_to_landing import normalize_leaderboard_entries
+from tp2025.services import ch_profile_client as cpc
+
+LEADERBOARD = {
+    "_links": {"self": {"href": "https://us.api.blizzard.com/..."}},
+    "entries": [
+        {
+            "character": {"name": "Lørdnick", "id": 1, "realm": {"key": {"href": "x"}, "id": 3, "slug": "stormrage"}},
+            "faction": {"type": "HORDE"},
+            "rank": 1,
+            "rating": 2954,
+            "season_match_statistics": {"played": 217, "won": 144, "lost": 73},
+            "tier": {"key": {"href": "y"}, "id": 5},
+        },
+        {"character": None, "faction": None, "rank": 2, "rating": 2900},
+    ],
+}
+
+
+@pytest.mark.parametrize("backend", decoding.available_backends())
+def test_backends_normalize_the_same_leaderboard(backend):
+    content = json.dumps(LEADERBOARD).encode()
+    expected = normalize_leaderboard_entries(json.loads(content))
+    df = normalize_leaderboard_entries(decode(content, LeaderboardPayload, backend=backend))
+    assert df.equals(expected)
+    assert df.loc[0, "slug"] == "stormrage"
+
+
+def test_typed_decode_skips_unknown_fields_and_validates():
+    msgspec = pytest.importorskip("msgspec")  # noqa: F841
+    content = json.dumps({"id": 1, "name": "Lørdnick", "realm": {"slug": "x"}, "level": 80,
+                          "character_class": {"name": "Paladin", "id": 2}}).encode()
+    payload = decode(content, ProfilePayload, backend="msgspec")
+    assert payload == {"id": 1, "name": "Lørdnick", "character_class": {"name": "Paladin"}}
+
+    with pytest.raises(ValueError):
+        decode(b'{"id": "not-an-int"}', ProfilePayload, backend="msgspec")
+
+
+def test_unknown_backend_and_invalid_json():
+    with pytest.raises(ValueError):
+        decoding.resolve_backend("yaml")
+    with pytest.raises(ValueError):
+        decode(b"{not json", backend="json")
+
+
+@pytest.mark.parametrize("backend", decoding.available_backends())
+def test_invalid_body_is_the_backend_value_error(backend):
+    with pytest.raises(ValueError) as info:
+        decode(b"{not json", backend=backend)
+    assert type(info.value) is not ValueError
+
+
+def test_programming_errors_are_not_reported_as_invalid_json():
+    with pytest.raises(TypeError):
+        decode(None, backend="json")
+
+
+def test_invalid_profile_body_is_logged_not_raised(monkeypatch):
+    class FakeResp:
+        status_code = 200
+        content = b"<html>maintenance</html>"
+
+    monkeypatch.setattr(cpc, "blizzard_get", lambda url, token, **kw: FakeResp())
+    assert cpc.fetch_json_response(None, "token", "url", "realm/char", schema=ProfilePayload) == (200, None)
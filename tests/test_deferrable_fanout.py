@@ -0,0 +1,140 @@
+import asyncio
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import pytest
+
+from tp2025.jobs import extract_chinfo_to_landing as chinfo
+from tp2025.jobs import extract_leaderboard_to_landing as leaderboard
+from tp2025.orchestration import fanout
+from tp2025.services.missing_characters import MissingCharacterCache
+
+
+def _profile(i):
+    return json.dumps({
+        "id": i, "name": f"Char{i}", "faction": {"name": "Horde"},
+        "character_class": {"name": "Paladin"}, "active_spec": {"name": "Retribution"},
+        "average_item_level": 700, "equipped_item_level": 698,
+    }).encode()
+
+
+def test_fan_out_spools_every_response(tmp_path):
+    responses = {"a": (200, b'{"id": 1}'), "b": (404, None), "c": (None, None)}
+    in_flight, peak = [0], [0]
+
+    def fetch(session, url, label):
+        in_flight[0] += 1
+        peak[0] = max(peak[0], in_flight[0])
+        try:
+            return responses[label]
+        finally:
+            in_flight[0] -= 1
+
+    requests_ = [{"key": k, "url": f"https://x/{k}"} for k in responses]
+    path = tmp_path / "spool" / "s.jsonl"
+    counts = asyncio.run(fanout.fan_out(requests_, path, concurrency=2, fetch=fetch))
+
+    assert counts == {"ok": 1, "not_found": 1, "failed": 1}
+    assert {r.key: (r.status, r.body) for r in fanout.read_spool(path)} == responses
+    assert peak[0] <= 2
+    assert [p.name for p in path.parent.iterdir()] == ["s.jsonl"]
+
+
+def test_fan_out_does_not_use_the_loop_default_executor(tmp_path):
+    # el triggerer comparte el executor por defecto entre todos los triggers
+    release = threading.Event()
+
+    def fetch(session, url, label):
+        release.wait(5)
+        return 200, b"{}"
+
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        loop.set_default_executor(ThreadPoolExecutor(max_workers=1))
+        requests_ = [{"key": str(i), "url": f"https://x/{i}"} for i in range(4)]
+        task = asyncio.create_task(fanout.fan_out(requests_, tmp_path / "s.jsonl", concurrency=4, fetch=fetch))
+        await asyncio.sleep(0.05)
+        # con los GET bloqueados, otro trigger todavía consigue su thread
+        other = await asyncio.wait_for(asyncio.to_thread(lambda: "libre"), timeout=1)
+        release.set()
+        return other, await task
+
+    other, counts = asyncio.run(scenario())
+    assert other == "libre"
+    assert counts["ok"] == 4
+
+
+def test_deferred_shard_lands_like_sync_extraction(tmp_path, monkeypatch):
+    landing = tmp_path / "landing"
+    monkeypatch.setattr(chinfo, "LANDING_DIR", landing)
+    monkeypatch.setattr(chinfo, "CHECKPOINT_DIR", landing / "_checkpoints")
+    monkeypatch.setattr(
+        chinfo, "MissingCharacterCache", lambda: MissingCharacterCache(tmp_path / "missing.sqlite")
+    )
+    chars = pd.DataFrame({
+        "char_id": list(range(4)),
+        "char_name": [f"Char{i}" for i in range(4)],
+        "slug_name": ["stormrage"] * 4,
+        "bracket_id": ["3v3"] * 4,
+        "season_id": [40] * 4,
+        "fecha_proceso": ["20251117"] * 4,
+    })
+    monkeypatch.setattr(chinfo, "get_top_pvp_characters", lambda *a, **k: chars)
+
+    [shard] = chinfo.plan_chinfo_shards("20251117", n_shards=1)
+    requests_ = chinfo.plan_chinfo_shard_requests(**shard)
+    assert [r["key"] for r in requests_] == [f"stormrage/char{i}" for i in range(4)]
+
+    def fetch(session, url, label):
+        i = int(label[-1])
+        return (404, None) if i == 3 else (200, _profile(i))
+
+    monkeypatch.setattr(fanout, "SPOOL_DIR", tmp_path / "spool")
+    path = fanout.spool_path("ch_profile", "20251117", "000of001")
+    asyncio.run(fanout.fan_out(requests_, path, fetch=fetch))
+
+    assert chinfo.land_spooled_profiles(0, 1, path, "20251117", fetch_resources=False) == 3
+    chinfo.merge_chinfo_shards("20251117")
+    df = pd.read_parquet(landing / "ch_profile_20251117.parquet")
+    assert sorted(df["id"]) == [0, 1, 2]
+
+    # el 404 quedó en el cache negativo: un nuevo plan ya no lo pide
+    chinfo.plan_chinfo_shards("20251117", n_shards=1)
+    assert [r["key"] for r in chinfo.plan_chinfo_shard_requests(**shard)] == [
+        f"stormrage/char{i}" for i in range(3)
+    ]
+
+
+def test_spooled_leaderboard_is_landed_and_failures_raise(tmp_path, monkeypatch):
+    monkeypatch.setattr(leaderboard, "LANDING_DIR", tmp_path / "landing")
+    monkeypatch.setattr(leaderboard, "DEFAULT_REGION", "us")
+    body = {"entries": [{"character": {"name": "A", "id": 1, "realm": {"slug": "stormrage"}},
+                         "faction": {"type": "HORDE"}, "rank": 1, "rating": 2900,
+                         "season_match_statistics": {"played": 10, "won": 6, "lost": 4}}]}
+    ok = {"us/s40/3v3": (200, json.dumps(body).encode())}
+
+    path = tmp_path / "lb.jsonl"
+    asyncio.run(fanout.fan_out(
+        [{"key": "us/s40/3v3", "url": "u"}], path, fetch=lambda s, u, label: ok[label]
+    ))
+    [landed] = leaderboard.land_spooled_leaderboard(path, "20251117")
+    assert landed.endswith("pvp_leaderboard_s40_3v3_20251117.parquet")
+    assert pd.read_parquet(landed)["rating"].tolist() == [2900]
+
+    asyncio.run(fanout.fan_out(
+        [{"key": "us/s40/2v2", "url": "u"}], path, fetch=lambda s, u, label: (503, None)
+    ))
+    with pytest.raises(RuntimeError, match="status 503"):
+        leaderboard.land_spooled_leaderboard(path, "20251117")
+
+
+def test_trigger_serializes_to_its_import_path(tmp_path):
+    pytest.importorskip("airflow")
+    from tp2025.orchestration.triggers import BlizzardFanOutTrigger
+
+    trigger = BlizzardFanOutTrigger([{"key": "k", "url": "u"}], str(tmp_path / "s.jsonl"), 4)
+    classpath, kwargs = trigger.serialize()
+    assert classpath == f"{BlizzardFanOutTrigger.__module__}.{BlizzardFanOutTrigger.__name__}"
+    assert BlizzardFanOutTrigger(**kwargs).serialize() == (classpath, kwargs)
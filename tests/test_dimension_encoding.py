@@ -0,0 +1,148 @@
+import duckdb
+
+from tp2025.transforms import transform_chinfo as tc
+from tp2025.transforms import transform_leaderboard as tl
+
+
+def _insert_raw(conn, fecha, slug):
+    conn.execute(
+        """
+        INSERT INTO raw_pvp_leaderboard VALUES
+            ('1', 'Lørdnick', ?, 'HORDE', '1', '2954', '217', '144', '73', '3v3', '40', ?)
+        """,
+        [slug, fecha],
+    )
+
+
+def test_cur_leaderboard_uses_stable_enum_codes(tmp_path, monkeypatch):
+    db_path = tmp_path / "wow.db"
+    monkeypatch.setattr(tl, "get_connection", lambda: duckdb.connect(str(db_path)))
+
+    conn = duckdb.connect(str(db_path))
+    conn.execute(
+        """
+        CREATE TABLE raw_pvp_leaderboard (
+            id TEXT, name TEXT, slug TEXT, faction TEXT, rank TEXT, rating TEXT,
+            played TEXT, won TEXT, lost TEXT, bracket TEXT, s_id TEXT, fecha_proceso TEXT
+        );
+        """
+    )
+    _insert_raw(conn, "20251117", "stormrage")
+    _insert_raw(conn, "20251118", "area-52")
+    _insert_raw(conn, "20251118", "stormrage")
+    conn.close()
+
+    tl.create_cur_leaderboard("20251117")
+    tl.create_cur_leaderboard("20251118")
+
+    conn = duckdb.connect(str(db_path))
+    try:
+        # "stormrage" conserva la clave del primer día; "area-52" recibe la siguiente
+        keys = dict(conn.execute("SELECT value, dim_key FROM enc_realm").fetchall())
+        assert keys == {"stormrage": 1, "area-52": 2}
+
+        rows = conn.execute(
+            """
+            SELECT slug_name::VARCHAR, enum_code(slug_name), typeof(bracket_id)
+            FROM cur_pvp_leaderboard
+            WHERE bracket_id = '3v3'
+            ORDER BY 1
+            """
+        ).fetchall()
+        assert [(r[0], r[1]) for r in rows] == [("area-52", 1), ("stormrage", 0)]
+        assert rows[0][2].startswith("ENUM")
+    finally:
+        conn.close()
+
+
+def test_cur_tables_share_one_enum_type_per_dimension(tmp_path, monkeypatch):
+    db_path = tmp_path / "wow.db"
+    monkeypatch.setattr(tl, "get_connection", lambda: duckdb.connect(str(db_path)))
+    monkeypatch.setattr(tc, "get_connection", lambda: duckdb.connect(str(db_path)))
+
+    conn = duckdb.connect(str(db_path))
+    conn.execute(
+        """
+        CREATE TABLE raw_pvp_leaderboard (
+            id TEXT, name TEXT, slug TEXT, faction TEXT, rank TEXT, rating TEXT,
+            played TEXT, won TEXT, lost TEXT, bracket TEXT, s_id TEXT, fecha_proceso TEXT
+        );
+        CREATE TABLE raw_chinfo (
+            id TEXT, name TEXT, realm_slug TEXT, faction TEXT, class TEXT, spec TEXT,
+            a_ilvl TEXT, e_ilvl TEXT, fecha_proceso TEXT
+        );
+        INSERT INTO raw_chinfo VALUES
+            ('1', 'Lørdnick', 'stormrage', 'HORDE', 'Paladin', 'Retribution', '700', '698', '20251117'),
+            ('2', 'Other', 'area-52', 'HORDE', 'Mage', 'Frost', '700', '698', '20251117');
+        """
+    )
+    _insert_raw(conn, "20251117", "stormrage")
+    conn.close()
+
+    # el leaderboard se arma antes; los perfiles traen un realm nuevo (extiende el ENUM)
+    tl.create_cur_leaderboard("20251117")
+    tc.create_cur_chinfo("20251117")
+
+    conn = duckdb.connect(str(db_path))
+    try:
+        types = conn.execute(
+            "SELECT DISTINCT data_type FROM duckdb_columns() "
+            "WHERE column_name = 'slug_name' AND table_name IN ('cur_pvp_leaderboard', 'cur_chinfo')"
+        ).fetchall()
+        assert types == [("ENUM('stormrage', 'area-52')",)]
+
+        plan = conn.execute(
+            "EXPLAIN SELECT * FROM cur_pvp_leaderboard l JOIN cur_chinfo c ON l.slug_name = c.slug_name"
+        ).fetchall()[0][1]
+        assert "VARCHAR" not in plan
+        assert conn.execute(
+            "SELECT count(*) FROM cur_pvp_leaderboard l JOIN cur_chinfo c ON l.slug_name = c.slug_name"
+        ).fetchone() == (1,)
+    finally:
+        conn.close()
+
+
+def test_faction_is_one_value_per_faction_across_sources(tmp_path, monkeypatch):
+    db_path = tmp_path / "wow.db"
+    monkeypatch.setattr(tl, "get_connection", lambda: duckdb.connect(str(db_path)))
+    monkeypatch.setattr(tc, "get_connection", lambda: duckdb.connect(str(db_path)))
+
+    conn = duckdb.connect(str(db_path))
+    conn.execute(
+        """
+        CREATE TABLE raw_pvp_leaderboard (
+            id TEXT, name TEXT, slug TEXT, faction TEXT, rank TEXT, rating TEXT,
+            played TEXT, won TEXT, lost TEXT, bracket TEXT, s_id TEXT, fecha_proceso TEXT
+        );
+        CREATE TABLE raw_chinfo (
+            id TEXT, name TEXT, realm_slug TEXT, faction TEXT, class TEXT, spec TEXT,
+            a_ilvl TEXT, e_ilvl TEXT, fecha_proceso TEXT
+        );
+        INSERT INTO raw_pvp_leaderboard VALUES
+            ('2', 'Other', 'stormrage', 'ALLIANCE', '2', '2900', '10', '6', '4', '3v3', '40', '20251117');
+        INSERT INTO raw_chinfo VALUES
+            ('1', 'Lørdnick', 'stormrage', 'Horde', 'Paladin', 'Retribution', '700', '698', '20251117'),
+            ('2', 'Other', 'stormrage', 'Alliance', 'Mage', 'Frost', '700', '698', '20251117');
+        """
+    )
+    _insert_raw(conn, "20251117", "stormrage")
+    conn.close()
+
+    tl.create_cur_leaderboard("20251117")
+    tc.create_cur_chinfo("20251117")
+
+    conn = duckdb.connect(str(db_path))
+    try:
+        values = conn.execute("SELECT value FROM enc_faction ORDER BY dim_key").fetchall()
+        assert values == [("ALLIANCE",), ("HORDE",)]
+        matched = conn.execute(
+            """
+            SELECT l.char_id, c.faction_type::VARCHAR
+            FROM cur_pvp_leaderboard l
+            JOIN cur_chinfo c ON c.char_id = l.char_id AND c.faction_type = l.faction_type
+            ORDER BY 1
+            """
+        ).fetchall()
+        assert matched == [(1, "HORDE"), (2, "ALLIANCE")]
+    finally:
+        conn.close()
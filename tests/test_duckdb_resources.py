@@ -0,0 +1,84 @@
+import duckdb
+
+from tp2025.io import duckdb_resources as dr
+
+
+def _cgroup_v2(root, memory="max", cpu="max 100000"):
+    root.mkdir(parents=True, exist_ok=True)
+    (root / "memory.max").write_text(f"{memory}\n")
+    (root / "cpu.max").write_text(f"{cpu}\n")
+    return root
+
+
+def test_reads_cgroup_v2_and_v1_limits(tmp_path):
+    v2 = _cgroup_v2(tmp_path / "v2", memory=str(4 * 1024**3), cpu="150000 100000")
+    assert dr.read_cgroup_memory_limit(v2) == 4 * 1024**3
+    assert dr.read_cgroup_cpu_limit(v2) == 1.5
+
+    unlimited = _cgroup_v2(tmp_path / "v2_unlimited")
+    assert dr.read_cgroup_memory_limit(unlimited) is None
+    assert dr.read_cgroup_cpu_limit(unlimited) is None
+
+    v1 = tmp_path / "v1"
+    (v1 / "memory").mkdir(parents=True)
+    (v1 / "cpu").mkdir()
+    (v1 / "memory" / "memory.limit_in_bytes").write_text("9223372036854771712\n")
+    (v1 / "cpu" / "cpu.cfs_quota_us").write_text("200000\n")
+    (v1 / "cpu" / "cpu.cfs_period_us").write_text("100000\n")
+    assert dr.read_cgroup_memory_limit(v1) is None
+    assert dr.read_cgroup_cpu_limit(v1) == 2.0
+
+    assert dr.read_cgroup_memory_limit(tmp_path / "missing") is None
+
+
+def test_profile_from_cgroup_with_env_overrides(tmp_path, monkeypatch):
+    for var in ("DUCKDB_MEMORY_LIMIT", "DUCKDB_THREADS", "DUCKDB_TEMP_DIR", "DUCKDB_MAX_TEMP_SIZE"):
+        monkeypatch.delenv(var, raising=False)
+    _cgroup_v2(tmp_path, memory=str(2 * 1024**3), cpu="300000 100000")
+    monkeypatch.setattr(dr, "MEMORY_FRACTION", 0.5)
+
+    profile = dr.detect_profile(tmp_path)
+    assert (profile.memory_limit_mb, profile.threads) == (1024, 3)
+    assert profile.source == {"memory_limit": "cgroup", "threads": "cgroup"}
+
+    monkeypatch.setenv("DUCKDB_THREADS", "1")
+    monkeypatch.setenv("DUCKDB_TEMP_DIR", str(tmp_path / "spill"))
+    profile = dr.detect_profile(tmp_path)
+    assert profile.threads == 1 and profile.source["threads"] == "env"
+
+    worker = profile.split(2, "7")
+    assert worker.memory_limit_mb == 512
+    assert worker.temp_directory == tmp_path / "spill" / "worker_7"
+
+    conn = duckdb.connect()
+    profile.apply(conn)
+    settings = dict(
+        conn.execute(
+            "SELECT name, value FROM duckdb_settings() "
+            "WHERE name IN ('threads', 'preserve_insertion_order', 'temp_directory')"
+        ).fetchall()
+    )
+    assert settings == {
+        "threads": "1",
+        "preserve_insertion_order": "false",
+        "temp_directory": str(tmp_path / "spill"),
+    }
+
+
+def test_track_spill_reports_peak_temp_bytes(tmp_path):
+    conn = duckdb.connect(str(tmp_path / "spill.db"))
+    dr.DuckDBResourceProfile(memory_limit_mb=40, threads=1, temp_directory=tmp_path / "tmp").apply(conn)
+
+    with dr.track_spill(conn, "sort_grande", poll_seconds=0.01) as stats:
+        conn.execute(
+            """
+            CREATE TABLE ordenada AS
+            SELECT i, md5(i::VARCHAR) || md5((i + 1)::VARCHAR) AS s
+            FROM range(1000000) t(i)
+            ORDER BY s
+            """
+        )
+
+    assert conn.execute("SELECT COUNT(*) FROM ordenada").fetchone()[0] == 1000000
+    assert stats.peak_bytes > 0
+    assert stats.elapsed_s > 0
@@ -0,0 +1,75 @@
+import pandas as pd
+
+from tp2025.io.landing_manifest import LandingManifest, parse_daily_filename
+from tp2025.jobs import extract_chinfo_to_landing as chinfo
+from tp2025.jobs import extract_leaderboard_to_landing as leaderboard
+from tp2025.jobs import load_leaderboard_raw_to_db as leaderboard_raw
+from tp2025.services.missing_characters import MissingCharacterCache
+
+
+def test_leaderboard_shards_and_regional_landing(tmp_path, monkeypatch):
+    monkeypatch.setattr(leaderboard, "LANDING_DIR", tmp_path)
+    monkeypatch.setattr(leaderboard_raw, "LANDING_DIR", tmp_path)
+    monkeypatch.setattr(leaderboard, "DEFAULT_REGION", "us")
+
+    shards = leaderboard.leaderboard_shards(["us", "eu"])
+    assert shards == [
+        {"region": "us", "bracket": "2v2"}, {"region": "us", "bracket": "3v3"},
+        {"region": "eu", "bracket": "2v2"}, {"region": "eu", "bracket": "3v3"},
+    ]
+
+    df = pd.DataFrame([{"id": 1, "name": "A", "slug": "stormrage", "faction": "HORDE",
+                        "rank": 1, "rating": 2900, "played": 10, "won": 6, "lost": 4}])
+    us = leaderboard.land_leaderboard(df, 40, "3v3", "20251117", cdc=False, region="us")
+    eu = leaderboard.land_leaderboard(df, 40, "3v3", "20251117", cdc=False, region="eu")
+
+    assert us.name == "pvp_leaderboard_s40_3v3_20251117.parquet"
+    assert eu.name == "pvp_leaderboard_eu_s40_3v3_20251117.parquet"
+    assert parse_daily_filename(eu.name) == ("pvp_leaderboard_eu", "20251117")
+    assert leaderboard_raw.parse_metadata(eu) == (40, "3v3", "20251117")
+
+    # RAW sólo carga la región configurada, por manifest o por glob
+    assert LandingManifest.load(tmp_path).days("pvp_leaderboard_eu") == ["20251117"]
+    assert [f.path for f in leaderboard_raw.list_parquet_for_processing_date("20251117")] == [us]
+    (tmp_path / "_manifest.json").unlink()
+    assert [f.path for f in leaderboard_raw.list_parquet_for_processing_date("20251117")] == [us]
+
+
+def test_chinfo_shards_map_and_merge(tmp_path, monkeypatch):
+    landing = tmp_path / "landing"
+    checkpoints = landing / "_checkpoints"
+    monkeypatch.setattr(chinfo, "LANDING_DIR", landing)
+    monkeypatch.setattr(chinfo, "CHECKPOINT_DIR", checkpoints)
+    monkeypatch.setattr(
+        chinfo, "MissingCharacterCache", lambda: MissingCharacterCache(tmp_path / "missing.sqlite")
+    )
+
+    chars = pd.DataFrame({
+        "char_id": list(range(10)),
+        "char_name": [f"Char{i}" for i in range(10)],
+        "slug_name": ["stormrage"] * 10,
+    })
+    monkeypatch.setattr(chinfo, "get_top_pvp_characters", lambda *a, **k: chars)
+    monkeypatch.setattr(chinfo, "get_bearer_token", lambda: "token")
+    monkeypatch.setattr(
+        chinfo, "fetch_profiles_concurrently",
+        lambda df, token, **kwargs: [(row, {"ok": True}) for row in df.to_dict("records")],
+    )
+    monkeypatch.setattr(
+        chinfo, "build_profiles_dataframe",
+        lambda fetched: pd.DataFrame([
+            {"id": m["char_id"], "name": m["char_name"], "realm_slug": m["slug_name"]} for m, _ in fetched
+        ]),
+    )
+
+    shards = chinfo.plan_chinfo_shards("20251117", n_shards=3)
+    assert [s["shard"] for s in shards] == [0, 1, 2]
+
+    counts = [chinfo.extract_chinfo_shard(**s, fetch_resources=False) for s in shards]
+    assert counts == [4, 3, 3]
+
+    chinfo.merge_chinfo_shards("20251117")
+    df = pd.read_parquet(landing / "ch_profile_20251117.parquet")
+    assert sorted(df["id"]) == list(range(10))
+    assert not list(checkpoints.iterdir())
+
@@ -0,0 +1,56 @@
+import pandas as pd
+
+from tp2025.io.landing_checkpoint import ProfileCheckpoint, make_checkpoint_key
+
+
+def _profiles_df(names):
+    return pd.DataFrame(
+        [
+            {"id": i, "name": name, "realm_slug": "stormrage", "fecha_proceso": "20251117"}
+            for i, name in enumerate(names)
+        ]
+    )
+
+
+def test_checkpoint_records_completed_keys(tmp_path):
+    cp = ProfileCheckpoint("20251117", root_dir=tmp_path)
+    assert cp.completed_keys() == set()
+
+    cp.write_chunk(
+        _profiles_df(["Lørdnick", "Manongauz"]),
+        [
+            make_checkpoint_key("stormrage", "Lørdnick"),
+            make_checkpoint_key("stormrage", "Manongauz"),
+        ],
+    )
+
+    # Una "nueva corrida" ve lo que ya se extrajo
+    resumed = ProfileCheckpoint("20251117", root_dir=tmp_path)
+    assert resumed.completed_keys() == {
+        ("stormrage", "lørdnick"),
+        ("stormrage", "manongauz"),
+    }
+
+
+def test_checkpoint_ignores_truncated_log_line(tmp_path):
+    cp = ProfileCheckpoint("20251117", root_dir=tmp_path)
+    cp.write_chunk(_profiles_df(["Testchar"]), [("stormrage", "testchar")])
+
+    # Simulamos un corte a mitad de escritura
+    with cp.log_path.open("a", encoding="utf-8") as fh:
+        fh.write("stormrage")
+
+    assert cp.completed_keys() == {("stormrage", "testchar")}
+
+
+def test_merge_chunks_deduplicates_and_clear(tmp_path):
+    cp = ProfileCheckpoint("20251117", root_dir=tmp_path)
+    cp.write_chunk(_profiles_df(["A", "B"]), [("stormrage", "a"), ("stormrage", "b")])
+    cp.write_chunk(_profiles_df(["B", "C"]), [("stormrage", "b"), ("stormrage", "c")])
+
+    df = cp.merge_chunks()
+    assert sorted(df["name"]) == ["A", "B", "C"]
+
+    cp.clear()
+    assert not cp.chunk_dir.exists()
+    assert cp.merge_chunks().empty
@@ -0,0 +1,162 @@
+import threading
+from datetime import date
+
+import pandas as pd
+
+from tp2025.io.landing_manifest import LandingManifest, discover_landing_files, register_landing_file
+from tp2025.jobs import compact_landing as cl
+from tp2025.jobs import extract_leaderboard_to_landing as extract
+from tp2025.jobs import load_chinfo_raw_to_db as chinfo_raw
+from tp2025.jobs import load_leaderboard_raw_to_db as leaderboard_raw
+
+
+def _leaderboard_file(landing, fecha, bracket, rating):
+    path = landing / f"pvp_leaderboard_s40_{bracket}_{fecha}.parquet"
+    pd.DataFrame(
+        [
+            {"id": 1, "name": "Lørdnick", "slug": "stormrage", "faction": "HORDE",
+             "rank": 1, "rating": rating, "played": 217, "won": 144, "lost": 73},
+            {"id": 2, "name": "Manongauz", "slug": "demon-soul", "faction": "ALLIANCE",
+             "rank": 2, "rating": rating - 50, "played": 300, "won": 180, "lost": 120},
+        ]
+    ).to_parquet(path, index=False)
+    return path
+
+
+def _profile_file(landing, fecha):
+    path = landing / f"ch_profile_{fecha}.parquet"
+    pd.DataFrame(
+        [{"id": 1, "name": "Lørdnick", "realm_slug": "stormrage", "faction": "Horde",
+          "class": "Paladin", "spec": "Retribution", "a_ilvl": 700, "e_ilvl": 698,
+          "fecha_proceso": fecha}]
+    ).to_parquet(path, index=False)
+    return path
+
+
+def _load_day(monkeypatch, landing, loader, fecha):
+    monkeypatch.setattr(loader, "LANDING_DIR", landing)
+    files = loader.list_parquet_for_processing_date(fecha)
+    return pd.concat([loader.load_parquet_to_dataframe(f) for f in files], ignore_index=True)
+
+
+def test_compaction_keeps_loads_identical_and_applies_retention(tmp_path, monkeypatch):
+    landing = tmp_path / "landing"
+    landing.mkdir()
+    for fecha, rating in (("20251101", 2800), ("20251102", 2850), ("20251115", 2900)):
+        _leaderboard_file(landing, fecha, "2v2", rating)
+        _leaderboard_file(landing, fecha, "3v3", rating + 10)
+        _profile_file(landing, fecha)
+
+    before = {
+        fecha: _load_day(monkeypatch, landing, leaderboard_raw, fecha)
+        for fecha in ("20251101", "20251102", "20251115")
+    }
+    profile_before = _load_day(monkeypatch, landing, chinfo_raw, "20251102")
+
+    stats = cl.compact_landing(today=date(2025, 11, 16), landing_dir=landing, compact_after_days=7)
+    assert stats["pvp_leaderboard"]["compacted_days"] == 2
+    assert stats["ch_profile"]["compacted_days"] == 2
+
+    # Los días viejos pasaron a la partición de la temporada; el reciente sigue diario
+    remaining = sorted(p.name for p in landing.glob("*.parquet"))
+    assert remaining == [
+        "ch_profile_20251115.parquet",
+        "pvp_leaderboard_s40_2v2_20251115.parquet",
+        "pvp_leaderboard_s40_3v3_20251115.parquet",
+    ]
+    assert (landing / "compacted" / "pvp_leaderboard_s40.parquet").exists()
+    assert (landing / "compacted" / "ch_profile_202511.parquet").exists()
+
+    for fecha, expected in before.items():
+        after = _load_day(monkeypatch, landing, leaderboard_raw, fecha)
+        sort = ["bracket", "rank"]
+        pd.testing.assert_frame_equal(
+            after.sort_values(sort).reset_index(drop=True),
+            expected.sort_values(sort).reset_index(drop=True),
+        )
+    pd.testing.assert_frame_equal(_load_day(monkeypatch, landing, chinfo_raw, "20251102"), profile_before)
+
+    # Retención de 10 días: se va el 20251101 (partición y manifest), el resto queda
+    cl.compact_landing(today=date(2025, 11, 12), landing_dir=landing, compact_after_days=7, retention_days=10)
+    manifest = LandingManifest.load(landing)
+    assert manifest.days("pvp_leaderboard") == ["20251102", "20251115"]
+    partition = pd.read_parquet(landing / "compacted" / "pvp_leaderboard_s40.parquet")
+    assert sorted(partition["fecha_proceso"].unique()) == ["20251102"]
+
+
+def test_compaction_rebuilds_cdc_days_from_the_compacted_landing(tmp_path, monkeypatch):
+    landing = tmp_path / "landing"
+    monkeypatch.setattr(extract, "LANDING_DIR", landing)
+    monkeypatch.setattr(leaderboard_raw, "LANDING_DIR", landing)
+    monkeypatch.setattr(extract, "CDC_BASE_EVERY", 7)
+    days = {"20251101": 2800, "20251102": 2850, "20251103": 2870}
+    paths = [
+        extract.land_leaderboard(
+            pd.read_parquet(_leaderboard_file(tmp_path, fecha, "3v3", rating)), 40, "3v3", fecha, cdc=True
+        )
+        for fecha, rating in days.items()
+    ]
+    assert [leaderboard_raw.is_cdc_file(p) for p in paths] == [False, True, True]
+    before = {fecha: _load_day(monkeypatch, landing, leaderboard_raw, fecha) for fecha in days}
+
+    # El LANDING_DIR por defecto es otro (vacío): la cadena CDC se arma con landing_dir
+    monkeypatch.setattr(leaderboard_raw, "LANDING_DIR", tmp_path / "other")
+    stats = cl.compact_landing(today=date(2025, 11, 16), landing_dir=landing, compact_after_days=7)
+    assert stats["pvp_leaderboard"]["compacted_days"] == 3
+    assert not list(landing.glob("pvp_leaderboard_*.parquet"))
+
+    for fecha, expected in before.items():
+        pd.testing.assert_frame_equal(_load_day(monkeypatch, landing, leaderboard_raw, fecha), expected)
+
+
+def test_files_registered_during_compaction_are_kept(tmp_path, monkeypatch):
+    landing = tmp_path / "landing"
+    landing.mkdir()
+    _leaderboard_file(landing, "20251101", "3v3", 2800)
+    late = _leaderboard_file(landing, "20251116", "3v3", 2900)
+
+    # Una extracción registra su archivo mientras la compactación está en curso
+    compact_dataset = cl.compact_dataset
+    writers = []
+
+    def racing_compact(*args, **kwargs):
+        if not writers:
+            writer = threading.Thread(
+                target=register_landing_file, args=("pvp_leaderboard", "20251116", late, landing)
+            )
+            writer.start()
+            writer.join(timeout=0.5)
+            assert writer.is_alive()  # espera el lock de la compactación
+            writers.append(writer)
+        return compact_dataset(*args, **kwargs)
+
+    monkeypatch.setattr(cl, "compact_dataset", racing_compact)
+    cl.compact_landing(today=date(2025, 11, 16), landing_dir=landing, compact_after_days=7)
+    writers[0].join(timeout=5)
+
+    manifest = LandingManifest.load(landing)
+    assert manifest.days("pvp_leaderboard") == ["20251101", "20251116"]
+    assert [f.path for f in manifest.files("pvp_leaderboard", "20251116")] == [late]
+
+
+def test_discovery_uses_manifest_and_falls_back_to_glob(tmp_path):
+    landing = tmp_path / "landing"
+    landing.mkdir()
+    path = _leaderboard_file(landing, "20251117", "3v3", 2954)
+
+    # Sin manifest: glob del directorio
+    found = discover_landing_files(
+        "pvp_leaderboard", "20251117", landing, fallback_glob="pvp_leaderboard_s*_20251117.parquet"
+    )
+    assert [f.path for f in found] == [path]
+
+    # Con el día registrado, el manifest manda (aunque haya otros archivos sueltos)
+    manifest = LandingManifest(landing)
+    manifest.add("pvp_leaderboard", "20251117", path)
+    manifest.save()
+    _leaderboard_file(landing, "20251117", "2v2", 2900)
+    found = discover_landing_files(
+        "pvp_leaderboard", "20251117", landing, fallback_glob="pvp_leaderboard_s*_20251117.parquet"
+    )
+    assert [f.path for f in found] == [path]
+    assert discover_landing_files("pvp_leaderboard", "20251118", landing) == []
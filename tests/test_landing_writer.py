@@ -0,0 +1,53 @@
+import pandas as pd
+import pyarrow.parquet as pq
+
+from tp2025.io.landing_writer import (
+    LEADERBOARD_WRITE_OPTIONS,
+    LandingWriteOptions,
+    write_landing_parquet,
+)
+
+
+def _leaderboard(n=10):
+    return pd.DataFrame(
+        {
+            "id": list(range(n)),
+            "name": [f"char{i}" for i in range(n)],
+            "slug": ["stormrage", "area-52"] * (n // 2),
+            "faction": ["HORDE", "ALLIANCE"] * (n // 2),
+            "rank": list(range(n, 0, -1)),
+            "rating": [2000 + i for i in range(n)],
+        }
+    )
+
+
+def test_leaderboard_written_sorted_zstd_with_dictionary(tmp_path):
+    path = write_landing_parquet(
+        _leaderboard(),
+        tmp_path / "pvp_leaderboard_s40_3v3_20251117.parquet",
+        LEADERBOARD_WRITE_OPTIONS.with_overrides(row_group_size=4),
+    )
+
+    meta = pq.ParquetFile(path).metadata
+    assert meta.num_row_groups == 3
+    schema = meta.schema.to_arrow_schema()
+
+    first = meta.row_group(0)
+    rank_col = first.column(schema.get_field_index("rank"))
+    assert rank_col.compression == "ZSTD"
+    # ordenado por rank (bracket no está en el archivo y se ignora)
+    assert (rank_col.statistics.min, rank_col.statistics.max) == (1, 4)
+
+    slug_encodings = first.column(schema.get_field_index("slug")).encodings
+    name_encodings = first.column(schema.get_field_index("name")).encodings
+    assert any("DICTIONARY" in e for e in slug_encodings)
+    assert not any("DICTIONARY" in e for e in name_encodings)
+
+    assert pd.read_parquet(path)["rank"].tolist() == list(range(1, 11))
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_snappy_without_level(tmp_path):
+    options = LandingWriteOptions(compression="snappy", compression_level=9)
+    path = write_landing_parquet(_leaderboard(4), tmp_path / "x.parquet", options)
+    assert pq.ParquetFile(path).metadata.row_group(0).column(0).compression == "SNAPPY"
@@ -0,0 +1,59 @@
+import pandas as pd
+
+from tp2025.io.landing_manifest import LandingManifest
+from tp2025.jobs import extract_leaderboard_to_landing as extract
+from tp2025.jobs import load_leaderboard_raw_to_db as leaderboard_raw
+from tp2025.transforms.leaderboard_cdc import apply_changes, diff_snapshots
+
+
+def _row(char_id, rank, rating, name=None):
+    return {"id": char_id, "name": name or f"char{char_id}", "slug": "stormrage", "faction": "HORDE",
+            "rank": rank, "rating": rating, "played": 100, "won": 60, "lost": 40}
+
+
+def _raw(rows, fecha="20251117"):
+    return leaderboard_raw.to_raw_frame(pd.DataFrame(rows), 40, "3v3", fecha)
+
+
+def test_diff_and_apply_round_trip():
+    previous = _raw([_row(1, 1, 2900), _row(2, 2, 2850), _row(3, 3, 2800)])
+    current = _raw([_row(1, 1, 2910), _row(3, 2, 2800), _row(4, 3, 2790)])
+
+    changes = diff_snapshots(previous, current)
+    assert dict(zip(changes["id"], changes["op"])) == {"1": "U", "2": "D", "3": "U", "4": "I"}
+
+    rebuilt = apply_changes(previous, changes).sort_values("id").reset_index(drop=True)
+    pd.testing.assert_frame_equal(rebuilt, current.sort_values("id").reset_index(drop=True))
+
+    # sin cambios: set vacío
+    assert diff_snapshots(current, current).empty
+
+
+def test_cdc_landing_rebuilds_full_snapshots(tmp_path, monkeypatch):
+    landing = tmp_path / "landing"
+    monkeypatch.setattr(extract, "LANDING_DIR", landing)
+    monkeypatch.setattr(leaderboard_raw, "LANDING_DIR", landing)
+    monkeypatch.setattr(extract, "CDC_BASE_EVERY", 3)
+
+    days = {
+        "20251117": [_row(1, 1, 2900), _row(2, 2, 2850)],
+        "20251118": [_row(1, 1, 2920), _row(2, 2, 2850), _row(5, 3, 2700)],
+        "20251119": [_row(5, 1, 2950), _row(1, 2, 2920)],
+        "20251120": [_row(5, 1, 2960), _row(1, 2, 2920)],
+    }
+    paths = [extract.land_leaderboard(pd.DataFrame(rows), 40, "3v3", fecha, cdc=True)
+             for fecha, rows in days.items()]
+
+    # base, dos días CDC y de nuevo un completo al llegar a CDC_BASE_EVERY
+    assert [leaderboard_raw.is_cdc_file(p) for p in paths] == [False, True, True, False]
+
+    for fecha, rows in days.items():
+        files = leaderboard_raw.list_parquet_for_processing_date(fecha)
+        loaded = pd.concat([leaderboard_raw.load_parquet_to_dataframe(f) for f in files], ignore_index=True)
+        pd.testing.assert_frame_equal(loaded, _raw(rows, fecha))
+
+    # re-extraer un día en modo completo reemplaza al archivo CDC
+    extract.land_leaderboard(pd.DataFrame(days["20251118"]), 40, "3v3", "20251118", cdc=False)
+    assert not paths[1].exists()
+    entries = LandingManifest.load(landing).files("pvp_leaderboard", "20251118")
+    assert [f.path.name for f in entries] == ["pvp_leaderboard_s40_3v3_20251118.parquet"]
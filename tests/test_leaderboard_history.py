@@ -0,0 +1,56 @@
+import duckdb
+import pytest
+
+from tp2025.transforms.leaderboard_history import (
+    compact_history,
+    get_rating_history,
+    update_history,
+)
+
+
+@pytest.fixture
+def conn():
+    conn = duckdb.connect()
+    conn.execute(
+        """
+        CREATE TABLE raw_pvp_leaderboard (
+            id TEXT, name TEXT, slug TEXT, faction TEXT, rank TEXT, rating TEXT,
+            played TEXT, won TEXT, lost TEXT, bracket TEXT, s_id TEXT, fecha_proceso TEXT
+        );
+        """
+    )
+    yield conn
+    conn.close()
+
+
+def _raw(conn, fecha, rating, played, won):
+    conn.execute(
+        """
+        INSERT INTO raw_pvp_leaderboard VALUES
+            ('1', 'Lørdnick', 'stormrage', 'HORDE', '1', ?, ?, ?, ?, '3v3', '40', ?)
+        """,
+        [str(rating), str(played), str(won), str(played - won), fecha],
+    )
+
+
+def test_history_deltas_and_windowed_win_rate(conn):
+    _raw(conn, "20251101", 2900, 100, 60)
+    _raw(conn, "20251105", 2920, 120, 75)
+    _raw(conn, "20251110", 2954, 140, 90)
+
+    for fecha in ("20251101", "20251105", "20251110"):
+        update_history(fecha, conn)
+    # Reprocesar el último día reemplaza su slice, no lo duplica
+    update_history("20251110", conn)
+    compact_history(conn)
+
+    df = get_rating_history(1, "3v3", conn)
+
+    assert list(df["rating"]) == [2900, 2920, 2954]
+    assert df["rating_delta"].isna().iloc[0]
+    assert list(df["rating_delta"].iloc[1:]) == [20, 34]
+    assert list(df["games_delta"].iloc[1:]) == [20, 20]
+    # 7 días antes del 10/11 -> snapshot del 01/11: (90-60)/(140-100)
+    assert df["win_rate_7d"].iloc[2] == pytest.approx(0.75)
+    # Todavía no hay 30 días de historia
+    assert df["win_rate_30d"].isna().all()
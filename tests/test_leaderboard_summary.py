@@ -0,0 +1,73 @@
+import duckdb
+
+from tp2025.transforms.leaderboard_summary import build_summaries
+
+
+def _cur_tables(conn, fecha, rows):
+    conn.execute(
+        """
+        CREATE OR REPLACE TABLE cur_pvp_leaderboard (
+            char_id BIGINT, slug_name VARCHAR, ranking INT, rating INT,
+            bracket_id VARCHAR, fecha_proceso VARCHAR
+        );
+        """
+    )
+    conn.execute(
+        """
+        CREATE OR REPLACE TABLE cur_chinfo (
+            char_id BIGINT, class_name VARCHAR, current_spec VARCHAR, fecha_proceso VARCHAR
+        );
+        """
+    )
+    for char_id, slug, ranking, rating, cls, spec in rows:
+        conn.execute(
+            "INSERT INTO cur_pvp_leaderboard VALUES (?, ?, ?, ?, '3v3', ?)",
+            [char_id, slug, ranking, rating, fecha],
+        )
+        conn.execute("INSERT INTO cur_chinfo VALUES (?, ?, ?, ?)", [char_id, cls, spec, fecha])
+
+
+def test_summaries_are_built_incrementally_per_day():
+    conn = duckdb.connect()
+
+    _cur_tables(
+        conn,
+        "20251117",
+        [
+            (1, "stormrage", 1, 2954, "Paladin", "Retribution"),
+            (2, "stormrage", 150, 2410, "Paladin", "Retribution"),
+            (3, "area-52", 600, 2180, "Mage", "Frost"),
+        ],
+    )
+    counts = build_summaries("20251117", conn=conn)
+    assert counts["agg_class_spec_daily"] == 2
+
+    # Día siguiente: CUR se reemplaza, los agregados del día anterior se conservan
+    _cur_tables(conn, "20251118", [(1, "stormrage", 1, 2990, "Paladin", "Retribution")])
+    build_summaries("20251118", conn=conn)
+    build_summaries("20251118", conn=conn)
+
+    class_spec = conn.execute(
+        """
+        SELECT fecha_proceso, class_name, n_chars, max_rating
+        FROM agg_class_spec_daily ORDER BY fecha_proceso, class_name
+        """
+    ).fetchall()
+    assert class_spec == [
+        ("20251117", "Mage", 1, 2180),
+        ("20251117", "Paladin", 2, 2954),
+        ("20251118", "Paladin", 1, 2990),
+    ]
+
+    buckets = conn.execute(
+        "SELECT rating_bucket, n_chars FROM agg_rating_bucket_daily WHERE fecha_proceso = '20251117' ORDER BY 1"
+    ).fetchall()
+    assert buckets == [(2100, 1), (2400, 1), (2900, 1)]
+
+    realms = conn.execute(
+        """
+        SELECT slug_name, n_top100, n_top500, n_total
+        FROM agg_realm_top_daily WHERE fecha_proceso = '20251117' ORDER BY 1
+        """
+    ).fetchall()
+    assert realms == [("area-52", 0, 0, 1), ("stormrage", 1, 2, 2)]
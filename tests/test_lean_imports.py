@@ -0,0 +1,51 @@
+import ast
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from tp2025 import config
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+DAG_FILE = PROJECT_ROOT / "dags" / "wow_pvp_full_pipeline_dag.py"
+
+
+def test_dag_does_not_import_jobs_at_parse_time():
+    tree = ast.parse(DAG_FILE.read_text(encoding="utf-8"))
+    module_level = []
+    for node in tree.body:
+        if isinstance(node, ast.ImportFrom):
+            module_level.append(node.module or "")
+        elif isinstance(node, ast.Import):
+            module_level.extend(alias.name for alias in node.names)
+
+    assert not [m for m in module_level if m.startswith("tp2025")]
+
+
+def test_duckdb_only_jobs_do_not_pull_pandas():
+    code = (
+        "import sys\n"
+        "import tp2025.jobs.build_leaderboard_cur, tp2025.jobs.build_leaderboard_history\n"
+        "import tp2025.jobs.build_chinfo_cur, tp2025.jobs.build_leaderboard_summary\n"
+        "print('pandas' in sys.modules)\n"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+        env=dict(os.environ, PYTHONPATH=str(PROJECT_ROOT / "src")),
+    )
+    assert out.stdout.strip() == "False"
+
+
+def test_load_env_runs_once(tmp_path, monkeypatch):
+    env_file = tmp_path / ".env"
+    env_file.write_text("TP2025_TEST_VAR=primero\n")
+    monkeypatch.delenv("TP2025_TEST_VAR", raising=False)
+    monkeypatch.setattr(config, "_env_loaded", False)
+
+    assert config.load_env(env_file) is True
+    env_file.write_text("TP2025_TEST_VAR=segundo\n")
+    assert config.load_env(env_file) is False
+    assert os.environ["TP2025_TEST_VAR"] == "primero"
@@ -0,0 +1,51 @@
+import pandas as pd
+
+from tp2025.blizzard_api.endpoints import get_character_profile_url
+from tp2025.services import ch_profile_client as cpc
+from tp2025.services.missing_characters import MissingCharacterCache
+
+
+def _selection(rows):
+    return pd.DataFrame(rows, columns=["char_id", "char_name", "slug_name"])
+
+
+def test_profile_url_is_percent_encoded():
+    url = get_character_profile_url(realm_slug="area-52", character_name="Lørdnick")
+    assert "/profile/wow/character/area-52/l%C3%B8rdnick?" in url
+    # una "/" en el nombre no puede cambiar el path
+    assert "/a%2Fb?" in get_character_profile_url(realm_slug="x", character_name="a/b")
+
+
+def test_negative_cache_skips_recent_404_and_resolves_moves(tmp_path):
+    cache = MissingCharacterCache(tmp_path / "missing.sqlite", ttl_seconds=100)
+    cache.add_many([("stormrage", "Lørdnick", 1), ("stormrage", "Gone", 2)], now=1000)
+
+    today = _selection([
+        (1, "Lørdnick", "stormrage"),   # sigue dando 404 -> se saltea
+        (2, "Renamed", "stormrage"),    # char 2 cambió de nombre -> se pide
+        (3, "Gone", "stormrage"),       # otro personaje con el nombre viejo -> se pide
+    ])
+    pending = cache.filter_selection(today, now=1050)
+    assert pending["char_id"].tolist() == [2, 3]
+    # el 404 del char 2 se olvidó al re-resolverlo por char_id
+    assert cache.known_missing(now=1050) == {("stormrage", "lørdnick"): "1"}
+
+    # vencido el TTL se vuelve a intentar
+    assert cache.filter_selection(today, now=1200)["char_id"].tolist() == [1, 2, 3]
+
+
+def test_fetch_records_404s(tmp_path, monkeypatch):
+    cache = MissingCharacterCache(tmp_path / "missing.sqlite")
+    monkeypatch.setattr(
+        cpc, "_fetch_profile_response",
+        lambda session, token, realm, name, **kwargs: (404, None) if name == "gone" else (200, {"id": 1}),
+    )
+    chars = pd.DataFrame([
+        {"char_id": 1, "char_name": "Alive", "slug_name": "stormrage", "bracket_id": "3v3",
+         "season_id": 40, "fecha_proceso": "20251117"},
+        {"char_id": 2, "char_name": "Gone", "slug_name": "stormrage", "bracket_id": "3v3",
+         "season_id": 40, "fecha_proceso": "20251117"},
+    ])
+    results = cpc.fetch_profiles_concurrently(chars, "token", missing_cache=cache)
+    assert sorted(bool(p) for _, p in results) == [False, True]
+    assert set(cache.known_missing()) == {("stormrage", "gone")}
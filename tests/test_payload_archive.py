@@ -0,0 +1,114 @@
+import json
+
+import pandas as pd
+import pytest
+
+from tp2025.io import payload_archive as pa
+from tp2025.jobs import extract_chinfo_to_landing as chinfo
+from tp2025.jobs import extract_leaderboard_to_landing as leaderboard
+from tp2025.jobs import replay_archive
+from tp2025.services import ch_profile_client as cpc
+
+LEADERBOARD = {
+    "entries": [
+        {"character": {"name": "Lørdnick", "id": 1, "realm": {"slug": "stormrage"}},
+         "faction": {"type": "HORDE"}, "rank": 1, "rating": 2954,
+         "season_match_statistics": {"played": 217, "won": 144, "lost": 73},
+         "tier": {"id": 5}},
+    ]
+}
+
+
+def _profile(i, ilvl=700):
+    return json.dumps({
+        "id": i, "name": f"Char{i}", "faction": {"name": "Horde"},
+        "character_class": {"name": "Paladin"}, "active_spec": {"name": "Retribution"},
+        "average_item_level": ilvl, "equipped_item_level": ilvl - 2,
+        "last_login_timestamp": 1763400000000,
+    }).encode()
+
+
+def test_archive_roundtrip_keeps_latest_per_key(tmp_path):
+    archive = pa.PayloadArchive(tmp_path / "archive")
+    archive.add(pa.PROFILE_ENDPOINT, "stormrage/char1", _profile(1, 690), "20251117", fetched_at=100)
+    archive.add(pa.PROFILE_ENDPOINT, "stormrage/char1", _profile(1, 700), "20251117", fetched_at=200)
+    archive.add(pa.PROFILE_ENDPOINT, "stormrage/char2", _profile(2), "20251117", fetched_at=150)
+    archive.add(pa.PROFILE_ENDPOINT, "stormrage/char1", _profile(1, 710), "20251118", fetched_at=300)
+    assert archive.flush() == 4
+
+    day = {p.key: json.loads(p.body) for p in archive.iter_day(pa.PROFILE_ENDPOINT, "20251117")}
+    assert day["stormrage/char1"]["average_item_level"] == 700
+    assert len(list(archive.iter_day(pa.PROFILE_ENDPOINT, "20251117", latest_only=False))) == 3
+    assert archive.get(pa.PROFILE_ENDPOINT, "stormrage/char1").body == _profile(1, 710)
+    assert archive.get(pa.PROFILE_ENDPOINT, "stormrage/char1", fetched_at=100).body == _profile(1, 690)
+    assert archive.days(pa.PROFILE_ENDPOINT) == ["20251117", "20251118"]
+
+
+def test_zstd_dictionary_is_trained_and_used(tmp_path, monkeypatch):
+    pytest.importorskip("zstandard")
+    monkeypatch.setattr(pa, "DICT_MIN_SAMPLES", 50)
+    archive = pa.PayloadArchive(tmp_path / "archive")
+    bodies = {f"realm/char{i}": _profile(i, 600 + i % 90) for i in range(300)}
+    for key, body in bodies.items():
+        archive.add(pa.PROFILE_ENDPOINT, key, body, "20251117")
+    archive.flush()
+
+    assert archive.current_dictionary(pa.PROFILE_ENDPOINT) is not None
+    assert {p.key: p.body for p in archive.iter_day(pa.PROFILE_ENDPOINT, "20251117")} == bodies
+
+
+def test_segment_reuses_one_compressor(tmp_path, monkeypatch):
+    created = []
+
+    class FakeCompressor:
+        def __init__(self, level, dict_data):
+            created.append(self)
+
+        def compress(self, body):
+            return body
+
+    fake_zstd = type("zstd", (), {"ZstdCompressor": FakeCompressor})
+    monkeypatch.setattr(pa, "_zstd", lambda: fake_zstd)
+    archive = pa.PayloadArchive(tmp_path / "archive")
+    for i in range(5):
+        archive.add(pa.PROFILE_ENDPOINT, f"realm/char{i}", _profile(i), "20251117")
+    archive.flush()
+
+    assert len(created) == 1
+
+
+def test_profile_fetch_archives_raw_body(tmp_path, monkeypatch):
+    class FakeResp:
+        status_code = 200
+        content = _profile(1)
+
+    archive = pa.PayloadArchive(tmp_path / "archive")
+    monkeypatch.setattr(pa, "ARCHIVE_ENABLED", True)
+    monkeypatch.setattr(pa, "_default_archive", archive)
+    monkeypatch.setattr(cpc, "blizzard_get", lambda url, token, **kw: FakeResp())
+
+    status, payload = cpc._fetch_profile_response(None, "token", "stormrage", "char1", processing_date="20251117")
+    archive.flush()
+    assert (status, payload["id"]) == (200, 1)
+    assert archive.get(pa.PROFILE_ENDPOINT, "stormrage/char1").body == _profile(1)
+
+
+def test_replay_rebuilds_landing_without_api_calls(tmp_path, monkeypatch):
+    landing = tmp_path / "landing"
+    monkeypatch.setattr(leaderboard, "LANDING_DIR", landing)
+    monkeypatch.setattr(chinfo, "LANDING_DIR", landing)
+    monkeypatch.setattr(leaderboard, "blizzard_get", pytest.fail)
+    monkeypatch.setattr(cpc, "blizzard_get", pytest.fail)
+
+    archive = pa.PayloadArchive(tmp_path / "archive")
+    archive.add(pa.LEADERBOARD_ENDPOINT, pa.leaderboard_key("us", 40, "3v3"),
+                json.dumps(LEADERBOARD).encode(), "20251117")
+    archive.add(pa.PROFILE_ENDPOINT, pa.profile_key("stormrage", "Char1"), _profile(1), "20251117")
+    archive.flush()
+
+    replay_archive.run_replay_archive("20251117", archive=archive)
+
+    lb = pd.read_parquet(landing / "pvp_leaderboard_s40_3v3_20251117.parquet")
+    assert lb[["id", "slug", "rating"]].values.tolist() == [[1, "stormrage", 2954]]
+    profiles = pd.read_parquet(landing / "ch_profile_20251117.parquet")
+    assert profiles[["realm_slug", "a_ilvl"]].values.tolist() == [["stormrage", 700]]
@@ -0,0 +1,99 @@
+import json
+import threading
+from concurrent.futures import Future
+
+import pandas as pd
+
+from tp2025.services import profile_decode_pool as pdp
+from tp2025.services.ch_profile_client import build_profiles_dataframe
+from tp2025.services.missing_characters import MissingCharacterCache
+
+
+def _meta(i):
+    return {"char_id": i, "char_name": f"Char{i}", "slug_name": "stormrage", "bracket_id": "3v3",
+            "season_id": 40, "fecha_proceso": "20251117"}
+
+
+def _body(i):
+    return json.dumps({
+        "id": i, "name": f"Char{i}", "level": 80,
+        "faction": {"type": "HORDE", "name": "Horde"},
+        "character_class": {"name": "Paladin", "id": 2},
+        "active_spec": {"name": "Retribution", "id": 70},
+        "average_item_level": 700 + i, "equipped_item_level": 698,
+        "equipment": {"href": f"https://us.api.blizzard.com/equipment/{i}"},
+    }).encode()
+
+
+class ManualExecutor:
+    """Executor que no corre nada hasta que el test lo pide."""
+
+    def __init__(self, run_immediately=False):
+        self.pending = []
+        self.run_immediately = run_immediately
+
+    def submit(self, fn, *args):
+        fut = Future()
+        self.pending.append((fut, fn, args))
+        if self.run_immediately:
+            self.run_next()
+        return fut
+
+    def run_next(self):
+        fut, fn, args = self.pending.pop(0)
+        fut.set_result(fn(*args))
+
+
+def test_process_pool_matches_thread_path():
+    metas = [_meta(i) for i in range(7)]
+    with pdp.ProfileDecodePool(processes=2, batch_size=3, max_pending=1) as pool:
+        for meta, i in zip(metas, range(7)):
+            pool.submit(meta, _body(i))
+        pool.submit(_meta(99), b"<html>maintenance</html>")
+        batch = pool.collect()
+
+    expected = build_profiles_dataframe([(m, json.loads(_body(i))) for i, m in enumerate(metas)])
+    sort = ["id"]
+    pd.testing.assert_frame_equal(
+        batch.to_frame().sort_values(sort).reset_index(drop=True), expected
+    )
+    assert [m["char_id"] for m in batch.failed] == [99]
+    links = dict((m["char_id"], p) for m, p in batch.meta_and_payloads())
+    assert links[3]["equipment"]["href"].endswith("/equipment/3")
+
+
+def test_submit_blocks_when_decoders_fall_behind():
+    executor = ManualExecutor()
+    pool = pdp.ProfileDecodePool(batch_size=1, max_pending=1, executor=executor)
+    pool.submit(_meta(1), _body(1))
+
+    second = threading.Thread(target=pool.submit, args=(_meta(2), _body(2)))
+    second.start()
+    second.join(0.2)
+    assert second.is_alive()          # back-pressure: el thread de fetch espera
+
+    executor.run_next()
+    second.join(2)
+    assert not second.is_alive()
+    executor.run_next()
+    assert len(pool.collect()) == 2
+
+
+def test_fetch_and_decode_hands_raw_bytes_to_pool(tmp_path, monkeypatch):
+    seen = []
+
+    def fake_fetch(session, token, realm, name, raw=False, processing_date=None):
+        seen.append(raw)
+        return (404, None) if name == "char2" else (200, _body(int(name[-1])))
+
+    monkeypatch.setattr(pdp, "_fetch_profile_response", fake_fetch)
+    executor = ManualExecutor(run_immediately=True)
+    cache = MissingCharacterCache(tmp_path / "missing.sqlite")
+    chars = pd.DataFrame([_meta(i) for i in (1, 2, 3)])
+
+    pool = pdp.ProfileDecodePool(batch_size=10, max_pending=4, executor=executor)
+    batch = pdp.fetch_and_decode_profiles(chars, "token", pool, missing_cache=cache)
+
+    assert set(seen) == {True}
+    assert sorted(batch.columns["id"]) == [1, 3]
+    assert set(cache.known_missing()) == {("stormrage", "char2")}
@@ -0,0 +1,68 @@
+from tp2025.services import profile_resources as pr
+
+
+META = {
+    "char_id": 1,
+    "char_name": "Testchar",
+    "slug_name": "stormrage",
+    "bracket_id": "3v3",
+    "season_id": 40,
+    "fecha_proceso": "20251117",
+}
+
+
+def test_plan_profile_resources_follows_href_and_falls_back():
+    payload = {
+        "id": 1,
+        "equipment": {
+            "href": "https://us.api.blizzard.com/profile/wow/character/stormrage/testchar/equipment?namespace=profile-us"
+        },
+    }
+
+    planned = pr.plan_profile_resources([(META, payload), (META, None)])
+    urls = {req.resource: req.url for req in planned}
+
+    assert set(urls) == {"equipment", "pvp_summary", "specializations"}
+    # El href del payload se respeta y se le agrega locale
+    assert urls["equipment"].endswith("/equipment?namespace=profile-us&locale=en_US")
+    # Sin href: se usa el builder de endpoints
+    assert "/stormrage/testchar/pvp-summary?" in urls["pvp_summary"]
+
+
+def test_shared_media_is_deduplicated_across_characters():
+    equipment = {"equipped_items": [{"item": {"id": 10}}, {"item": {"id": 11}}]}
+    specs = {"specializations": [{"specialization": {"id": 70, "name": "Retribution"}}]}
+    results = [
+        (pr.ResourceRequest("equipment", "u1"), equipment),
+        (pr.ResourceRequest("equipment", "u2"), equipment),
+        (pr.ResourceRequest("specializations", "u3"), specs),
+        (pr.ResourceRequest("specializations", "u4"), specs),
+    ]
+
+    media = pr.plan_shared_media(results)
+
+    assert sorted(r.resource for r in media) == ["item_media", "item_media", "spec_media"]
+    assert pr.plan_shared_media(results, already_fetched=[r.url for r in media]) == []
+
+
+def test_fetch_resources_requests_each_url_once(monkeypatch):
+    calls = []
+
+    def fake_fetch(session, token, url, label):
+        calls.append(url)
+        return {"honor_level": 50, "honorable_kills": 1000}
+
+    monkeypatch.setattr(pr, "fetch_json_url", fake_fetch)
+
+    meta_a = dict(META)
+    meta_b = dict(META, char_id=2)
+    planned = [
+        pr.ResourceRequest("pvp_summary", "same-url", pr._freeze_meta(meta_a)),
+        pr.ResourceRequest("pvp_summary", "same-url", pr._freeze_meta(meta_b)),
+    ]
+
+    results = pr.fetch_resources_concurrently(planned, token="T", max_workers=2)
+    dfs = pr.build_resource_dataframes(results)
+
+    assert calls == ["same-url"]
+    assert sorted(dfs["pvp_summary"]["char_id"]) == [1, 2]
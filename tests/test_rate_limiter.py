@@ -0,0 +1,65 @@
+import threading
+import time
+
+from tp2025.blizzard_api import rate_limiter as rl
+
+
+class _Response:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+def test_reserve_refills_and_queues_turns():
+    state, wait = rl._reserve(None, 1, rate=10, capacity=2, now=100.0)
+    assert wait == 0 and state == (1, 100.0)
+    state, wait = rl._reserve(state, 1, rate=10, capacity=2, now=100.0)
+    state, wait = rl._reserve(state, 1, rate=10, capacity=2, now=100.0)
+    # bucket vacío: el tercero espera su turno (1 / rate)
+    assert abs(wait - 0.1) < 1e-9
+    # un segundo después el bucket vuelve a estar lleno (tope = capacity)
+    state, wait = rl._reserve(state, 0, rate=10, capacity=2, now=101.0)
+    assert state == (2, 101.0)
+
+
+def test_sqlite_bucket_is_shared_between_limiters(tmp_path):
+    path = tmp_path / "bucket.sqlite"
+    # dos "procesos" con su propio backend sobre el mismo archivo
+    limiters = [rl.RateLimiter(rl.SQLiteBackend(path), rate=50, capacity=5, key="k") for _ in range(2)]
+
+    def worker(limiter):
+        for _ in range(10):
+            limiter.acquire()
+
+    start = time.monotonic()
+    threads = [threading.Thread(target=worker, args=(lim,)) for lim in limiters for _ in range(2)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.monotonic() - start
+
+    # 40 requests, 5 de ráfaga y el resto a 50/s: al menos 0.7s en total
+    assert elapsed >= 0.65
+
+
+def test_api_get_backs_off_on_429(monkeypatch):
+    limiter = rl.RateLimiter(rl.MemoryBackend(), rate=100, capacity=1)
+    responses = [_Response(429, {"Retry-After": "0.2"}), _Response(200)]
+    calls = []
+
+    class _Session:
+        def get(self, url, **kwargs):
+            calls.append(time.monotonic())
+            return responses.pop(0)
+
+    resp = rl.api_get("https://us.api.blizzard.com/x", session=_Session(), limiter=limiter)
+    assert resp.status_code == 200
+    assert len(calls) == 2
+    # el reintento esperó el Retry-After
+    assert calls[1] - calls[0] >= 0.19
+
+
+def test_off_backend_does_not_wait():
+    limiter = rl.RateLimiter(rl.make_backend("off"), rate=0.001, capacity=0)
+    assert limiter.acquire() == 0.0
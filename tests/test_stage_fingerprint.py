@@ -0,0 +1,90 @@
+from pathlib import Path
+
+import duckdb
+import pandas as pd
+
+from tp2025.io import load_localdb
+from tp2025.io import stage_fingerprint as sf
+from tp2025.jobs import build_leaderboard_cur, load_leaderboard_raw_to_db as leaderboard_raw
+
+
+def _run(cache, conn, fecha, runs):
+    return sf.run_stage(
+        "build_x",
+        fecha,
+        run=lambda: runs.append(fecha) or conn.execute(
+            "CREATE OR REPLACE TABLE cur_x AS SELECT * FROM raw_x WHERE fecha_proceso = ?", [fecha]
+        ),
+        inputs=lambda: sf.table_checksums({"raw_x": sf.day_slice("raw_x", fecha)}, conn),
+        outputs=lambda: sf.table_checksums({"cur_x": sf.TableSlice("cur_x")}, conn),
+        code=(sf,),
+        cache=cache,
+    )
+
+
+def test_stage_skips_only_when_inputs_outputs_and_date_match(tmp_path):
+    conn = duckdb.connect()
+    conn.execute("CREATE TABLE raw_x AS SELECT 1 AS id, '20251117' AS fecha_proceso")
+    conn.execute("INSERT INTO raw_x VALUES (2, '20251118')")
+    cache = sf.StageCache(tmp_path / "fp")
+    runs = []
+
+    assert _run(cache, conn, "20251117", runs) is True
+    assert _run(cache, conn, "20251117", runs) is False          # rerun sin cambios
+    conn.execute("INSERT INTO raw_x VALUES (3, '20251118')")     # otro día: no afecta
+    assert _run(cache, conn, "20251117", runs) is False
+
+    conn.execute("INSERT INTO raw_x VALUES (4, '20251117')")     # cambió la entrada
+    assert _run(cache, conn, "20251117", runs) is True
+    conn.execute("DELETE FROM cur_x")                             # alguien tocó la salida
+    assert _run(cache, conn, "20251117", runs) is True
+
+    assert _run(cache, conn, "20251118", runs) is True           # otra fecha
+    assert _run(cache, conn, "20251117", runs) is True           # la CUR ya no es la del 17
+    assert runs == ["20251117"] * 3 + ["20251118", "20251117"]
+
+    [row] = cache.report()
+    assert (row["stage"], row["hits"], row["misses"], row["last_result"]) == ("build_x", 2, 5, "miss")
+
+    disabled = sf.StageCache(tmp_path / "fp", enabled=False)
+    assert _run(disabled, conn, "20251117", runs) is True
+
+
+def test_rerun_of_unchanged_day_skips_raw_load_and_cur(tmp_path, monkeypatch):
+    landing = tmp_path / "landing"
+    landing.mkdir()
+    pd.DataFrame(
+        [{"id": 1, "name": "Lørdnick", "slug": "stormrage", "faction": "HORDE",
+          "rank": 1, "rating": 2954, "played": 217, "won": 144, "lost": 73}]
+    ).to_parquet(landing / "pvp_leaderboard_s40_3v3_20251117.parquet", index=False)
+    monkeypatch.setattr(leaderboard_raw, "LANDING_DIR", landing)
+    monkeypatch.setattr(load_localdb, "LOCALDB_DIR", tmp_path / "localdb")
+    monkeypatch.setattr(sf, "FINGERPRINT_DIR", tmp_path / "fingerprints")
+
+    for _ in range(2):
+        leaderboard_raw.run_load_leaderboard_raw_to_db("20251117")
+        build_leaderboard_cur.run_build_leaderboard_cur("20251117")
+
+    conn = load_localdb.get_connection()
+    try:
+        # el segundo run no volvió a insertar el día
+        assert conn.execute("SELECT COUNT(*) FROM raw_pvp_leaderboard").fetchone()[0] == 1
+        assert conn.execute("SELECT COUNT(*) FROM cur_pvp_leaderboard").fetchone()[0] == 1
+    finally:
+        conn.close()
+    report = {r["stage"]: r for r in sf.StageCache(tmp_path / "fingerprints").report()}
+    assert report["load_leaderboard_raw_to_db"]["last_result"] == "hit"
+    assert report["build_leaderboard_cur"]["hits"] == 1
+
+
+def test_code_fingerprint_covers_the_package_modules_a_stage_uses(tmp_path, monkeypatch):
+    from tp2025.io import landing_manifest
+    from tp2025.jobs import load_chinfo_raw_to_db as chinfo_raw
+
+    before = sf.code_fingerprint((chinfo_raw,))
+    # landing_manifest no se pasa explícito, pero la carga RAW lo usa
+    edited = tmp_path / "landing_manifest.py"
+    edited.write_text(Path(landing_manifest.__file__).read_text() + "\n# cambio\n")
+    monkeypatch.setattr(sf.inspect, "getsourcefile", lambda m: edited if m is landing_manifest else m.__file__)
+
+    assert sf.code_fingerprint((chinfo_raw,)) != before
@@ -0,0 +1,70 @@
+import time
+
+from tp2025.blizzard_api import static_data as sd
+
+
+class DummyResponse:
+    def __init__(self, json_data=None, status_code=200, headers=None):
+        self._json_data = json_data
+        self.status_code = status_code
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+        return None
+
+    def json(self):
+        return self._json_data
+
+
+def test_season_lookup_is_served_from_warm_cache(tmp_path, monkeypatch):
+    calls = []
+
+    def fake_get(url, headers, timeout):
+        calls.append(headers)
+        return DummyResponse({"current_season": {"id": 40}}, headers={"Last-Modified": "X"})
+
+    monkeypatch.setattr(sd.requests, "get", fake_get)
+
+    cache_file = tmp_path / "static.json"
+    assert sd.StaticDataCache(path=cache_file).current_season_id("T") == 40
+
+    # Nueva instancia (nueva corrida): arranca desde el sidecar, sin red
+    assert sd.StaticDataCache(path=cache_file).current_season_id("T") == 40
+    assert len(calls) == 1
+
+
+def test_expired_entry_is_revalidated_with_if_modified_since(tmp_path, monkeypatch):
+    cache = sd.StaticDataCache(path=tmp_path / "static.json", ttl_overrides={"pvp_season": 60})
+    cache._load()[sd.cache_key("pvp_season")] = {
+        "fetched_at": time.time() - 3600,
+        "last_modified": "Mon, 17 Nov 2025 00:00:00 GMT",
+        "payload": {"current_season": {"id": 39}},
+    }
+
+    def fake_get(url, headers, timeout):
+        assert headers["If-Modified-Since"] == "Mon, 17 Nov 2025 00:00:00 GMT"
+        return DummyResponse(status_code=304)
+
+    monkeypatch.setattr(sd.requests, "get", fake_get)
+
+    assert cache.current_season_id("T") == 39
+    assert time.time() - cache._load()[sd.cache_key("pvp_season")]["fetched_at"] < 5
+
+
+def test_entries_are_kept_per_region(tmp_path, monkeypatch):
+    seasons = {"us": 40, "eu": 39}
+    urls = []
+
+    def fake_get(url, headers, timeout):
+        urls.append(url)
+        region = url.split("//")[1].split(".")[0]
+        return DummyResponse({"current_season": {"id": seasons[region]}})
+
+    monkeypatch.setattr(sd.requests, "get", fake_get)
+
+    cache = sd.StaticDataCache(path=tmp_path / "static.json")
+    assert cache.current_season_id("T", region="us") == 40
+    assert cache.current_season_id("T", region="eu") == 39
+    assert cache.current_season_id("T", region="us") == 40
+    assert len(urls) == 2
+    assert "eu.api.blizzard.com" in urls[1]
@@ -0,0 +1,111 @@
+import duckdb
+import pytest
+
+from tp2025.jobs import load_warehouse_redshift as lw
+from tp2025.warehouse import redshift_model as rm
+
+
+class FakeCursor:
+    def __init__(self, log):
+        self.log = log
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        self.log.append(sql)
+
+
+class FakeConn:
+    closed = False
+
+    def __init__(self):
+        self.executed = []
+        self.commits = 0
+        self.rollbacks = 0
+
+    def cursor(self):
+        return FakeCursor(self.executed)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def get_dsn_parameters(self):
+        return {"host": "redshift.local", "port": "5439", "dbname": "pda", "user": "u"}
+
+
+def test_ensure_tables_runs_ddl_once_per_target(tmp_path):
+    cache = tmp_path / "ddl.json"
+    conn = FakeConn()
+
+    assert rm.ensure_tables(conn, cache_path=cache) is True
+    n_ddl = len(conn.executed)
+    assert n_ddl == len(rm.STAR_SCHEMA_DDLS)
+
+    assert rm.ensure_tables(conn, cache_path=cache) is False
+    assert len(conn.executed) == n_ddl
+
+    rm.invalidate_ddl_cache(cache)
+    assert rm.ensure_tables(conn, cache_path=cache) is True
+
+
+def _fake_day(monkeypatch, fail_on=None):
+    duck = duckdb.connect()
+    duck.execute("CREATE TABLE src AS SELECT * FROM range(3) t(x)")
+    tables = list(rm.DAY_COLUMNS)
+    monkeypatch.setattr(
+        lw, "day_reads", lambda d: [(t, ("x",), "SELECT x FROM src WHERE $1 = $1", [d]) for t in tables]
+    )
+
+    def transfer(result, conn, table, columns, commit):
+        if table == fail_on:
+            raise RuntimeError(f"{table} falló")
+        conn.executed.append(f"INSERT {table}")
+        return len(result.fetchall())
+
+    monkeypatch.setattr(lw, "transfer_query", transfer)
+    return duck, tables
+
+
+def test_load_day_replaces_every_table_in_one_transaction(monkeypatch):
+    duck, tables = _fake_day(monkeypatch)
+    conn = FakeConn()
+
+    counts = lw.load_day("20251117", duck, conn)
+
+    assert counts == {t: 3 for t in tables}
+    deletes = [sql for sql in conn.executed if sql.startswith("DELETE")]
+    assert [sql.split()[2] for sql in deletes] == tables
+    # los DELETE van antes que cualquier INSERT, y hay un único commit
+    assert conn.executed[: len(deletes)] == deletes
+    assert (conn.commits, conn.rollbacks) == (1, 0)
+
+
+def test_load_day_rolls_back_everything_on_failure(monkeypatch):
+    duck, _ = _fake_day(monkeypatch, fail_on="fact_pvp_leaderboard_snapshot")
+    conn = FakeConn()
+
+    with pytest.raises(RuntimeError):
+        lw.load_day("20251117", duck, conn)
+
+    assert (conn.commits, conn.rollbacks) == (0, 1)
+
+
+def test_cur_readers_bind_parameters():
+    duck = duckdb.connect()
+    duck.execute("ATTACH ':memory:' AS wow_data")
+    duck.execute(
+        "CREATE TABLE wow_data.main.cur_chinfo AS SELECT * FROM (VALUES "
+        "(1, 'o''brien', 'stormrage', 'HORDE', 'Mage', 'Frost', '20251117'), "
+        "(2, 'Other', 'stormrage', 'HORDE', 'Mage', 'Fire', '20251118')) "
+        "v(char_id, char_name, slug_name, faction_type, class_name, current_spec, fecha_proceso)"
+    )
+
+    assert lw.fetch_cur_chinfo("20251117", duck)["char_name"].tolist() == ["o'brien"]
+    assert lw.fetch_cur_chinfo("x' OR '1'='1", duck).empty